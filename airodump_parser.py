@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - airodump-ng CSV Parser
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Single-pass parser for airodump-ng CSV files. Rows come straight from a
+buffered binary reader and are split into columns as bytes; both the access
+point and the station sections are returned with every column, as compact
+ap_records objects.
+"""
+
+import gc
+from binascii import unhexlify
+from ap_records import APRecord, StationRecord, small_int, intern_text
+
+STATION_HEADER = b'Station MAC, First time seen'
+CHUNK_SIZE = 1 << 22
+# A row is converted at most twice: once more after learning a new column value
+_RETRY = (0, 1)
+
+def _text(raw):
+    """Stripped, decoded, shared str for a raw field"""
+    return intern_text(raw.strip().decode('utf-8', 'replace'))
+
+def _address(raw):
+    """LAN IP column without airodump-ng's padding spaces"""
+    return intern_text(raw.replace(b' ', b'').decode('ascii', 'replace'))
+
+def _number(raw):
+    """Shared int for a numeric column, or None when it is not a number"""
+    try:
+        return small_int(int(raw))
+    except ValueError:
+        return None
+
+class _Columns:
+    """
+    Per-parse caches from raw column bytes to values, so each distinct value
+    is converted once. They are plain dicts rather than dict subclasses with
+    __missing__: subscripting an exact dict is several times cheaper, and a
+    row only misses (KeyError, then learn()) until its values have been seen.
+    """
+    __slots__ = ('text', 'address', 'number')
+
+    def __init__(self):
+        self.text, self.address, self.number = {}, {}, {}
+
+    def learn(self, text=(), address=(), number=()):
+        for cache, convert, raws in ((self.text, _text, text), (self.address, _address, address),
+                                     (self.number, _number, number)):
+            for raw in raws:
+                if raw not in cache:
+                    cache[raw] = convert(raw)
+
+def _essid(rest, id_length):
+    """
+    Recover the ESSID bytes from the tail of an AP row ("<essid>, <key>").
+    airodump-ng does not quote ESSIDs, so the ID-length column (a byte count)
+    is used to cut it out exactly; commas inside the name are preserved.
+    """
+    if rest[:1] == b' ':
+        rest = rest[1:]
+    if id_length and len(rest) >= id_length:
+        if rest[:1] == b'"' and rest[id_length + 1:id_length + 2] == b'"':
+            essid, tail = rest[1:id_length + 1], rest[id_length + 2:]
+        else:
+            essid, tail = rest[:id_length], rest[id_length:]
+        if not tail.strip() or tail.lstrip()[:1] == b',':
+            return essid
+    # Length missing or inconsistent: drop the trailing Key column instead
+    essid = rest.rstrip()
+    essid = essid[:-1] if essid.endswith(b',') else (essid.rpartition(b',')[0] or essid)
+    return essid.strip()
+
+def _iter_lines(buf):
+    """Yield raw lines from a buffer, a chunk at a time"""
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        end = min(pos + CHUNK_SIZE, size)
+        if end < size:
+            # Cut the chunk at the last complete line, or extend it to the first one
+            newline = buf.rfind(b'\n', pos, end)
+            if newline < 0:
+                newline = buf.find(b'\n', end)
+            end = newline + 1 if newline >= 0 else size
+        yield from buf[pos:end].split(b'\n')
+        pos = end
+
+def parse_airodump_buffer(buf):
+    """Parse airodump-ng CSV from a bytes-like buffer or mmap in one pass"""
+    return _parse(_iter_lines(buf))
+
+def parse_airodump_csv(path):
+    """
+    Parse an airodump-ng CSV file in one pass. Lines are read from the
+    buffered reader rather than a mapped and split copy of the file, which
+    took twice as long to produce them. Returns (aps, stations).
+    """
+    with open(path, 'rb') as f:
+        return _parse(f)
+
+def _parse(lines):
+    # The records hold no reference cycles, but every 700 of them would
+    # start a collection that walks the ones already built
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _parse_rows(lines)
+    finally:
+        if enabled:
+            gc.enable()
+
+def _parse_rows(lines):
+    """
+    Only the ESSID is decoded per row; the repetitive columns go through
+    per-parse caches
+    """
+    aps = []
+    stations = []
+    columns = _Columns()
+    text, address, number = columns.text, columns.address, columns.number
+    # Building a record as new() + init() skips type.__call__, which packs
+    # the 14 columns into an argument tuple for every row
+    new, init, init_station = object.__new__, APRecord.__init__, StationRecord.__init__
+    # unhexlify() + from_bytes() turns a MAC into an int faster than int(mac, 16)
+    from_bytes = int.from_bytes
+
+    # Access point rows; blank lines and the header fail to unpack or convert
+    append = aps.append
+    for line in lines:
+        fields = line.split(b',', 13)
+        try:
+            bssid, first, last, channel, speed, privacy, cipher, auth, power, beacons, ivs, lan_ip, id_length, rest = fields
+            bssid = from_bytes(unhexlify(bssid.replace(b':', b'')))
+        except ValueError:
+            if line.startswith(STATION_HEADER):
+                break
+            continue
+        for _attempt in _RETRY:
+            try:
+                length = number[id_length] or 0
+                # Fast path for the common "<space><essid>,<key>" tail
+                if 0 < length < len(rest) - 1 and rest[length + 1] == 44:
+                    essid = rest[1:length + 1]
+                else:
+                    essid = _essid(rest, length)
+                essid = essid.rstrip(b'\x00').decode('utf-8', 'replace')
+                record = new(APRecord)
+                init(record, bssid, essid, number[channel], number[power], number[speed],
+                     text[privacy], text[cipher], text[auth], number[beacons] or 0, number[ivs] or 0,
+                     address[lan_ip], length, text[first], text[last])
+                append(record)
+                break
+            except KeyError:
+                columns.learn((privacy, cipher, auth, first, last), (lan_ip,),
+                              (id_length, channel, power, speed, beacons, ivs))
+
+    # Station rows
+    append = stations.append
+    probed = {}
+    for line in lines:
+        fields = line.split(b',', 6)
+        if len(fields) == 6:
+            fields.append(b'')
+        try:
+            mac, first, last, power, packets, bssid, probes = fields
+            mac = from_bytes(unhexlify(mac.replace(b':', b'')))
+        except ValueError:
+            continue
+        try:
+            bssid = int(bssid.replace(b':', b''), 16)
+        except ValueError:
+            bssid = None  # "(not associated)"
+        essids = probed.get(probes)
+        if essids is None:
+            essids = probed[probes] = tuple([_text(p) for p in probes.split(b',') if p.strip()])
+        for _attempt in _RETRY:
+            try:
+                record = new(StationRecord)
+                init_station(record, mac, bssid, number[power], number[packets] or 0, essids,
+                             text[first], text[last])
+                append(record)
+                break
+            except KeyError:
+                columns.learn((first, last), (), (power, packets))
+    return aps, stations
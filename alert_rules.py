@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Alert Rules
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Declarative alert rules over scan_diff events. Rules are compiled once into
+predicate closures and indexed by event type and by the most selective field
+they reference (BSSID, BSSID prefix, SSID, encryption), so an event is only
+tested against rules that can match it. Matches pass per-rule/BSSID dedup
+and a per-rule rate limit before going to the notification sinks.
+
+Rule fields (all optional except name):
+    name, events ['appeared', 'disappeared', 'changed', 'rssi'],
+    bssid, bssid_prefix, ssid, ssid_regex, encryption (str or list),
+    channel (int or list), signal_drop (dB), signal_below (dBm),
+    severity, cooldown (seconds per BSSID), rate_limit (alerts per minute)
+
+    {"name": "Open network appeared", "events": ["appeared"], "encryption": "OPN"}
+    {"name": "Corp AP weak", "bssid_prefix": "00:1A:2B", "signal_drop": 15}
+"""
+
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from ap_records import mac_to_int, int_to_mac
+from scan_diff import APPEARED, DISAPPEARED, CHANGED, RSSI
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPES = (APPEARED, DISAPPEARED, CHANGED, RSSI)
+DEFAULT_COOLDOWN = 300
+DEFAULT_RATE_LIMIT = 60
+MAX_DEDUP_KEYS = 100000
+
+class RuleError(ValueError):
+    """Raised when a rule definition is invalid"""
+
+class CompiledRule:
+    """A rule definition turned into one predicate closure"""
+    __slots__ = ('name', 'severity', 'events', 'cooldown', 'rate_limit', 'predicate', 'definition',
+                 'index_key', '_tokens', '_refilled')
+
+    def __init__(self, definition):
+        if not isinstance(definition, dict) or not definition.get('name'):
+            raise RuleError('Every rule needs a name')
+        self.definition = definition
+        self.name = definition['name']
+        self.severity = definition.get('severity', 'medium')
+        events = definition.get('events') or EVENT_TYPES
+        events = (events,) if isinstance(events, str) else events
+        if not isinstance(events, (list, tuple)):
+            raise RuleError(f'{self.name}: events must be a list')
+        unknown = set(events) - set(EVENT_TYPES)
+        if unknown:
+            raise RuleError(f"{self.name}: unknown event type(s) {', '.join(sorted(map(str, unknown)))}")
+        self.events = tuple(events)
+        try:
+            self.cooldown = float(definition.get('cooldown', DEFAULT_COOLDOWN))
+            self.rate_limit = float(definition.get('rate_limit', DEFAULT_RATE_LIMIT))
+        except (TypeError, ValueError) as e:
+            raise RuleError(f'{self.name}: {e}') from None
+        self._tokens = self.rate_limit
+        self._refilled = time.monotonic()
+        self.predicate, self.index_key = self._compile(definition)
+
+    def _compile(self, rule):
+        checks = []
+        index_key = None
+        try:
+            if rule.get('bssid'):
+                bssid = mac_to_int(rule['bssid'])
+                index_key = ('bssid', bssid)
+                checks.append(lambda e, r: e.bssid_int == bssid)
+            if rule.get('bssid_prefix'):
+                digits = rule['bssid_prefix'].replace(':', '').replace('-', '')
+                bits = len(digits) * 4
+                if bits > 48:
+                    raise ValueError(f"bssid_prefix {rule['bssid_prefix']} is longer than a MAC")
+                prefix = int(digits, 16)
+                shift = 48 - bits
+                if index_key is None:
+                    index_key = ('prefix', bits, prefix)
+                checks.append(lambda e, r: e.bssid_int >> shift == prefix)
+            if rule.get('ssid') is not None:
+                ssid = rule['ssid']
+                if index_key is None:
+                    index_key = ('ssid', ssid)
+                checks.append(lambda e, r: r is not None and r.get('essid') == ssid)
+            if rule.get('ssid_regex'):
+                pattern = re.compile(rule['ssid_regex'])
+                checks.append(lambda e, r: r is not None and pattern.search(r.get('essid') or '') is not None)
+            if rule.get('encryption'):
+                allowed = rule['encryption']
+                allowed = frozenset((allowed,) if isinstance(allowed, str) else allowed)
+                if index_key is None and len(allowed) == 1:
+                    index_key = ('encryption', next(iter(allowed)))
+                checks.append(lambda e, r: r is not None and r.get('privacy') in allowed)
+            if rule.get('channel') is not None:
+                channels = rule['channel']
+                channels = frozenset((channels,) if isinstance(channels, int) else channels)
+                if not all(isinstance(channel, int) for channel in channels):
+                    raise ValueError('channel must be a number or a list of numbers')
+                checks.append(lambda e, r: r is not None and r.get('channel') in channels)
+            if rule.get('signal_drop') is not None:
+                drop = float(rule['signal_drop'])
+                checks.append(lambda e, r: (r is not None and e.previous and e.previous.get('power') is not None
+                                            and r.get('power') is not None
+                                            and e.previous['power'] - r.get('power') >= drop))
+            if rule.get('signal_below') is not None:
+                floor = float(rule['signal_below'])
+                checks.append(lambda e, r: r is not None and r.get('power') is not None and r.get('power') < floor)
+        except (TypeError, ValueError, re.error) as e:
+            raise RuleError(f'{self.name}: {e}') from None
+
+        checks = tuple(checks)
+        if not checks:
+            return (lambda e, r: True), index_key
+        if len(checks) == 1:
+            return checks[0], index_key
+        return (lambda e, r: all(check(e, r) for check in checks)), index_key
+
+    def take_token(self, now):
+        """Token bucket refilled at rate_limit per minute"""
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit / 60)
+        self._refilled = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        return False
+
+class RuleEngine:
+    """Evaluates scan events against indexed rules and dispatches alerts"""
+
+    def __init__(self, rules=(), sinks=()):
+        self.sinks = list(sinks)
+        self.suppressed = 0
+        self._last_fired = {}
+        self.load(rules)
+
+    def load(self, definitions):
+        """Compile and index a list of rule definitions; raises RuleError"""
+        rules = [CompiledRule(d) for d in definitions]
+        index = {kind: {'bssid': {}, 'prefix': {}, 'ssid': {}, 'encryption': {}, 'any': []} for kind in EVENT_TYPES}
+        for rule in rules:
+            for kind in rule.events:
+                buckets = index[kind]
+                key = rule.index_key
+                if key is None:
+                    buckets['any'].append(rule)
+                elif key[0] == 'prefix':
+                    buckets['prefix'].setdefault(key[1], {}).setdefault(key[2], []).append(rule)
+                else:
+                    buckets[key[0]].setdefault(key[1], []).append(rule)
+        self.rules = rules
+        self._index = index
+        self._last_fired = {}
+        return len(rules)
+
+    def candidates(self, event):
+        """Rules that could match this event, from the index"""
+        buckets = self._index[event.kind]
+        record = event.record
+        bssid = event.bssid_int
+        found = list(buckets['any'])
+        found.extend(buckets['bssid'].get(bssid, ()))
+        for bits, prefixes in buckets['prefix'].items():
+            found.extend(prefixes.get(bssid >> (48 - bits), ()))
+        if record is not None:
+            found.extend(buckets['ssid'].get(record.get('essid'), ()))
+            found.extend(buckets['encryption'].get(record.get('privacy'), ()))
+        return found
+
+    def evaluate(self, events, now=None):
+        """Return the alerts raised by a batch of events, after dedup and rate limiting"""
+        wall = now if now is not None else time.time()
+        mono = time.monotonic()
+        alerts = []
+        for event in events:
+            record = event.record
+            for rule in self.candidates(event):
+                if not rule.predicate(event, record):
+                    continue
+                key = (rule.name, event.bssid_int)
+                last = self._last_fired.get(key)
+                if last is not None and wall - last < rule.cooldown:
+                    self.suppressed += 1
+                    continue
+                if not rule.take_token(mono):
+                    self.suppressed += 1
+                    continue
+                self._last_fired[key] = wall
+                alerts.append(self._alert(rule, event, wall))
+        if len(self._last_fired) > MAX_DEDUP_KEYS:
+            self._prune(wall)
+        for alert in alerts:
+            for sink in self.sinks:
+                try:
+                    sink.send(alert)
+                except Exception as e:
+                    logger.error(f"Alert sink {type(sink).__name__} failed: {e}")
+        return alerts
+
+    def _prune(self, now):
+        longest = max((rule.cooldown for rule in self.rules), default=0)
+        self._last_fired = {key: fired for key, fired in self._last_fired.items() if now - fired < longest}
+
+    def _alert(self, rule, event, timestamp):
+        record = event.record
+        return {
+            'rule': rule.name,
+            'severity': rule.severity,
+            'event': event.kind,
+            'bssid': int_to_mac(event.bssid_int),
+            'ssid': record.get('essid') if record is not None else None,
+            'encryption': record.get('privacy') if record is not None else None,
+            'channel': record.get('channel') if record is not None else None,
+            'power': record.get('power') if record is not None else None,
+            'previous': event.previous,
+            'timestamp': timestamp
+        }
+
+class SpoolSink:
+    """Appends alerts as JSON lines to a local spool file"""
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, 'alerts.jsonl')
+        self._lock = threading.Lock()
+
+    def send(self, alert):
+        line = json.dumps(alert, default=str) + '\n'
+        with self._lock, open(self.path, 'a') as f:
+            f.write(line)
+
+class WebhookSink:
+    """POSTs alerts as JSON to a URL from a background thread"""
+
+    def __init__(self, url, timeout=5, max_queue=1000):
+        self.url = url
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def send(self, alert):
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            logger.warning('Webhook queue full; dropping alert')
+
+    def _run(self):
+        import urllib.request
+
+        while True:
+            alert = self._queue.get()
+            body = json.dumps(alert, default=str).encode()
+            req = urllib.request.Request(self.url, data=body, headers={'Content-Type': 'application/json'})
+            try:
+                urllib.request.urlopen(req, timeout=self.timeout).close()
+            except Exception as e:
+                logger.error(f"Webhook delivery failed: {e}")
+
+def sinks_from_env():
+    """Spool to ALERT_SPOOL_DIR (default: temp dir) and post to ALERT_WEBHOOK_URL if set"""
+    import tempfile
+
+    sinks = [SpoolSink(os.environ.get('ALERT_SPOOL_DIR') or os.path.join(tempfile.gettempdir(), 'wifi-alerts'))]
+    if os.environ.get('ALERT_WEBHOOK_URL'):
+        sinks.append(WebhookSink(os.environ['ALERT_WEBHOOK_URL']))
+    return sinks
+
+def load_rules_file(path):
+    with open(path) as f:
+        return json.load(f)
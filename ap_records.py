@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Compact Survey Records
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+__slots__ records for access points and stations. MAC addresses are held
+as 48-bit integers and repeated strings (ESSIDs, security labels,
+timestamps) and small integers are shared, so large surveys can be kept in
+memory. Dicts are only built by to_dict() when results are serialized.
+network_columns() maps a record onto the networks table's columns, for
+both the server's ingest and the mobile app's local cache.
+"""
+
+import sys
+from oui_db import lookup_vendor
+
+# Canonical int objects for the ranges power, channel and counters fall in;
+# int() returns a fresh object for anything outside CPython's -5..256 cache
+_SMALL_INTS = {i: i for i in range(-128, 4096)}
+_intern = sys.intern
+
+def small_int(value):
+    """Return a shared int object for common small values"""
+    return _SMALL_INTS.get(value, value)
+
+def intern_text(value):
+    """Return a shared copy of a frequently repeated string"""
+    return _intern(value) if value else ''
+
+def mac_to_int(mac):
+    return int(mac.replace(':', '').replace('-', ''), 16)
+
+def int_to_mac(value):
+    raw = '%012X' % value
+    return f'{raw[0:2]}:{raw[2:4]}:{raw[4:6]}:{raw[6:8]}:{raw[8:10]}:{raw[10:12]}'
+
+class _Record:
+    """Read-only mapping access so records can stand in for the old dicts"""
+    __slots__ = ()
+    FIELDS = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+class APRecord(_Record):
+    """One access point row from a scan"""
+    __slots__ = ('bssid_int', 'essid', 'channel', 'power', 'speed', 'privacy', 'cipher',
+                 'authentication', 'beacons', 'ivs', 'lan_ip', 'id_length',
+                 'first_seen', 'last_seen', 'wps', 'wps_locked', 'manufacturer', 'model', 'vendor_ouis')
+    FIELDS = ('bssid', 'essid', 'channel', 'power', 'speed', 'privacy', 'encryption', 'cipher',
+              'authentication', 'beacons', 'ivs', 'lan_ip', 'id_length', 'first_seen',
+              'last_seen', 'wps', 'wps_locked', 'manufacturer', 'model', 'vendor_ouis')
+
+    def __init__(self, bssid_int, essid, channel, power, speed, privacy, cipher, authentication,
+                 beacons, ivs, lan_ip, id_length, first_seen, last_seen):
+        self.bssid_int = bssid_int
+        self.essid = essid
+        self.channel = channel
+        self.power = power
+        self.speed = speed
+        self.privacy = privacy
+        self.cipher = cipher
+        self.authentication = authentication
+        self.beacons = beacons
+        self.ivs = ivs
+        self.lan_ip = lan_ip
+        self.id_length = id_length
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+        # Only known when beacons were captured, not from airodump CSV
+        self.wps = None
+        self.wps_locked = None
+        self.manufacturer = None
+        self.model = None
+        self.vendor_ouis = ()
+
+    @property
+    def bssid(self):
+        return int_to_mac(self.bssid_int)
+
+    @property
+    def encryption(self):
+        return self.privacy
+
+    def __repr__(self):
+        return f'<APRecord {self.bssid} {self.essid!r}>'
+
+class StationRecord(_Record):
+    """One station row from a scan"""
+    __slots__ = ('mac_int', 'bssid_int', 'power', 'packets', 'probed_essids', 'first_seen', 'last_seen')
+    FIELDS = ('mac', 'bssid', 'power', 'packets', 'probed_essids', 'first_seen', 'last_seen')
+
+    def __init__(self, mac_int, bssid_int, power, packets, probed_essids, first_seen, last_seen):
+        self.mac_int = mac_int
+        self.bssid_int = bssid_int
+        self.power = power
+        self.packets = packets
+        self.probed_essids = probed_essids
+        self.first_seen = first_seen
+        self.last_seen = last_seen
+
+    @property
+    def mac(self):
+        return int_to_mac(self.mac_int)
+
+    @property
+    def bssid(self):
+        return int_to_mac(self.bssid_int) if self.bssid_int is not None else None
+
+    def __repr__(self):
+        return f'<StationRecord {self.mac} -> {self.bssid}>'
+
+def to_dicts(records):
+    """Serialize records (or pass through dicts) for JSON responses"""
+    return [r.to_dict() if isinstance(r, _Record) else r for r in records]
+
+# Columns refreshed when a known network is seen again; the rest keep their first-seen values
+UPDATED_COLUMNS = ('ssid', 'channel', 'encryption', 'signal_strength', 'wps_enabled', 'wps_locked', 'manufacturer')
+# Columns network_columns() leaves out when the scan did not report them
+OPTIONAL_COLUMNS = ('wps_enabled', 'wps_locked', 'manufacturer')
+
+def network_columns(network_data):
+    """Network row values for one scan record (APRecord or dict)"""
+    bssid = network_data.get('bssid')
+    columns = {
+        'bssid': bssid,
+        'ssid': network_data.get('essid', ''),
+        'channel': network_data.get('channel'),
+        'encryption': network_data.get('privacy', ''),
+        'signal_strength': network_data.get('power')
+    }
+    # WPS and device details are only present when beacons were parsed
+    if network_data.get('wps') is not None:
+        columns['wps_enabled'] = network_data.get('wps')
+        columns['wps_locked'] = network_data.get('wps_locked', False)
+    manufacturer = network_data.get('manufacturer') or lookup_vendor(bssid)
+    if manufacturer:
+        columns['manufacturer'] = manufacturer
+    return columns
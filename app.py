@@ -6,53 +6,200 @@ Developer: SHAKIR HOSSAIN
 Website: https://shakir.com.bd
 """
 
-from flask import Flask, render_template, jsonify, request, session as flask_session
-from flask_migrate import Migrate
+from flask import Flask, Blueprint, Response, current_app, g, render_template, jsonify, request, send_file, session as flask_session
 import os
 import sys
 import subprocess
+import hmac
 import json
 import threading
 import time
 from datetime import datetime
 import uuid
-from wifi_manager import WiFiManager
-from system_utils import SystemUtils
-from models import db, Network, ScanResult, AttackLog, SystemStatus, Session
+from models import db, Network, ScanResult, AttackLog, SystemStatus, Session, Station, Association, RoamEvent, TrustedNetwork, SCHEMA_VERSION, SCHEMA_MIGRATIONS
+from sqlalchemy.schema import CreateIndex
+from ap_records import to_dicts, network_columns, UPDATED_COLUMNS
+from state_store import StateStore
+import tempfile
+# The scan pipeline (pcap_reader, scan_diff, twin_detector, alert_rules,
+# association_graph), iface_watcher, metrics and tracing are imported where
+# they are first used, so a worker only loads what its requests need
 import logging
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = Flask(__name__)
-app.secret_key = os.environ.get("FLASK_SECRET_KEY") or "wifi-security-tool-key"
+bp = Blueprint('main', __name__)
+state = StateStore()
+RECENT_EVENTS = 500
+# Created on the first scan, see get_scan_diff() and get_twin_index()
+_scan_diff = None
+_twin_index = None
+_trusted_version = None
+# run_scan/run_import threads share the scan diff and twin index
+_scan_lock = threading.Lock()
+_alert_engine = None
+_alert_rules = None
 
-# Database configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
-app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
-    "pool_recycle": 300,
-    "pool_pre_ping": True,
-}
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Per-process instances, created on first use; anything other workers need
+# to see lives in `state`
+_wifi_manager = None
+_system_utils = None
+_schema_checked = False
 
-# Initialize extensions
-db.init_app(app)
-migrate = Migrate(app, db)
+def create_app(config=None):
+    """Create and configure the Flask application"""
+    app = Flask(__name__)
+    app.secret_key = os.environ.get("FLASK_SECRET_KEY") or "wifi-security-tool-key"
+    
+    # Database configuration
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        "pool_recycle": 300,
+        "pool_pre_ping": True,
+    }
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    if config:
+        app.config.update(config)
+    
+    # Initialize extensions
+    db.init_app(app)
+    app.register_blueprint(bp)
+    
+    # Flask-Migrate is only needed for the `flask db` commands
+    if os.environ.get('ENABLE_MIGRATIONS') or os.path.basename(sys.argv[0]) == 'flask':
+        from flask_migrate import Migrate
+        Migrate(app, db)
+    
+    return app
+
+def get_wifi_manager():
+    """Get this worker's WiFiManager, creating it on first use"""
+    global _wifi_manager
+    if _wifi_manager is None:
+        from wifi_manager import WiFiManager
+        _wifi_manager = WiFiManager()
+    return _wifi_manager
+
+def get_system_utils():
+    """Get this worker's SystemUtils, creating it on first use"""
+    global _system_utils
+    if _system_utils is None:
+        from system_utils import SystemUtils
+        _system_utils = SystemUtils()
+    return _system_utils
+
+def ensure_schema():
+    """Create and migrate tables only when the stored schema version is out of date"""
+    global _schema_checked
+    if _schema_checked:
+        return
+    has_state = db.inspect(db.engine).has_table('app_state')
+    version = state.get('schema_version') if has_state else None
+    if version != SCHEMA_VERSION:
+        db.create_all()
+        # Databases from before the version stamp count as version 1
+        migrate_schema(version or 1)
+        state.set('schema_version', SCHEMA_VERSION)
+        logger.info(f"Database schema initialized (version {SCHEMA_VERSION}, was {version})")
+    _schema_checked = True
+
+def _add_column(conn, column):
+    """ALTER TABLE ... ADD COLUMN unless the column exists; existing rows get its default"""
+    table = column.table
+    if column.name in {c['name'] for c in db.inspect(conn).get_columns(table.name)}:
+        return
+    preparer = conn.dialect.identifier_preparer
+    conn.execute(db.text(f'ALTER TABLE {preparer.format_table(table)} ADD COLUMN '
+                         f'{preparer.format_column(column)} {column.type.compile(conn.dialect)}'))
+    if column.default is not None and column.default.is_scalar:
+        conn.execute(table.update().values({column.name: column.default.arg}))
+
+def migrate_schema(from_version):
+    """Add the columns and indexes create_all() does not add to tables that already exist"""
+    indexes = {index.name: index for table in db.metadata.tables.values() for index in table.indexes}
+    with db.engine.begin() as conn:
+        for version in range(from_version + 1, SCHEMA_VERSION + 1):
+            for name in SCHEMA_MIGRATIONS.get(version, ()):
+                table, _, column = name.partition('.')
+                if column:
+                    _add_column(conn, db.metadata.tables[table].c[column])
+                else:
+                    conn.execute(CreateIndex(indexes[name], if_not_exists=True))
+                logger.info(f"Schema migration {version}: added {name}")
+
+@bp.before_app_request
+def check_schema():
+    """Run the schema check once per worker, on its first request"""
+    if not _schema_checked:
+        ensure_schema()
 
-# Global instances
-wifi_manager = WiFiManager()
-system_utils = SystemUtils()
+@bp.before_app_request
+def start_request_timer():
+    import metrics
+    from tracing import tracer, profiler
+    g.request_start = time.perf_counter()
+    if metrics.multiprocess:
+        metrics.multiprocess.start()
+    if tracer.enabled:
+        g.request_span = tracer.span(f'{request.method} {request.path}', 'http').__enter__()
+    if profiler.armed:
+        g.request_profile = profiler.begin()
 
-# Global state
-scan_results = []
-monitor_mode_active = False
-current_operation = None
+@bp.after_app_request
+def record_request_metrics(response):
+    """Record request latency by route template"""
+    import metrics
+    start = g.get('request_start')
+    if start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        metrics.REQUEST_DURATION.labels(request.method, route, response.status_code).observe(
+            time.perf_counter() - start)
+    return response
 
-# Initialize database
-with app.app_context():
-    db.create_all()
-    logger.info("Database initialized")
+@bp.teardown_app_request
+def finish_request_trace(exc):
+    """Close the request span and profile opened in start_request_timer"""
+    profile = g.pop('request_profile', None)
+    if profile is not None:
+        from tracing import profiler
+        profiler.end(profile)
+    span = g.pop('request_span', None)
+    if span is not None:
+        span.__exit__(type(exc) if exc else None, exc, None)
+
+def set_operation(message, clear_after=None):
+    """Publish the current operation, optionally clearing it after a delay"""
+    state.set('current_operation', message)
+    if clear_after:
+        time.sleep(clear_after)
+        state.set('current_operation', None)
+
+def sync_wifi_manager():
+    """Point this worker's WiFiManager at the shared monitor interface"""
+    wifi_manager = get_wifi_manager()
+    wifi_manager.monitor_interface = state.get('monitor_interface')
+    wifi_manager.monitor_method = state.get('monitor_method')
+    return wifi_manager
+
+def run_in_background(target, *args):
+    """Run target in a daemon thread inside an application context"""
+    import metrics
+    app = current_app._get_current_object()
+    
+    def runner():
+        metrics.JOB_QUEUE_DEPTH.inc()
+        try:
+            with app.app_context():
+                target(*args)
+        finally:
+            metrics.JOB_QUEUE_DEPTH.dec()
+    
+    thread = threading.Thread(target=runner)
+    thread.daemon = True
+    thread.start()
+    return thread
 
 def get_or_create_session():
     """Get or create a session for the current user"""
@@ -70,18 +217,18 @@ def get_or_create_session():
     
     return flask_session['session_id']
 
-def log_system_status():
+def log_system_status(current):
     """Log current system status to database"""
     try:
-        interfaces = wifi_manager.get_wireless_interfaces()
+        interfaces = get_wifi_manager().get_wireless_interfaces()
         active_interface = interfaces[0] if interfaces else None
         
         status = SystemStatus(
-            root_access=system_utils.check_root(),
-            monitor_mode_active=monitor_mode_active,
+            root_access=get_system_utils().check_root(),
+            monitor_mode_active=current['monitor_mode_active'],
             active_interface=active_interface,
-            dependencies_installed=system_utils.check_dependencies(),
-            current_operation=current_operation,
+            dependencies_installed=get_system_utils().check_dependencies(),
+            current_operation=current['current_operation'],
             system_info={
                 'os': sys.platform,
                 'python_version': sys.version.split()[0]
@@ -92,27 +239,169 @@ def log_system_status():
     except Exception as e:
         logger.error(f"Failed to log system status: {e}")
 
-@app.route('/')
+def ingest_scan_results(scan_results, session_id, stations=None):
+    """Store a batch of scan results, and their client stations, in the database"""
+    from tracing import tracer
+    with tracer.span('ingest_scan', 'db'):
+        return _ingest_scan_results(scan_results, session_id, stations)
+
+def _ingest_scan_results(scan_results, session_id, stations):
+    import metrics
+    ingest_start = time.perf_counter()
+    seen_at = datetime.utcnow()
+    network_ids = {}
+    for network_data in scan_results:
+        # Find or create network record
+        columns = network_columns(network_data)
+        network = Network.query.filter_by(bssid=columns['bssid']).first()
+        if not network:
+            network = Network(**columns)
+            db.session.add(network)
+        else:
+            network.last_seen = seen_at
+            for column in UPDATED_COLUMNS:
+                if column in columns:
+                    setattr(network, column, columns[column])
+        
+        if network.id is None:
+            db.session.flush()  # Get the ID
+        network_ids[network.bssid] = network.id
+        
+        # Create scan result record
+        scan_result = ScanResult(
+            network_id=network.id,
+            signal_strength=network_data.get('power'),
+            scan_type='passive'
+        )
+        db.session.add(scan_result)
+    
+    if stations:
+        import association_graph
+        association_graph.ingest_stations(stations, network_ids, seen_at)
+    
+    db.session.commit()
+    metrics.INGEST_DURATION.observe(time.perf_counter() - ingest_start)
+    metrics.INGEST_BATCH_SIZE.observe(len(scan_results))
+
+def get_scan_diff():
+    """This worker's scan diff, created with its subscribers on first use"""
+    global _scan_diff
+    if _scan_diff is None:
+        from scan_diff import ScanDiff
+        diff = ScanDiff(absence_window=float(os.environ.get('SCAN_ABSENCE_SECONDS', 60)),
+                        rssi_threshold=int(os.environ.get('SCAN_RSSI_THRESHOLD', 10)))
+        for callback in (publish_scan_events, check_evil_twins, run_alert_rules):
+            diff.subscribe(callback)
+        _scan_diff = diff
+    return _scan_diff
+
+def get_twin_index():
+    """This worker's evil-twin index, created on first use"""
+    global _twin_index
+    if _twin_index is None:
+        from twin_detector import TwinIndex
+        _twin_index = TwinIndex()
+    return _twin_index
+
+def apply_scan(records):
+    """Diff a scan against the shared baseline, then notify the subscribers"""
+    events = []
+    
+    with _scan_lock:
+        scan_diff = get_scan_diff()
+        
+        def apply(baseline):
+            # The baseline row stays locked until commit, so scans from other
+            # workers are diffed one after another against the same history
+            scan_diff.load(baseline)
+            events.extend(scan_diff.update(records, publish=False))
+            return scan_diff.dump()
+        
+        state.modify('scan_baseline', apply)
+        if events:
+            scan_diff.publish(events)
+    return events
+
+def publish_scan_events(events):
+    """Count scan diff events and keep the most recent ones for /api/scan/events"""
+    import metrics
+    for event in events:
+        metrics.SCAN_EVENTS.labels(event.kind).inc()
+    new = [event.to_dict() for event in events[-RECENT_EVENTS:]]
+    state.modify('scan_events', lambda recent: (recent + new)[-RECENT_EVENTS:])
+
+def check_evil_twins(events):
+    """Update the SSID index and publish APs impersonating our trusted SSIDs"""
+    import metrics
+    twin_index = get_twin_index()
+    raised = []
+    
+    def apply(baseline):
+        # Start from the shared index so every worker flags against the same APs
+        global _trusted_version
+        twin_index.load(baseline)
+        version = state.get('trusted_version')
+        if version != _trusted_version:
+            twin_index.load_trusted(TrustedNetwork.query.all())
+            _trusted_version = version
+        raised.extend(twin_index.on_scan_events(events))
+        return twin_index.dump()
+    
+    state.modify('twin_baseline', apply)
+    for finding in raised:
+        metrics.ROGUE_AP_ALERTS.labels(finding['severity']).inc()
+        logger.warning(f"Possible evil twin of {finding['ssid']}: {finding['bssid']} ({', '.join(finding['reasons'])})")
+    state.set('rogue_aps', twin_index.suspicious())
+
+def get_alert_engine():
+    """This worker's rule engine, recompiled whenever the shared rule set changes"""
+    from alert_rules import RuleEngine, sinks_from_env, load_rules_file
+    global _alert_engine, _alert_rules
+    rules = state.get('alert_rules')
+    if rules is None:
+        path = os.environ.get('ALERT_RULES_FILE')
+        rules = load_rules_file(path) if path else []
+    if _alert_engine is None:
+        _alert_engine = RuleEngine(sinks=sinks_from_env())
+    if rules != _alert_rules:
+        _alert_engine.load(rules)
+        _alert_rules = rules
+    return _alert_engine
+
+def run_alert_rules(events):
+    """Evaluate alert rules against a batch of scan events"""
+    import metrics
+    alerts = get_alert_engine().evaluate(events)
+    if alerts:
+        for alert in alerts:
+            metrics.RULE_ALERTS.labels(alert['severity']).inc()
+        state.modify('alerts', lambda recent: (recent + alerts)[-RECENT_EVENTS:])
+
+@bp.route('/')
 def index():
     """Main interface page"""
     return render_template('index.html')
 
-@app.route('/database')
+@bp.route('/database')
 def database_dashboard():
     """Database dashboard page"""
     return render_template('database.html')
 
-@app.route('/api/status')
+@bp.route('/api/status')
 def get_status():
     """Get system and application status"""
     try:
         session_id = get_or_create_session()
-        root_access = system_utils.check_root()
-        monitor_capable = system_utils.check_monitor_capability()
-        dependencies = system_utils.check_dependencies()
+        root_access = get_system_utils().check_root()
+        monitor_capable = get_system_utils().check_monitor_capability()
+        wireless = get_system_utils().get_wireless_capabilities()
+        from iface_watcher import get_watcher
+        interfaces = get_watcher().interfaces()
+        dependencies = get_system_utils().check_dependencies()
+        current = state.snapshot('monitor_mode_active', 'current_operation', 'scan_results')
         
         # Log system status periodically
-        log_system_status()
+        log_system_status(current)
         
         # Get network count from database
         network_count = Network.query.count()
@@ -125,10 +414,12 @@ def get_status():
             'session_id': session_id,
             'root_access': root_access,
             'monitor_capable': monitor_capable,
+            'wireless': wireless,
+            'interfaces': interfaces,
             'dependencies': dependencies,
-            'monitor_mode_active': monitor_mode_active,
-            'current_operation': current_operation,
-            'networks_found': len(scan_results),
+            'monitor_mode_active': current['monitor_mode_active'],
+            'current_operation': current['current_operation'],
+            'networks_found': len(current['scan_results']),
             'networks_in_db': network_count,
             'scans_today': recent_scans
         })
@@ -136,11 +427,11 @@ def get_status():
         logger.error(f"Status check error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/setup', methods=['POST'])
+@bp.route('/api/setup', methods=['POST'])
 def setup_system():
     """Setup system dependencies"""
     try:
-        if not system_utils.check_root():
+        if not get_system_utils().check_root():
             return jsonify({
                 'success': False, 
                 'error': 'Root access required for system setup'
@@ -148,21 +439,14 @@ def setup_system():
         
         # Run setup in background thread
         def run_setup():
-            global current_operation
-            current_operation = 'Installing dependencies...'
+            set_operation('Installing dependencies...')
             try:
-                system_utils.install_dependencies()
-                current_operation = 'Setup completed successfully'
-                time.sleep(3)
-                current_operation = None
+                get_system_utils().install_dependencies()
+                set_operation('Setup completed successfully', clear_after=3)
             except Exception as e:
-                current_operation = f'Setup failed: {str(e)}'
-                time.sleep(5)
-                current_operation = None
+                set_operation(f'Setup failed: {str(e)}', clear_after=5)
         
-        thread = threading.Thread(target=run_setup)
-        thread.daemon = True
-        thread.start()
+        run_in_background(run_setup)
         
         return jsonify({'success': True, 'message': 'Setup started in background'})
         
@@ -170,125 +454,211 @@ def setup_system():
         logger.error(f"Setup error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/monitor/toggle', methods=['POST'])
+@bp.route('/api/monitor/toggle', methods=['POST'])
 def toggle_monitor_mode():
     """Toggle monitor mode on/off"""
-    global monitor_mode_active, current_operation
-    
     try:
-        if not system_utils.check_root():
+        if not get_system_utils().check_root():
             return jsonify({
                 'success': False, 
                 'error': 'Root access required for monitor mode'
             })
         
-        current_operation = 'Toggling monitor mode...'
+        set_operation('Toggling monitor mode...')
+        wifi_manager = sync_wifi_manager()
         
-        if monitor_mode_active:
+        if state.get('monitor_mode_active'):
             # Disable monitor mode
             result = wifi_manager.disable_monitor_mode()
             monitor_mode_active = False
             message = 'Monitor mode disabled'
         else:
-            # Enable monitor mode
-            result = wifi_manager.enable_monitor_mode()
+            # Enable monitor mode; the body may pick 'vif' or 'airmon' over MONITOR_METHOD
+            data = request.get_json(silent=True) or {}
+            result = wifi_manager.enable_monitor_mode(method=data.get('method'))
             monitor_mode_active = result
             message = 'Monitor mode enabled' if result else 'Failed to enable monitor mode'
         
-        current_operation = None
+        state.update(
+            monitor_mode_active=monitor_mode_active,
+            monitor_interface=wifi_manager.monitor_interface,
+            monitor_method=wifi_manager.monitor_method,
+            current_operation=None
+        )
         
         return jsonify({
             'success': result or not monitor_mode_active,
             'monitor_active': monitor_mode_active,
+            'monitor_interface': wifi_manager.monitor_interface,
+            'monitor_method': wifi_manager.monitor_method,
             'message': message
         })
         
     except Exception as e:
-        current_operation = None
+        state.set('current_operation', None)
         logger.error(f"Monitor mode toggle error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/scan', methods=['POST'])
+@bp.route('/api/scan', methods=['POST'])
 def scan_networks():
     """Scan for WiFi networks"""
-    global scan_results, current_operation
-    
     try:
-        if not monitor_mode_active:
+        from wifi_manager import SCAN_BACKENDS
+        
+        # The body may pick 'airodump' or 'managed' over SCAN_BACKEND
+        data = request.get_json(silent=True) or {}
+        if data.get('backend') is not None and data['backend'] not in SCAN_BACKENDS:
+            return jsonify({
+                'success': False,
+                'error': f"Unknown scan backend {data['backend']!r}; expected one of {', '.join(SCAN_BACKENDS)}"
+            }), 400
+        backend = sync_wifi_manager().resolve_scan_backend(data.get('backend'))
+        if backend == 'airodump' and not state.get('monitor_mode_active'):
             return jsonify({
                 'success': False, 
                 'error': 'Monitor mode must be enabled for scanning'
             })
         
-        current_operation = 'Scanning for networks...'
+        set_operation('Scanning for networks...')
+        session_id = get_or_create_session()
         
         # Run scan in background thread
         def run_scan():
-            global scan_results, current_operation
             try:
-                scan_results = wifi_manager.scan_networks()
-                
-                # Store scan results in database
-                session_id = get_or_create_session()
-                for network_data in scan_results:
-                    # Find or create network record
-                    network = Network.query.filter_by(bssid=network_data.get('bssid')).first()
-                    if not network:
-                        network = Network(
-                            bssid=network_data.get('bssid'),
-                            ssid=network_data.get('essid', ''),
-                            channel=network_data.get('channel'),
-                            encryption=network_data.get('privacy', ''),
-                            signal_strength=network_data.get('power'),
-                            wps_enabled=network_data.get('wps', False),
-                            wps_locked=network_data.get('locked', False)
-                        )
-                        db.session.add(network)
-                        db.session.flush()  # Get the ID
-                    
-                    # Create scan result record
-                    scan_result = ScanResult(
-                        network_id=network.id,
-                        session_id=session_id,
-                        signal_strength=network_data.get('power'),
-                        scan_data=network_data
-                    )
-                    db.session.add(scan_result)
+                scan_results = sync_wifi_manager().scan_networks(backend=backend)
                 
-                db.session.commit()
-                current_operation = f'Found {len(scan_results)} networks (saved to database)'
-                time.sleep(2)
-                current_operation = None
+                ingest_scan_results(scan_results, session_id, stations=get_wifi_manager().last_stations)
+                apply_scan(scan_results)
+                state.set('scan_results', to_dicts(scan_results))
+                set_operation(f'Found {len(scan_results)} networks (saved to database)', clear_after=2)
             except Exception as e:
                 db.session.rollback()
-                current_operation = f'Scan failed: {str(e)}'
-                time.sleep(3)
-                current_operation = None
+                set_operation(f'Scan failed: {str(e)}', clear_after=3)
         
-        thread = threading.Thread(target=run_scan)
-        thread.daemon = True
-        thread.start()
+        run_in_background(run_scan)
         
-        return jsonify({'success': True, 'message': 'Scan started'})
+        return jsonify({'success': True, 'message': 'Scan started', 'backend': backend})
         
     except Exception as e:
-        current_operation = None
+        state.set('current_operation', None)
         logger.error(f"Scan error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/networks')
+@bp.route('/api/import/capture', methods=['POST'])
+def import_capture():
+    """Import a pcap/pcapng survey (uploaded, or a server-side path for admins)"""
+    try:
+        upload = request.files.get('capture')
+        if upload:
+            fd, path = tempfile.mkstemp(suffix='.pcap', prefix='wifi-import-')
+            os.close(fd)
+            upload.save(path)
+            cleanup = True
+        else:
+            data = request.get_json(silent=True) or {}
+            path = data.get('path')
+            if not path:
+                return jsonify({'success': False, 'error': 'Capture file or path required'})
+            if not is_admin_request():
+                return jsonify({'success': False, 'error': 'Admin access required'}), 403
+            if not os.path.isfile(path):
+                return jsonify({'success': False, 'error': 'Capture file not found'})
+            cleanup = False
+        
+        set_operation('Importing capture...')
+        session_id = get_or_create_session()
+        
+        def run_import():
+            try:
+                from pcap_reader import read_capture
+                networks, stations = read_capture(path)
+                ingest_scan_results(networks, session_id, stations=stations)
+                apply_scan(networks)
+                state.set('scan_results', to_dicts(networks))
+                set_operation(f'Imported {len(networks)} networks, {len(stations)} stations', clear_after=2)
+            except Exception as e:
+                db.session.rollback()
+                set_operation(f'Import failed: {str(e)}', clear_after=3)
+            finally:
+                if cleanup:
+                    os.unlink(path)
+        
+        run_in_background(run_import)
+        
+        return jsonify({'success': True, 'message': 'Import started'})
+        
+    except Exception as e:
+        state.set('current_operation', None)
+        logger.error(f"Capture import error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/metrics')
+def get_metrics():
+    """Prometheus metrics summed over all workers (METRICS_MULTIPROC_DIR), else this worker's"""
+    import metrics
+    body = metrics.multiprocess.render() if metrics.multiprocess else metrics.registry.render()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@bp.route('/api/networks')
 def get_networks():
     """Get scanned networks"""
     return jsonify({
         'success': True,
-        'networks': scan_results
+        'networks': state.get('scan_results')
+    })
+
+@bp.route('/api/scan/events')
+def get_scan_events():
+    """Get recent appeared/disappeared/changed/RSSI events, optionally after a timestamp"""
+    events = state.get('scan_events')
+    since = request.args.get('since', type=float)
+    if since is not None:
+        events = [event for event in events if event['timestamp'] > since]
+    return jsonify({
+        'success': True,
+        'events': events
     })
 
-@app.route('/api/attack', methods=['POST'])
+@bp.route('/api/alerts')
+def get_alerts():
+    """Get recent alerts raised by alert rules, optionally after a timestamp"""
+    alerts = state.get('alerts')
+    since = request.args.get('since', type=float)
+    if since is not None:
+        alerts = [alert for alert in alerts if alert['timestamp'] > since]
+    return jsonify({
+        'success': True,
+        'alerts': alerts
+    })
+
+@bp.route('/api/alerts/rules', methods=['GET', 'POST'])
+def alert_rules():
+    """Get the alert rule set, or replace it (admin)"""
+    from alert_rules import RuleEngine, RuleError
+    try:
+        if request.method == 'GET':
+            return jsonify({'success': True, 'rules': state.get('alert_rules') or []})
+        
+        if not is_admin_request():
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        
+        rules = (request.get_json() or {}).get('rules')
+        if not isinstance(rules, list):
+            return jsonify({'success': False, 'error': 'rules must be a list'})
+        # Compile before storing so a bad rule never reaches the workers
+        count = len(RuleEngine(rules).rules)
+        state.set('alert_rules', rules)
+        
+        return jsonify({'success': True, 'message': f'{count} alert rules loaded'})
+    except RuleError as e:
+        return jsonify({'success': False, 'error': str(e)})
+    except Exception as e:
+        logger.error(f"Alert rules error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/attack', methods=['POST'])
 def attack_network():
     """Attack selected network"""
-    global current_operation
-    
     try:
         data = request.get_json()
         bssid = data.get('bssid')
@@ -297,17 +667,17 @@ def attack_network():
         if not bssid:
             return jsonify({'success': False, 'error': 'BSSID required'})
         
-        if not monitor_mode_active:
+        if not state.get('monitor_mode_active'):
             return jsonify({
                 'success': False, 
                 'error': 'Monitor mode must be enabled for attacks'
             })
         
+        session_id = get_or_create_session()
+        
         # Run attack in background thread
         def run_attack():
-            global current_operation
-            current_operation = f'Attacking {essid or bssid}...'
-            session_id = get_or_create_session()
+            set_operation(f'Attacking {essid or bssid}...')
             attack_log = None
             
             try:
@@ -331,7 +701,7 @@ def attack_network():
                 db.session.flush()
                 
                 # Perform the attack
-                result = wifi_manager.attack_network(bssid, essid)
+                result = sync_wifi_manager().attack_network(bssid, essid)
                 
                 # Update attack log with results
                 attack_log.end_time = datetime.utcnow()
@@ -341,13 +711,12 @@ def attack_network():
                 if result['success']:
                     attack_log.successful_pin = result.get('pin', '')
                     attack_log.password_found = result.get('password', '')
-                    current_operation = f'Attack completed: {result.get("message", "")}'
+                    message = f'Attack completed: {result.get("message", "")}'
                 else:
-                    current_operation = f'Attack failed: {result.get("error", "")}'
+                    message = f'Attack failed: {result.get("error", "")}'
                 
                 db.session.commit()
-                time.sleep(5)
-                current_operation = None
+                set_operation(message, clear_after=5)
                 
             except Exception as e:
                 if attack_log:
@@ -358,37 +727,116 @@ def attack_network():
                 else:
                     db.session.rollback()
                     
-                current_operation = f'Attack error: {str(e)}'
-                time.sleep(5)
-                current_operation = None
+                set_operation(f'Attack error: {str(e)}', clear_after=5)
         
-        thread = threading.Thread(target=run_attack)
-        thread.daemon = True
-        thread.start()
+        run_in_background(run_attack)
         
         return jsonify({'success': True, 'message': 'Attack started'})
         
     except Exception as e:
-        current_operation = None
+        state.set('current_operation', None)
         logger.error(f"Attack error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/stop', methods=['POST'])
+@bp.route('/api/stop', methods=['POST'])
 def stop_operation():
     """Stop current operation"""
-    global current_operation
-    
     try:
-        wifi_manager.stop_current_operation()
-        current_operation = None
+        get_wifi_manager().stop_current_operation()
+        state.set('current_operation', None)
         return jsonify({'success': True, 'message': 'Operation stopped'})
     except Exception as e:
         logger.error(f"Stop operation error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
+# Admin diagnostics endpoints
+
+def is_admin_request():
+    """Allow only requests carrying ADMIN_TOKEN; with no token configured, nobody is admin"""
+    token = os.environ.get('ADMIN_TOKEN')
+    if not token:
+        return False
+    return hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), token.encode())
+
+@bp.route('/api/admin/trace', methods=['GET', 'POST'])
+def admin_trace():
+    """Start/stop span recording (POST) or download the Chrome trace (GET)"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    
+    from tracing import tracer
+    try:
+        if request.method == 'GET':
+            path = os.path.join(tempfile.gettempdir(), f'wifi-trace-{os.getpid()}.json')
+            tracer.write_chrome_trace(path)
+            return send_file(path, mimetype='application/json', as_attachment=True,
+                             download_name='trace.json')
+        
+        data = request.get_json(silent=True) or {}
+        if data.get('action', 'start') == 'stop':
+            tracer.stop()
+            message = f'Tracing stopped ({len(tracer.spans)} spans recorded)'
+        else:
+            tracer.start(seconds=data.get('seconds'))
+            message = 'Tracing started'
+        
+        return jsonify({'success': True, 'message': message, 'enabled': tracer.enabled})
+    except Exception as e:
+        logger.error(f"Trace control error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    """Arm cProfile/stack sampling (POST) or fetch the results (GET)"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    
+    from tracing import profiler, sampler
+    try:
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            mode = data.get('mode', 'cprofile')
+            if mode == 'sample':
+                started = sampler.start(seconds=data.get('seconds', 10),
+                                        interval=data.get('interval', 0.005))
+                if not started:
+                    return jsonify({'success': False, 'error': 'Sampler already running'})
+                message = 'Stack sampling started'
+            elif mode == 'cprofile':
+                if not data.get('requests') and not data.get('seconds'):
+                    return jsonify({'success': False, 'error': 'requests or seconds required'})
+                profiler.arm(requests=data.get('requests'), seconds=data.get('seconds'))
+                message = 'Profiling armed'
+            else:
+                return jsonify({'success': False, 'error': 'Invalid profiling mode'})
+            
+            return jsonify({'success': True, 'message': message})
+        
+        output = request.args.get('format', 'text')
+        if output == 'collapsed':
+            return Response(sampler.collapsed(), mimetype='text/plain')
+        if output == 'pstats':
+            path = profiler.dump(os.path.join(tempfile.gettempdir(), f'wifi-profile-{os.getpid()}.prof'))
+            if not path:
+                return jsonify({'success': False, 'error': 'No profile data collected'})
+            return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                             download_name='profile.prof')
+        
+        return jsonify({
+            'success': True,
+            'armed': profiler.armed,
+            'requests_profiled': profiler.profiled,
+            'sampling': sampler.running,
+            'samples': sampler.samples,
+            'report': profiler.report(sort=request.args.get('sort', 'cumulative'))
+        })
+    except Exception as e:
+        logger.error(f"Profile control error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
 # Database API Endpoints
 
-@app.route('/api/db/networks')
+@bp.route('/api/db/networks')
 def get_db_networks():
     """Get all networks from database"""
     try:
@@ -401,7 +849,7 @@ def get_db_networks():
         logger.error(f"Database networks error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/db/networks/<int:network_id>')
+@bp.route('/api/db/networks/<int:network_id>')
 def get_network_details(network_id):
     """Get detailed information about a specific network"""
     try:
@@ -419,7 +867,7 @@ def get_network_details(network_id):
         logger.error(f"Network details error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/db/attacks')
+@bp.route('/api/db/attacks')
 def get_attack_logs():
     """Get all attack logs from database"""
     try:
@@ -441,7 +889,7 @@ def get_attack_logs():
         logger.error(f"Attack logs error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/db/scans')
+@bp.route('/api/db/scans')
 def get_scan_results():
     """Get scan results from database"""
     try:
@@ -463,7 +911,147 @@ def get_scan_results():
         logger.error(f"Scan results error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/db/sessions')
+@bp.route('/api/db/stations')
+def get_stations():
+    """Get client stations, optionally only those seen on several APs"""
+    import association_graph
+    try:
+        min_aps = request.args.get('min_aps', 0, type=int)
+        limit = request.args.get('limit', 100, type=int)
+        if min_aps > 1:
+            stations = association_graph.roaming_stations(min_aps=min_aps, limit=limit)
+        else:
+            stations = Station.query.order_by(Station.last_seen.desc()).limit(limit).all()
+        return jsonify({
+            'success': True,
+            'stations': [station.to_dict() for station in stations]
+        })
+    except Exception as e:
+        logger.error(f"Stations error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/db/stations/<int:station_id>/roams')
+def get_station_roams(station_id):
+    """Get AP transitions recorded for a station"""
+    import association_graph
+    try:
+        station = Station.query.get_or_404(station_id)
+        return jsonify({
+            'success': True,
+            'station': station.to_dict(),
+            'roams': [roam.to_dict() for roam in association_graph.roam_history(station_id)]
+        })
+    except Exception as e:
+        logger.error(f"Station roams error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/db/networks/busiest')
+def get_busiest_networks():
+    """Get APs with the most distinct clients"""
+    import association_graph
+    try:
+        limit = request.args.get('limit', 20, type=int)
+        return jsonify({
+            'success': True,
+            'networks': [network.to_dict() for network in association_graph.busiest_aps(limit)]
+        })
+    except Exception as e:
+        logger.error(f"Busiest networks error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/db/networks/wps')
+def get_wps_networks():
+    """Get APs that still advertise WPS, optionally only unlocked ones"""
+    try:
+        query = Network.query.filter(Network.wps_enabled.is_(True))
+        if request.args.get('unlocked', 'false').lower() == 'true':
+            query = query.filter(Network.wps_locked.is_(False))
+        manufacturer = request.args.get('manufacturer')
+        if manufacturer:
+            query = query.filter(Network.manufacturer == manufacturer)
+        return jsonify({
+            'success': True,
+            'networks': [network.to_dict() for network in query.order_by(Network.last_seen.desc()).all()]
+        })
+    except Exception as e:
+        logger.error(f"WPS networks error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/db/networks/<int:network_id>/clients')
+def get_network_clients(network_id):
+    """Get stations associated with an AP"""
+    import association_graph
+    try:
+        current_only = request.args.get('current', 'false').lower() == 'true'
+        clients = association_graph.clients_of(network_id, current_only=current_only)
+        return jsonify({
+            'success': True,
+            'clients': [station.to_dict() for station in clients]
+        })
+    except Exception as e:
+        logger.error(f"Network clients error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/rogue')
+def get_rogue_aps():
+    """Get APs currently suspected of impersonating a trusted SSID"""
+    return jsonify({
+        'success': True,
+        'rogue_aps': state.get('rogue_aps')
+    })
+
+@bp.route('/api/db/trusted', methods=['GET', 'POST'])
+def trusted_networks():
+    """List allow-listed APs, or add one (admin)"""
+    try:
+        if request.method == 'GET':
+            return jsonify({
+                'success': True,
+                'trusted': [entry.to_dict() for entry in TrustedNetwork.query.order_by(TrustedNetwork.ssid).all()]
+            })
+        
+        if not is_admin_request():
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        
+        data = request.get_json() or {}
+        bssid = (data.get('bssid') or '').upper()
+        if not bssid or not data.get('ssid'):
+            return jsonify({'success': False, 'error': 'BSSID and SSID required'})
+        
+        entry = TrustedNetwork.query.filter_by(bssid=bssid).first() or TrustedNetwork(bssid=bssid)
+        entry.ssid = data['ssid']
+        entry.channel = data.get('channel')
+        entry.encryption = data.get('encryption')
+        entry.manufacturer = data.get('manufacturer')
+        entry.notes = data.get('notes')
+        db.session.add(entry)
+        db.session.commit()
+        state.set('trusted_version', (state.get('trusted_version') or 0) + 1)
+        
+        return jsonify({'success': True, 'trusted': entry.to_dict()})
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Trusted networks error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/db/trusted/<int:entry_id>', methods=['DELETE'])
+def delete_trusted_network(entry_id):
+    """Remove an AP from the allow-list (admin)"""
+    if not is_admin_request():
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+    
+    try:
+        entry = TrustedNetwork.query.get_or_404(entry_id)
+        db.session.delete(entry)
+        db.session.commit()
+        state.set('trusted_version', (state.get('trusted_version') or 0) + 1)
+        return jsonify({'success': True, 'message': f'Removed {entry.bssid} from trusted networks'})
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Trusted network delete error: {e}")
+        return jsonify({'success': False, 'error': str(e)})
+
+@bp.route('/api/db/sessions')
 def get_sessions():
     """Get user sessions from database"""
     try:
@@ -476,7 +1064,7 @@ def get_sessions():
         logger.error(f"Sessions error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/db/stats')
+@bp.route('/api/db/stats')
 def get_database_stats():
     """Get database statistics"""
     try:
@@ -485,6 +1073,7 @@ def get_database_stats():
             'total_scans': ScanResult.query.count(),
             'total_attacks': AttackLog.query.count(),
             'total_sessions': Session.query.count(),
+            'total_stations': Station.query.count(),
             'successful_attacks': AttackLog.query.filter(
                 AttackLog.successful_pin.isnot(None)
             ).count(),
@@ -511,7 +1100,7 @@ def get_database_stats():
         logger.error(f"Database stats error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/db/clear', methods=['POST'])
+@bp.route('/api/db/clear', methods=['POST'])
 def clear_database():
     """Clear database records (admin function)"""
     try:
@@ -519,13 +1108,24 @@ def clear_database():
         table = data.get('table', 'all')
         
         if table == 'all':
+            RoamEvent.query.delete()
+            Association.query.delete()
+            Station.query.delete()
             AttackLog.query.delete()
             ScanResult.query.delete()
             Network.query.delete()
             SystemStatus.query.delete()
             # Keep sessions for tracking
         elif table == 'networks':
+            RoamEvent.query.delete()
+            Association.query.delete()
+            Station.query.update({Station.current_network_id: None})
             Network.query.delete()
+        elif table == 'stations':
+            RoamEvent.query.delete()
+            Association.query.delete()
+            Station.query.delete()
+            Network.query.update({Network.client_count: 0})
         elif table == 'scans':
             ScanResult.query.delete()
         elif table == 'attacks':
@@ -546,7 +1146,7 @@ def clear_database():
         logger.error(f"Database clear error: {e}")
         return jsonify({'success': False, 'error': str(e)})
 
-@app.route('/api/db/seed', methods=['POST'])
+@bp.route('/api/db/seed', methods=['POST'])
 def seed_database():
     """Seed database with sample data for demonstration"""
     try:
@@ -656,4 +1256,6 @@ if __name__ == '__main__':
         print("WARNING: Not running as root. Some features may not work.")
         print("For full functionality, run with: sudo python3 app.py")
     
+    # Development server; use wsgi.py with gunicorn for multi-process deployments
+    app = create_app()
     app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
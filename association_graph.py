@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Client Association Graph
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Maintains the station store and the AP<->client association table from the
+station section of each scan. Degree counts (Network.client_count,
+Station.ap_count) are updated as edges are added, so survey queries read
+them from indexed columns instead of aggregating the edge table.
+"""
+
+import logging
+from datetime import datetime
+from models import db, Network, Station, Association, RoamEvent
+from oui_db import lookup_vendor
+
+logger = logging.getLogger(__name__)
+
+def ingest_stations(stations, network_ids, seen_at=None):
+    """
+    Merge one scan's station rows into the graph.
+    network_ids maps BSSID -> Network.id for the APs in the same scan;
+    stations associated with an AP that is not in it are stored unassociated.
+    Does not commit.
+    """
+    seen_at = seen_at or datetime.utcnow()
+    if not stations:
+        return 0
+
+    macs = [s['mac'] for s in stations]
+    existing = {s.mac: s for s in Station.query.filter(Station.mac.in_(macs)).all()}
+
+    # Load the edges touching these stations in one query
+    edges = {}
+    station_ids = [s.id for s in existing.values()]
+    if station_ids:
+        for edge in Association.query.filter(Association.station_id.in_(station_ids)).all():
+            edges[(edge.station_id, edge.network_id)] = edge
+
+    for row in stations:
+        station = existing.get(row['mac'])
+        if station is None:
+            station = Station(mac=row['mac'], ap_count=0, first_seen=seen_at)
+            db.session.add(station)
+            existing[row['mac']] = station
+        station.signal_strength = row.get('power')
+        station.packets = row.get('packets', 0)
+        station.last_seen = seen_at
+        if row.get('probed_essids'):
+            station.probed_essids = row['probed_essids']
+        manufacturer = row.get('manufacturer') or lookup_vendor(row['mac'])
+        if manufacturer:
+            station.manufacturer = manufacturer
+    db.session.flush()  # Assign IDs to new stations
+
+    new_degrees = {}
+    for row in stations:
+        station = existing[row['mac']]
+        network_id = network_ids.get(row.get('bssid'))
+        if network_id is None:
+            station.current_network_id = None
+            continue
+
+        edge = edges.get((station.id, network_id))
+        if edge is None:
+            edge = Association(station_id=station.id, network_id=network_id,
+                               sightings=0, first_seen=seen_at)
+            db.session.add(edge)
+            edges[(station.id, network_id)] = edge
+            station.ap_count = (station.ap_count or 0) + 1
+            new_degrees[network_id] = new_degrees.get(network_id, 0) + 1
+        edge.sightings = (edge.sightings or 0) + 1
+        edge.last_seen = seen_at
+
+        if station.current_network_id is not None and station.current_network_id != network_id:
+            db.session.add(RoamEvent(station_id=station.id, from_network_id=station.current_network_id,
+                                     to_network_id=network_id, timestamp=seen_at))
+        station.current_network_id = network_id
+
+    # Apply AP degree increments as single UPDATEs
+    for network_id, added in new_degrees.items():
+        Network.query.filter_by(id=network_id).update(
+            {Network.client_count: db.func.coalesce(Network.client_count, 0) + added},
+            synchronize_session=False)
+
+    return len(stations)
+
+def busiest_aps(limit=20):
+    """APs with the most distinct clients"""
+    return (Network.query.filter(Network.client_count > 0)
+            .order_by(Network.client_count.desc()).limit(limit).all())
+
+def roaming_stations(min_aps=2, limit=100):
+    """Stations seen associated with at least min_aps different BSSIDs"""
+    return (Station.query.filter(Station.ap_count >= min_aps)
+            .order_by(Station.ap_count.desc()).limit(limit).all())
+
+def clients_of(network_id, current_only=False):
+    """Stations associated with an AP, now or ever"""
+    if current_only:
+        return Station.query.filter_by(current_network_id=network_id).all()
+    return (Station.query.join(Association, Association.station_id == Station.id)
+            .filter(Association.network_id == network_id).all())
+
+def roam_history(station_id, limit=100):
+    """Most recent AP transitions for a station"""
+    return (RoamEvent.query.filter_by(station_id=station_id)
+            .order_by(RoamEvent.timestamp.desc()).limit(limit).all())
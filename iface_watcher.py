@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Interface Watcher
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Background thread subscribed to rtnetlink link events and the nl80211
+"config" multicast group. It keeps an always-current table of wireless
+interfaces (name, index, phy, mode, up/running, MAC) and publishes
+added / removed / changed events to subscribers. A link event for a
+wireless interface triggers one nl80211 GET_INTERFACE for that interface
+to refresh its mode. A phy being added or removed invalidates the
+capability cache. Without nl80211 events the table is re-read from
+`iw dev` whenever it is consulted.
+"""
+
+import logging
+import os
+import select
+import struct
+import threading
+import netlink
+import wireless_caps
+
+logger = logging.getLogger(__name__)
+
+RTMGRP_LINK = 1
+RTM_NEWLINK = 16
+RTM_DELLINK = 17
+RTM_GETLINK = 18
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFF_UP = 0x1
+IFF_RUNNING = 0x40
+
+NL80211_CMD_NEW_WIPHY = 3
+NL80211_CMD_DEL_WIPHY = 4
+NL80211_CMD_SET_INTERFACE = 6
+NL80211_CMD_NEW_INTERFACE = 7
+NL80211_CMD_DEL_INTERFACE = 8
+
+ADDED = 'added'
+REMOVED = 'removed'
+CHANGED = 'changed'
+
+IFINFOMSG = struct.Struct('=BxHiII')
+
+def is_wireless(ifname):
+    return os.path.exists(f'/sys/class/net/{ifname}/phy80211')
+
+def _format_mac(data):
+    return ':'.join(f'{b:02X}' for b in data) if data else None
+
+def parse_link(body):
+    """(ifindex, fields) from an RTM_NEWLINK/RTM_DELLINK payload"""
+    _family, _type, ifindex, flags, _change = IFINFOMSG.unpack_from(body)
+    attrs = netlink.parse_attrs(body, IFINFOMSG.size)
+    return ifindex, {
+        'ifname': netlink.get_str(attrs, IFLA_IFNAME),
+        'ifindex': ifindex,
+        'up': bool(flags & IFF_UP),
+        'running': bool(flags & IFF_RUNNING),
+        'mac': _format_mac(attrs.get(IFLA_ADDRESS))
+    }
+
+class InterfaceWatcher:
+    """Live table of wireless interfaces kept current from netlink events"""
+
+    def __init__(self, wireless_only=True):
+        self.wireless_only = wireless_only
+        self.live = False
+        self._table = {}  # ifindex -> interface dict
+        self._listeners = []
+        self._changed = threading.Condition()
+        self._thread = None
+        self._route = None
+        self._route_requests = None
+        self._nl80211 = None
+        self._nl80211_events = None
+
+    def start(self):
+        """Open the netlink sockets, load the initial table and start the event thread"""
+        if self._thread is not None:
+            return self
+        if netlink.available():
+            try:
+                # Events and dumps use separate sockets so a dump never races the event thread
+                self._route = netlink.NetlinkSocket(netlink.NETLINK_ROUTE, RTMGRP_LINK)
+                self._route_requests = netlink.NetlinkSocket(netlink.NETLINK_ROUTE)
+            except OSError as e:
+                logger.warning(f"rtnetlink unavailable ({e}); interface table refreshes on demand")
+        if self._route is not None:
+            try:
+                self._nl80211 = netlink.GenericNetlink('nl80211')
+                self._nl80211_events = netlink.GenericNetlink('nl80211')
+                self._nl80211_events.subscribe('config')
+            except OSError as e:
+                logger.info(f"nl80211 unavailable ({e}); interface modes come from iw dev")
+                self._nl80211 = self._nl80211_events = None
+        self.refresh()
+        if self._route is not None:
+            # Modes are only pushed by nl80211; without it interfaces() re-reads iw dev
+            self.live = self._nl80211 is not None
+            self._thread = threading.Thread(target=self._run, name='iface-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def subscribe(self, callback):
+        """Call callback(event) for each interface change; event has type, interface, previous"""
+        self._listeners.append(callback)
+        return callback
+
+    def interfaces(self):
+        """Current table; without nl80211 events it is re-read first"""
+        if not self.live:
+            self.refresh()
+        with self._changed:
+            return [dict(iface) for iface in sorted(self._table.values(), key=lambda i: i['ifindex'] or 0)]
+
+    def get(self, ifname):
+        return next((iface for iface in self.interfaces() if iface['ifname'] == ifname), None)
+
+    def find(self, **fields):
+        """Interfaces whose fields all match, e.g. find(type='monitor', phy='phy0')"""
+        return [iface for iface in self.interfaces() if all(iface.get(k) == v for k, v in fields.items())]
+
+    def wait_for(self, predicate, timeout=5.0):
+        """Block until predicate(interfaces) returns something truthy or the timeout expires"""
+        if not self.live:
+            return predicate(self.interfaces())
+        with self._changed:
+            result = predicate(self.interfaces())
+            if not result:
+                self._changed.wait_for(lambda: predicate(self.interfaces()), timeout)
+                result = predicate(self.interfaces())
+            return result
+
+    def refresh(self):
+        """Reload the whole table (initial load, or on demand without netlink events)"""
+        table = {}
+        if self._route_requests is not None:
+            for msg_type, body in self._route_requests.request(RTM_GETLINK, IFINFOMSG.pack(0, 0, 0, 0, 0), dump=True):
+                if msg_type == RTM_NEWLINK:
+                    ifindex, link = parse_link(body)
+                    if not self.wireless_only or is_wireless(link['ifname']):
+                        table[ifindex] = dict(link, phy=None, type=None)
+        for wireless in self._read_wireless():
+            ifindex = wireless['ifindex']
+            if ifindex is None:
+                # iw dev without ifindex (e.g. a stand-in tool); key by name
+                ifindex = next((i for i, entry in table.items() if entry['ifname'] == wireless['ifname']),
+                               wireless['ifname'])
+            entry = table.setdefault(ifindex, {'ifname': wireless['ifname'], 'ifindex': wireless['ifindex'],
+                                               'up': None, 'running': None, 'mac': None})
+            entry.update(phy=wireless['phy'], type=wireless['type'])
+        self._replace(table)
+
+    def _read_wireless(self, ifindex=None):
+        if self._nl80211 is not None:
+            attrs = netlink.attr_u32(wireless_caps.NL80211_ATTR_IFINDEX, ifindex) if ifindex else b''
+            try:
+                replies = self._nl80211.command(wireless_caps.NL80211_CMD_GET_INTERFACE, attrs, dump=ifindex is None)
+            except OSError:
+                return []
+            return [wireless_caps.parse_nl80211_interface(attrs) for _cmd, attrs in replies]
+        try:
+            interfaces = wireless_caps.read_interfaces()
+        except OSError as e:
+            logger.debug(f"Could not list wireless interfaces: {e}")
+            return []
+        return [i for i in interfaces if ifindex is None or i['ifindex'] == ifindex]
+
+    def _replace(self, table):
+        events = []
+        with self._changed:
+            old = self._table
+            for ifindex, iface in table.items():
+                previous = old.get(ifindex)
+                if previous is None:
+                    events.append({'type': ADDED, 'interface': dict(iface), 'previous': None})
+                elif previous != iface:
+                    events.append({'type': CHANGED, 'interface': dict(iface), 'previous': previous})
+            for ifindex, previous in old.items():
+                if ifindex not in table:
+                    events.append({'type': REMOVED, 'interface': previous, 'previous': previous})
+            self._table = table
+            self._changed.notify_all()
+        self._publish(events)
+
+    def _update(self, ifindex, iface):
+        with self._changed:
+            previous = self._table.get(ifindex)
+            if iface is None:
+                if previous is None:
+                    return
+                del self._table[ifindex]
+                event = {'type': REMOVED, 'interface': previous, 'previous': previous}
+            else:
+                if previous == iface:
+                    return
+                self._table[ifindex] = iface
+                event = {'type': ADDED if previous is None else CHANGED, 'interface': dict(iface),
+                         'previous': previous}
+            self._changed.notify_all()
+        self._publish([event])
+
+    def _publish(self, events):
+        for event in events:
+            for callback in self._listeners:
+                try:
+                    callback(event)
+                except Exception as e:
+                    logger.error(f"Interface watcher listener failed: {e}")
+
+    def _on_link(self, msg_type, body):
+        ifindex, link = parse_link(body)
+        with self._changed:
+            known = self._table.get(ifindex)
+        if msg_type == RTM_DELLINK:
+            self._update(ifindex, None)
+            return
+        wireless_link = (known is not None and known['phy'] is not None) or is_wireless(link['ifname'])
+        if known is None and self.wireless_only and not wireless_link:
+            return
+        iface = dict(known or {'phy': None, 'type': None})
+        iface.update(link)
+        wireless = self._read_wireless(ifindex) if wireless_link else []
+        if wireless:
+            iface.update(phy=wireless[0]['phy'], type=wireless[0]['type'])
+        self._update(ifindex, iface)
+
+    def _on_nl80211(self, cmd, attrs):
+        if cmd in (NL80211_CMD_NEW_WIPHY, NL80211_CMD_DEL_WIPHY):
+            wireless_caps.capabilities.invalidate()
+            return
+        if cmd not in (NL80211_CMD_NEW_INTERFACE, NL80211_CMD_SET_INTERFACE, NL80211_CMD_DEL_INTERFACE):
+            return
+        wireless = wireless_caps.parse_nl80211_interface(attrs)
+        ifindex = wireless['ifindex']
+        if cmd == NL80211_CMD_DEL_INTERFACE:
+            self._update(ifindex, None)
+            return
+        with self._changed:
+            iface = dict(self._table.get(ifindex) or {'up': None, 'running': None, 'mac': None})
+        iface.update(wireless)
+        self._update(ifindex, iface)
+
+    def _run(self):
+        sockets = [s for s in (self._route, self._nl80211_events) if s is not None]
+        while True:
+            try:
+                ready, _, _ = select.select(sockets, [], [])
+                for sock in ready:
+                    if sock is self._route:
+                        for msg_type, body in sock.receive():
+                            if msg_type in (RTM_NEWLINK, RTM_DELLINK):
+                                self._on_link(msg_type, body)
+                    else:
+                        for cmd, attrs in sock.receive():
+                            self._on_nl80211(cmd, attrs)
+            except OSError as e:
+                # ENOBUFS: events were dropped, so resynchronise from a full dump
+                logger.warning(f"Interface watcher lost events ({e}); reloading table")
+                try:
+                    self.refresh()
+                except OSError as e:
+                    logger.error(f"Interface watcher stopped: {e}")
+                    self.live = False
+                    self._thread = None
+                    return
+            except Exception as e:
+                logger.error(f"Interface watcher error: {e}")
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+def get_watcher():
+    """Shared, started watcher for this process"""
+    global _watcher
+    if _watcher is None:
+        with _watcher_lock:
+            if _watcher is None:
+                _watcher = InterfaceWatcher().start()
+    return _watcher
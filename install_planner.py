@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Dependency Install Planner
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Probes every requirement concurrently, groups the missing ones by the
+package manager that provides them, and installs each group in a single
+transaction (one resolver pass per manager instead of one per package).
+Backends: apt, dnf/yum, pacman, zypper, pip, and a fake one for offline runs.
+
+    python3 install_planner.py --dry-run
+    python3 install_planner.py --backend fake
+"""
+
+import argparse
+import importlib.util
+import logging
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SYSTEM = 'system'
+PYTHON = 'python'
+
+class Requirement:
+    """Something the tool needs: how to detect it and which package provides it"""
+    __slots__ = ('name', 'kind', 'probe', 'packages')
+
+    def __init__(self, name, kind=SYSTEM, probe=None, packages=None):
+        self.name = name
+        self.kind = kind
+        self.probe = probe or name  # binary on PATH, or importable module
+        self.packages = packages or {}  # backend name -> package name, when it differs
+
+    @property
+    def key(self):
+        return self.name if self.kind == SYSTEM else f'python-{self.name}'
+
+    def package_for(self, backend):
+        return self.packages.get(backend, self.name)
+
+    def __repr__(self):
+        return f'<Requirement {self.key}>'
+
+# What the tool needs at run time; SystemUtils reports and installs these
+RUNTIME_REQUIREMENTS = (
+    Requirement('aircrack-ng'),
+    Requirement('reaver'),
+    Requirement('pixiewps'),
+    Requirement('iw'),
+    Requirement('wireless-tools', probe='iwconfig', packages={'pacman': 'wireless_tools'}),
+    Requirement('flask', kind=PYTHON),
+    Requirement('wcwidth', kind=PYTHON)
+)
+
+# Only needed to install the Python requirements, by setup.py
+SETUP_REQUIREMENTS = (
+    Requirement('python3-pip', probe='pip3', packages={'pacman': 'python-pip'}),
+)
+
+REQUIREMENTS = RUNTIME_REQUIREMENTS + SETUP_REQUIREMENTS
+
+def default_probe(requirement):
+    if requirement.kind == PYTHON:
+        return importlib.util.find_spec(requirement.probe) is not None
+    return shutil.which(requirement.probe) is not None
+
+class Backend:
+    """A package manager; install() runs one transaction for a batch of packages"""
+    name = None
+    kind = SYSTEM
+    binaries = ()
+
+    def __init__(self, run=subprocess.run):
+        self.run = run
+
+    @classmethod
+    def available(cls):
+        return any(shutil.which(binary) for binary in cls.binaries)
+
+    @property
+    def binary(self):
+        return next((b for b in self.binaries if shutil.which(b)), self.binaries[0])
+
+    def is_installed(self, requirement):
+        return default_probe(requirement)
+
+    def commands(self, packages):
+        raise NotImplementedError
+
+    def install(self, packages):
+        for cmd in self.commands(packages):
+            self.run(cmd, check=True)
+
+class AptBackend(Backend):
+    name = 'apt'
+    binaries = ('apt-get',)
+
+    def commands(self, packages):
+        return [['apt-get', 'update'], ['apt-get', 'install', '-y'] + packages]
+
+class DnfBackend(Backend):
+    name = 'dnf'
+    binaries = ('dnf', 'yum')
+
+    def commands(self, packages):
+        # Metadata is refreshed as part of the install transaction
+        return [[self.binary, 'install', '-y'] + packages]
+
+class PacmanBackend(Backend):
+    name = 'pacman'
+    binaries = ('pacman',)
+
+    def commands(self, packages):
+        return [['pacman', '-Sy', '--needed', '--noconfirm'] + packages]
+
+class ZypperBackend(Backend):
+    name = 'zypper'
+    binaries = ('zypper',)
+
+    def commands(self, packages):
+        return [['zypper', 'refresh'], ['zypper', 'install', '-y'] + packages]
+
+class PipBackend(Backend):
+    name = 'pip'
+    kind = PYTHON
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def commands(self, packages):
+        return [[sys.executable, '-m', 'pip', 'install'] + packages]
+
+class FakeBackend(Backend):
+    """Records transactions instead of running them; for offline tests"""
+    name = 'fake'
+
+    def __init__(self, run=None, kind=SYSTEM, installed=(), fail=False):
+        super().__init__(run)
+        self.kind = kind
+        self.installed = set(installed)
+        self.fail = fail
+        self.transactions = []
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def is_installed(self, requirement):
+        return requirement.package_for(self.name) in self.installed
+
+    def commands(self, packages):
+        return [['fake-install'] + packages]
+
+    def install(self, packages):
+        self.transactions.append(list(packages))
+        if self.fail:
+            raise subprocess.CalledProcessError(1, self.commands(packages)[0])
+        self.installed.update(packages)
+
+SYSTEM_BACKENDS = (AptBackend, DnfBackend, PacmanBackend, ZypperBackend)
+BACKENDS = {cls.name: cls for cls in SYSTEM_BACKENDS + (PipBackend, FakeBackend)}
+
+def detect_backend(run=subprocess.run):
+    """System package manager for this host (INSTALL_BACKEND overrides), or None"""
+    forced = os.environ.get('INSTALL_BACKEND')
+    if forced:
+        return BACKENDS[forced](run=run)
+    for cls in SYSTEM_BACKENDS:
+        if cls.available():
+            return cls(run=run)
+    return None
+
+class InstallPlanner:
+    """Plans and applies the installs for a set of requirements"""
+
+    def __init__(self, requirements=REQUIREMENTS, system_backend=None, python_backend=None, max_workers=8):
+        self.requirements = list(requirements)
+        self.backends = {SYSTEM: system_backend, PYTHON: python_backend}
+        self.max_workers = max_workers
+
+    def _probe_one(self, requirement):
+        backend = self.backends.get(requirement.kind)
+        try:
+            return backend.is_installed(requirement) if backend else default_probe(requirement)
+        except Exception as e:
+            logger.warning(f"Probe for {requirement.key} failed: {e}")
+            return False
+
+    def probe(self):
+        """Check every requirement concurrently; returns {key: installed}"""
+        workers = max(1, min(self.max_workers, len(self.requirements)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(self._probe_one, self.requirements))
+        return {req.key: installed for req, installed in zip(self.requirements, results)}
+
+    def plan(self, status=None):
+        """Missing requirements grouped per backend; system packages go first"""
+        status = status if status is not None else self.probe()
+        groups = []
+        unavailable = []
+        for kind in (SYSTEM, PYTHON):
+            missing = [req for req in self.requirements if req.kind == kind and not status[req.key]]
+            if not missing:
+                continue
+            backend = self.backends.get(kind)
+            if backend is None:
+                unavailable.extend(missing)
+            else:
+                groups.append((backend, missing))
+        return groups, unavailable
+
+    def apply(self, plan=None):
+        """Run one transaction per backend; returns a report of what was installed"""
+        groups, unavailable = plan if plan is not None else self.plan()
+        report = {'installed': [], 'failed': [], 'unavailable': [req.key for req in unavailable],
+                  'transactions': 0}
+        for backend, missing in groups:
+            packages = list(dict.fromkeys(req.package_for(backend.name) for req in missing))
+            logger.info(f"Installing with {backend.name}: {' '.join(packages)}")
+            report['transactions'] += 1
+            try:
+                backend.install(packages)
+                report['installed'].extend(req.key for req in missing)
+            except (subprocess.CalledProcessError, OSError) as e:
+                logger.error(f"{backend.name} transaction failed: {e}")
+                report['failed'].extend(req.key for req in missing)
+        return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Install missing dependencies')
+    parser.add_argument('--backend', choices=sorted(BACKENDS), help='system package manager (default: detect)')
+    parser.add_argument('--dry-run', action='store_true', help='print the plan without installing')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    system_backend = BACKENDS[args.backend]() if args.backend else detect_backend()
+    python_backend = FakeBackend(kind=PYTHON) if args.backend == 'fake' else PipBackend()
+    planner = InstallPlanner(system_backend=system_backend, python_backend=python_backend)
+    groups, unavailable = plan = planner.plan()
+    for backend, missing in groups:
+        print(f"{backend.name}: {' '.join(req.package_for(backend.name) for req in missing)}")
+        for cmd in backend.commands([req.package_for(backend.name) for req in missing]):
+            print(f"  $ {' '.join(cmd)}")
+    if unavailable:
+        print(f"no package manager for: {' '.join(req.key for req in unavailable)}")
+    if not groups:
+        print('Nothing to install')
+    if args.dry_run or not groups:
+        return 0
+    report = planner.apply(plan)
+    print(f"{len(report['installed'])} installed, {len(report['failed'])} failed "
+          f"in {report['transactions']} transaction(s)")
+    return 1 if report['failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Managed-Mode Scanner
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Surveys access points from a managed interface without monitor mode:
+nl80211 TRIGGER_SCAN, wait for NEW_SCAN_RESULTS on the "scan" multicast
+group, then one GET_SCAN dump whose BSS information elements are parsed
+with the beacon parser from pcap_reader. Without nl80211, `iw dev <if>
+scan` (or `scan dump` while another scan is running) is parsed instead.
+Both produce the same APRecords as airodump-ng scans, without stations.
+"""
+
+import errno
+import logging
+import re
+import select
+import socket
+import time
+import netlink
+from ap_records import APRecord, small_int, intern_text, mac_to_int
+from pcap_reader import describe_security, frequency_to_channel, record_from_elements, format_time
+from wireless_caps import NL80211_ATTR_IFINDEX
+from metrics import timed_run
+
+logger = logging.getLogger(__name__)
+
+NL80211_CMD_GET_SCAN = 32
+NL80211_CMD_TRIGGER_SCAN = 33
+NL80211_CMD_NEW_SCAN_RESULTS = 34
+NL80211_CMD_SCAN_ABORTED = 35
+
+NL80211_ATTR_SCAN_SSIDS = 45
+NL80211_ATTR_BSS = 47
+
+NL80211_BSS_BSSID = 1
+NL80211_BSS_FREQUENCY = 2
+NL80211_BSS_CAPABILITY = 5
+NL80211_BSS_INFORMATION_ELEMENTS = 6
+NL80211_BSS_SIGNAL_MBM = 7
+NL80211_BSS_SEEN_MS_AGO = 10
+NL80211_BSS_BEACON_IES = 11
+
+# Upper bound for one scan; drivers normally finish all bands in 1-4 s
+SCAN_TIMEOUT_SECONDS = 10
+
+def parse_nl80211_bss(attrs, now=None):
+    """APRecord for one GET_SCAN reply, or None when it carries no BSS"""
+    if NL80211_ATTR_BSS not in attrs:
+        return None
+    now = now if now is not None else time.time()
+    bss = netlink.parse_attrs(attrs[NL80211_ATTR_BSS])
+    bssid = bss.get(NL80211_BSS_BSSID)
+    if not bssid:
+        return None
+    # Probe response IEs when the BSS answered one, else the last beacon's
+    elements = bss.get(NL80211_BSS_INFORMATION_ELEMENTS) or bss.get(NL80211_BSS_BEACON_IES, b'')
+    signal = netlink.get_s32(bss, NL80211_BSS_SIGNAL_MBM)
+    return record_from_elements(
+        int.from_bytes(bssid[:6], 'big'), elements,
+        netlink.get_u16(bss, NL80211_BSS_CAPABILITY, 0),
+        netlink.get_u32(bss, NL80211_BSS_FREQUENCY),
+        round(signal / 100) if signal is not None else None,
+        now - netlink.get_u32(bss, NL80211_BSS_SEEN_MS_AGO, 0) / 1000
+    )
+
+def _wait_for_results(events, ifindex, timeout):
+    """Block until the scan on ifindex finishes; False if it was aborted"""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f'scan did not finish within {timeout:g}s')
+        ready, _, _ = select.select([events], [], [], remaining)
+        if not ready:
+            continue
+        for cmd, attrs in events.receive():
+            if netlink.get_u32(attrs, NL80211_ATTR_IFINDEX) != ifindex:
+                continue
+            if cmd == NL80211_CMD_NEW_SCAN_RESULTS:
+                return True
+            if cmd == NL80211_CMD_SCAN_ABORTED:
+                return False
+
+def _scan_nl80211(nl, events, interface, timeout):
+    ifindex = socket.if_nametoindex(interface)
+    target = netlink.attr_u32(NL80211_ATTR_IFINDEX, ifindex)
+    # Subscribe before triggering so the completion event cannot be missed
+    events.subscribe('scan')
+    try:
+        # One wildcard SSID makes the scan active (probe requests) instead of passive
+        nl.command(NL80211_CMD_TRIGGER_SCAN, target + netlink.attr_nested(NL80211_ATTR_SCAN_SSIDS,
+                                                                         netlink.attr(1)))
+    except netlink.NetlinkError as e:
+        if e.errno != errno.EBUSY:
+            raise
+        # Another scan (e.g. NetworkManager's) is running; its results serve as well
+        logger.debug(f"Scan already in progress on {interface}; waiting for it")
+    if not _wait_for_results(events, ifindex, timeout):
+        logger.warning(f"Scan on {interface} was aborted; returning cached results")
+    replies = nl.command(NL80211_CMD_GET_SCAN, target, dump=True)
+    now = time.time()
+    return [record for record in (parse_nl80211_bss(attrs, now) for _cmd, attrs in replies) if record]
+
+def scan_nl80211(interface, timeout=SCAN_TIMEOUT_SECONDS):
+    """Trigger an active scan on a managed interface and return its APRecords; raises OSError"""
+    with netlink.GenericNetlink('nl80211') as nl, netlink.GenericNetlink('nl80211') as events:
+        return _scan_nl80211(nl, events, interface, timeout)
+
+def _open_nl80211():
+    """Command and event sockets for nl80211, or None where netlink or the nl80211 family is unavailable"""
+    if not netlink.available():
+        return None
+    sockets = []
+    try:
+        while len(sockets) < 2:
+            sockets.append(netlink.GenericNetlink('nl80211'))
+    except OSError as e:
+        # ENOENT without the family, EPERM / EAFNOSUPPORT where netlink is blocked
+        for sock in sockets:
+            sock.close()
+        logger.debug(f"nl80211 unavailable ({e}); scanning with iw")
+        return None
+    return sockets
+
+_BSS_LINE = re.compile(r'^BSS ([0-9a-fA-F:]{17})')
+_CAPABILITY = re.compile(r'\(0x([0-9a-fA-F]+)\)')
+CIPHERS = {'CCMP-128': 'CCMP', 'WEP-40': 'WEP40', 'WEP-104': 'WEP104', 'GCMP-128': 'GCMP'}
+
+def _akm_name(suite):
+    if 'SAE' in suite:
+        return 'SAE'
+    if 'OWE' in suite:
+        return 'OWE'
+    if 'PSK' in suite:
+        return 'PSK'
+    if '802.1X' in suite:
+        return 'MGT'
+    return 'UNKNOWN'
+
+def _iw_unescape(text):
+    """iw prints non-printable SSID bytes as \\xNN"""
+    raw = re.sub(rb'\\x([0-9a-fA-F]{2})', lambda m: bytes((int(m.group(1), 16),)), text.encode())
+    # Hidden networks beacon an empty or zero-filled SSID, as record_from_elements treats them
+    return ('' if not raw.strip(b'\x00') else raw.decode('utf-8', 'replace')), len(raw)
+
+def _iw_record(bss, now):
+    info = {'ssid': None, 'channel': None, 'rsn': bss['rsn'], 'wpa': bss['wpa'], 'wps': None, 'vendor_ouis': []}
+    privacy, cipher, auth = describe_security(info, bss['capability'])
+    seen = format_time(now - bss['seen_ms'] / 1000)
+    record = APRecord(bss['bssid'], intern_text(bss['essid']),
+                      small_int(bss['channel'] or frequency_to_channel(bss['freq'])), small_int(bss['signal']),
+                      None, intern_text(privacy), intern_text(cipher), intern_text(auth),
+                      1, 0, '0.0.0.0', bss['id_length'], seen, seen)
+    record.wps = bss['wps']
+    record.wps_locked = bool(bss['wps_locked']) if bss['wps'] else False
+    record.manufacturer = bss['manufacturer']
+    record.model = bss['model']
+    return record
+
+def parse_iw_scan(text, now=None):
+    """APRecords from `iw dev <if> scan` / `scan dump` output"""
+    now = now if now is not None else time.time()
+    records = []
+    bss = None
+    section = None  # the RSN / WPA / WPS block being read
+    for line in text.splitlines():
+        match = _BSS_LINE.match(line)
+        if match:
+            if bss is not None:
+                records.append(_iw_record(bss, now))
+            bss = {'bssid': mac_to_int(match.group(1)), 'essid': '', 'id_length': 0, 'channel': None,
+                   'freq': None, 'signal': None, 'capability': 0, 'seen_ms': 0, 'rsn': None, 'wpa': None,
+                   'wps': False, 'wps_locked': None, 'manufacturer': None, 'model': None}
+            section = None
+            continue
+        if bss is None:
+            continue
+        stripped = line.strip()
+        key, _, value = stripped.partition(':')
+        value = value.strip()
+        if line.startswith('\t') and not line.startswith('\t\t'):
+            section = None
+            if key in ('RSN', 'WPA'):
+                section = key
+                bss[key.lower()] = ([], [])
+            elif key == 'WPS':
+                section = key
+                bss['wps'] = True
+            elif key == 'SSID':
+                bss['essid'], bss['id_length'] = _iw_unescape(line[len('\tSSID: '):])
+            elif key == 'freq':
+                bss['freq'] = int(float(value))
+            elif key == 'signal':
+                bss['signal'] = int(float(value.split()[0]))
+            elif key == 'capability':
+                match = _CAPABILITY.search(value)
+                bss['capability'] = int(match.group(1), 16) if match else 0
+            elif key == 'last seen' and value.endswith('ms ago'):
+                bss['seen_ms'] = int(value.split()[0])
+            elif key == 'DS Parameter set':
+                bss['channel'] = int(value.split()[-1])
+            # The section's first attribute follows on the same line, after a tab
+            stripped = stripped.partition('\t')[2].strip()
+            key, _, value = stripped.partition(':')
+            value = value.strip()
+        if section is None or not stripped.startswith('*'):
+            continue
+        key = key.lstrip('* ').strip()
+        if section in ('RSN', 'WPA'):
+            ciphers, akms = bss[section.lower()]
+            if key == 'Pairwise ciphers':
+                ciphers.extend(CIPHERS.get(c, c) for c in value.split())
+            elif key == 'Authentication suites':
+                # Suites are space separated, but one of the names contains a space
+                akms.extend(_akm_name(suite) for suite in value.replace('IEEE 802.1X', '802.1X').split())
+        elif key == 'AP setup locked':
+            bss['wps_locked'] = value.startswith('0x01') or value == '1'
+        elif key == 'Manufacturer':
+            bss['manufacturer'] = intern_text(value) or None
+        elif key in ('Model', 'Device name') and not bss['model']:
+            bss['model'] = intern_text(value) or None
+    if bss is not None:
+        records.append(_iw_record(bss, now))
+    return records
+
+def scan_iw(interface):
+    """Scan through iw; falls back to the cached dump when a scan is already running"""
+    result = timed_run(['iw', 'dev', interface, 'scan'], capture_output=True, text=True)
+    if result.returncode != 0:
+        if '(-16)' not in result.stderr:
+            raise OSError(f"iw scan on {interface} failed: {result.stderr.strip()}")
+        result = timed_run(['iw', 'dev', interface, 'scan', 'dump'], capture_output=True, text=True)
+    return parse_iw_scan(result.stdout)
+
+def scan(interface, timeout=SCAN_TIMEOUT_SECONDS):
+    """Managed-mode survey of interface, through nl80211 where available"""
+    sockets = _open_nl80211()
+    if sockets is None:
+        return scan_iw(interface)
+    # Errors once nl80211 is open (e.g. no such interface) are the scan's, not a reason to use iw
+    nl, events = sockets
+    with nl, events:
+        return _scan_nl80211(nl, events, interface, timeout)
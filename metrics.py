@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Metrics
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+In-process counters and histograms exposed in Prometheus text format.
+Buckets are allocated up front and observations are plain list updates,
+so instrumentation can stay enabled in production.
+
+Under a multi-process server each worker has its own values. Set
+METRICS_MULTIPROC_DIR to an empty directory shared by the workers: each
+one writes a snapshot there every few seconds and /metrics renders the sum
+of all of them, whichever worker answers the scrape.
+"""
+
+import json
+import os
+import subprocess
+import threading
+import time
+from bisect import bisect_left
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+class _HistogramChild:
+    """Bucket counts for one label combination"""
+    __slots__ = ('bounds', 'counts', 'sum', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _CounterChild:
+    """Value for one label combination"""
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def dec(self, amount=1):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+class _Metric:
+    child_class = None
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self._children[()] = self._new_child()
+
+    def _new_child(self):
+        return self.child_class()
+
+    def labels(self, *values):
+        """Get the child for a label combination, creating it once"""
+        child = self._children.get(values)
+        if child is None:
+            # Only the first observation for a new label set takes the lock
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_text(self, values, extra=None):
+        pairs = list(zip(self.labelnames, values))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ''
+        body = ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"')) for k, v in pairs)
+        return '{' + body + '}'
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.type_name}']
+        for values, child in list(self._children.items()):
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def snapshot(self):
+        """Current values as JSON-friendly [label values, state] rows"""
+        return [[list(values), self._child_state(child)] for values, child in list(self._children.items())]
+
+    def empty_copy(self):
+        """Same metric with no observations, for summing snapshots into"""
+        copy = object.__new__(type(self))
+        copy.__dict__.update(self.__dict__)
+        _Metric.__init__(copy, self.name, self.documentation, self.labelnames)
+        return copy
+
+    def merge(self, rows):
+        """Add snapshot() rows from another process"""
+        for values, data in rows:
+            self._merge_child(self.labels(*values), data)
+
+    def _child_state(self, child):
+        return child.value
+
+    def _merge_child(self, child, value):
+        child.value += value
+
+class Counter(_Metric):
+    """Monotonically increasing counter"""
+    child_class = _CounterChild
+    type_name = 'counter'
+
+    def inc(self, amount=1):
+        self._default.value += amount
+
+    def _render_child(self, values, child):
+        return [f'{self.name}_total{self._label_text(values)} {child.value}']
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+    child_class = _CounterChild
+    type_name = 'gauge'
+
+    def inc(self, amount=1):
+        self._default.value += amount
+
+    def dec(self, amount=1):
+        self._default.value -= amount
+
+    def set(self, value):
+        self._default.value = value
+
+    def _render_child(self, values, child):
+        return [f'{self.name}{self._label_text(values)} {child.value}']
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets"""
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self, *labels):
+        """Context manager that observes the elapsed time of its block"""
+        return _Timer(self.labels(*labels) if labels else self._default)
+
+    def _child_state(self, child):
+        return [child.counts, child.sum, child.count]
+
+    def _merge_child(self, child, data):
+        counts, total, count = data
+        for i, n in enumerate(counts):
+            child.counts[i] += n
+        child.sum += total
+        child.count += count
+
+    def _render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{self._label_text(values, ("le", bound))} {cumulative}')
+        lines.append(f'{self.name}_bucket{self._label_text(values, ("le", "+Inf"))} {child.count}')
+        lines.append(f'{self.name}_sum{self._label_text(values)} {child.sum}')
+        lines.append(f'{self.name}_count{self._label_text(values)} {child.count}')
+        return lines
+
+class _Timer:
+    __slots__ = ('child', 'start')
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Render all metrics in Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self):
+        return {metric.name: metric.snapshot() for metric in self._metrics}
+
+    def render_merged(self, snapshots):
+        """Render the sum of several snapshot() results, e.g. one per worker"""
+        lines = []
+        for metric in self._metrics:
+            merged = metric.empty_copy()
+            for snapshot in snapshots:
+                merged.merge(snapshot.get(metric.name, ()))
+            lines.extend(merged.render())
+        return '\n'.join(lines) + '\n'
+
+class MultiProcessCollector:
+    """Shares a registry between worker processes through snapshot files in one directory"""
+
+    def __init__(self, registry, directory, interval=5):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._pid = None
+        self._write_lock = threading.Lock()
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f'metrics-{pid}.json')
+
+    def write(self):
+        """Write this process's snapshot; readers never see a partial file"""
+        path = self._path(os.getpid())
+        with self._write_lock:
+            with open(path + '.tmp', 'w') as f:
+                json.dump(self.registry.snapshot(), f)
+            os.replace(path + '.tmp', path)
+
+    def start(self):
+        """Start this process's writer thread; safe to call on every request and after fork"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        os.makedirs(self.directory, exist_ok=True)
+        thread = threading.Thread(target=self._run, name='metrics-writer', daemon=True)
+        thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.write()
+            except OSError:
+                pass
+            time.sleep(self.interval)
+
+    def collect(self):
+        """Snapshots of every worker, this one up to date; gauges only from live processes"""
+        self.write()
+        snapshots = []
+        for name in os.listdir(self.directory):
+            if not (name.startswith('metrics-') and name.endswith('.json')):
+                continue
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            # Counters and histograms of exited workers still count; their gauges do not
+            if not _process_alive(int(name[len('metrics-'):-len('.json')])):
+                for metric in self.registry._metrics:
+                    if isinstance(metric, Gauge):
+                        snapshot.pop(metric.name, None)
+            snapshots.append(snapshot)
+        return snapshots
+
+    def render(self):
+        return self.registry.render_merged(self.collect())
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+registry = Registry()
+_multiproc_dir = os.environ.get('METRICS_MULTIPROC_DIR')
+multiprocess = MultiProcessCollector(registry, _multiproc_dir) if _multiproc_dir else None
+
+SCAN_DURATION = registry.register(Histogram(
+    'wifi_scan_duration_seconds', 'Time spent in WiFiManager.scan_networks'))
+PARSE_DURATION = registry.register(Histogram(
+    'wifi_airodump_parse_seconds', 'Time spent parsing airodump-ng CSV output'))
+APS_PER_SCAN = registry.register(Histogram(
+    'wifi_scan_access_points', 'Access points returned per scan', buckets=SIZE_BUCKETS))
+INGEST_DURATION = registry.register(Histogram(
+    'wifi_ingest_duration_seconds', 'Time spent writing a scan batch to the database'))
+INGEST_BATCH_SIZE = registry.register(Histogram(
+    'wifi_ingest_batch_size', 'Networks written per database ingest batch', buckets=SIZE_BUCKETS))
+REQUEST_DURATION = registry.register(Histogram(
+    'http_request_duration_seconds', 'Flask request latency by route', labelnames=('method', 'route', 'status')))
+SUBPROCESS_DURATION = registry.register(Histogram(
+    'subprocess_duration_seconds', 'Wall time of external tool invocations', labelnames=('tool',)))
+SUBPROCESS_SPAWNS = registry.register(Counter(
+    'subprocess_spawns', 'External tool processes started', labelnames=('tool',)))
+JOB_QUEUE_DEPTH = registry.register(Gauge(
+    'background_jobs_running', 'Background jobs currently running'))
+SCAN_EVENTS = registry.register(Counter(
+    'wifi_scan_events', 'Scan diff events emitted', labelnames=('type',)))
+RULE_ALERTS = registry.register(Counter(
+    'wifi_rule_alerts', 'Alerts raised by alert rules', labelnames=('severity',)))
+ROGUE_AP_ALERTS = registry.register(Counter(
+    'wifi_rogue_ap_alerts', 'Suspected evil-twin APs flagged', labelnames=('severity',)))
+
+def _tool_name(cmd):
+    if isinstance(cmd, (list, tuple)):
+        cmd = cmd[0] if cmd else ''
+    else:
+        cmd = str(cmd).split(' ', 1)[0]
+    return os.path.basename(str(cmd))
+
+def timed_run(cmd, **kwargs):
+    """subprocess.run() that records spawn count and duration per tool"""
+    tool = _tool_name(cmd)
+    SUBPROCESS_SPAWNS.labels(tool).inc()
+    with SUBPROCESS_DURATION.time(tool):
+        return subprocess.run(cmd, **kwargs)
+
+def timed_popen(cmd, **kwargs):
+    """subprocess.Popen() that records the spawn per tool"""
+    SUBPROCESS_SPAWNS.labels(_tool_name(cmd)).inc()
+    return subprocess.Popen(cmd, **kwargs)
@@ -20,6 +20,9 @@ from kivy.uix.gridlayout import GridLayout
 from kivy.uix.label import Label
 from kivy.uix.button import Button
 from kivy.uix.scrollview import ScrollView
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
 from kivy.uix.popup import Popup
 from kivy.uix.progressbar import ProgressBar
 from kivy.uix.textinput import TextInput
@@ -36,9 +39,22 @@ import threading
 import time
 import os
 import sys
-from oneshot import WPSpin
 import json
 import re
+from bisect import bisect_left
+from scan_diff import ScanDiff, APPEARED, CHANGED, RSSI, DISAPPEARED
+from results_log import ResultsLog
+from ui_state import ObservableState
+from scan_cache import ScanCache
+
+# Signal-strength changes are applied to the list at most this often
+SIGNAL_REFRESH_HZ = 2
+# Seconds a finished operation's message stays in the status bar
+STATUS_MESSAGE_SECONDS = 3
+# Networks unseen for this long are removed from the list
+NETWORK_STALE_SECONDS = 60
+# Results kept on screen; older entries are spilled to results.log
+RESULTS_CAPACITY = 500
 
 class StatusBar(BoxLayout):
     def __init__(self, **kwargs):
@@ -93,16 +109,35 @@ class StatusBar(BoxLayout):
         self.operation_label.text = operation or 'Ready'
         self.operation_label.color = (0, 0.8, 1, 1) if operation else (1, 1, 1, 1)
 
-class NetworkItem(BoxLayout):
-    def __init__(self, network_data, attack_callback, **kwargs):
+def wps_label(network_data):
+    wps = network_data.get('wps')
+    if wps is None:
+        return 'Unknown'
+    if not wps:
+        return 'Off'
+    return 'Locked' if network_data.get('wps_locked') else 'On'
+
+def network_row(network_data):
+    """RecycleView data entry for one network; display strings are built once here"""
+    return {
+        'network_data': network_data,
+        'essid_text': f"ESSID: {network_data.get('essid', 'Hidden')}",
+        'bssid_text': f"BSSID: {network_data.get('bssid', 'Unknown')}",
+        'channel_text': f"Channel: {network_data.get('channel', 'N/A')}",
+        'power_text': f"Power: {network_data.get('power', 'N/A')} dBm",
+        'encryption_text': f"Encryption: {network_data.get('encryption', 'Unknown')}",
+        'wps_text': f"WPS: {wps_label(network_data)}"
+    }
+
+class NetworkItem(RecycleDataViewBehavior, BoxLayout):
+    """One row of the network list; instances are recycled while scrolling"""
+    
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.orientation = 'vertical'
-        self.size_hint_y = None
-        self.height = dp(120)
         self.padding = [dp(10), dp(5)]
         self.spacing = dp(5)
-        
-        self.network_data = network_data
+        self.network_data = None
         
         # Background
         with self.canvas.before:
@@ -113,51 +148,16 @@ class NetworkItem(BoxLayout):
         
         # Network info
         info_layout = BoxLayout(orientation='horizontal', size_hint_y=0.7)
-        
-        # Left column
         left_col = BoxLayout(orientation='vertical', size_hint_x=0.6)
-        left_col.add_widget(Label(
-            text=f"ESSID: {network_data.get('essid', 'Hidden')}", 
-            text_size=(None, None),
-            halign='left',
-            color=(0, 0, 0, 1)
-        ))
-        left_col.add_widget(Label(
-            text=f"BSSID: {network_data.get('bssid', 'Unknown')}", 
-            text_size=(None, None),
-            halign='left',
-            color=(0, 0, 0, 1)
-        ))
-        left_col.add_widget(Label(
-            text=f"Channel: {network_data.get('channel', 'N/A')}", 
-            text_size=(None, None),
-            halign='left',
-            color=(0, 0, 0, 1)
-        ))
-        
-        # Right column
         right_col = BoxLayout(orientation='vertical', size_hint_x=0.4)
-        right_col.add_widget(Label(
-            text=f"Power: {network_data.get('power', 'N/A')} dBm", 
-            text_size=(None, None),
-            halign='left',
-            color=(0, 0, 0, 1)
-        ))
-        right_col.add_widget(Label(
-            text=f"Encryption: {network_data.get('encryption', 'Unknown')}", 
-            text_size=(None, None),
-            halign='left',
-            color=(0, 0, 0, 1)
-        ))
         
-        wps_pins = network_data.get('wps_pins', [])
-        pin_count = len(wps_pins)
-        right_col.add_widget(Label(
-            text=f"WPS Pins: {pin_count}", 
-            text_size=(None, None),
-            halign='left',
-            color=(0, 0, 0, 1)
-        ))
+        self.labels = {}
+        for column, keys in ((left_col, ('essid_text', 'bssid_text', 'channel_text')),
+                             (right_col, ('power_text', 'encryption_text', 'wps_text'))):
+            for key in keys:
+                label = Label(text_size=(None, None), halign='left', color=(0, 0, 0, 1))
+                self.labels[key] = label
+                column.add_widget(label)
         
         info_layout.add_widget(left_col)
         info_layout.add_widget(right_col)
@@ -169,23 +169,102 @@ class NetworkItem(BoxLayout):
             size_hint_y=0.3,
             background_color=(1, 0.2, 0.2, 1)
         )
-        attack_btn.bind(on_press=lambda x: attack_callback(network_data))
+        attack_btn.bind(on_press=self._on_attack)
         self.add_widget(attack_btn)
     
+    def refresh_view_attrs(self, rv, index, data):
+        """Rebind this row to another network when it is recycled"""
+        self.network_data = data['network_data']
+        for key, label in self.labels.items():
+            label.text = data[key]
+        return super().refresh_view_attrs(rv, index, {})
+    
+    def _on_attack(self, instance):
+        if self.network_data is not None:
+            App.get_running_app().attack_network(self.network_data)
+    
     def _update_rect(self, instance, value):
         self.rect.pos = instance.pos
         self.rect.size = instance.size
 
+class NetworkList(RecycleView):
+    """Virtualised network list: only rows on screen are instantiated"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            spacing=dp(5),
+            default_size=(None, dp(120)),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        # viewclass is stored on the layout manager, so it can only be set once there is one
+        self.viewclass = NetworkItem
+
+def result_row(entry):
+    """RecycleView data entry for one results log entry"""
+    return {'text': f"[{time.strftime('%H:%M:%S', time.localtime(entry.timestamp))}] {entry.text}"}
+
+class ResultItem(RecycleDataViewBehavior, Label):
+    """One line of the results console"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.font_size = '12sp'
+        self.color = (0, 0, 0, 1)
+        self.halign = 'left'
+        self.valign = 'middle'
+        self.shorten = True
+        self.bind(size=self._update_text_size)
+    
+    def _update_text_size(self, instance, value):
+        self.text_size = (self.width, None)
+
+class ResultsList(RecycleView):
+    """Virtualised results console: only lines on screen are instantiated"""
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(30)),
+            default_size_hint=(1, None),
+            size_hint_y=None
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        self.viewclass = ResultItem
+
 class WiFiSecurityApp(App):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.title = 'WiFi Security Tool'
-        self.wps_generator = WPSpin()
-        self.networks = []
-        self.monitor_active = False
-        self.root_access = False
-        self.current_operation = None
-        self.scanning = False
+        self._wifi_manager = None
+        self._lazy_tabs = {}
+        # Per-BSSID view of the survey: deltas come from scan_diff (only
+        # touched on the main thread, see apply_scan()), and the
+        # rows stay sorted by signal through a parallel list of sort keys.
+        # Rows are patched in a plain list and each edit is logged, so a batch
+        # reaches the RecycleView as one refresh of just the rows it touched
+        self.scan_diff = ScanDiff(absence_window=NETWORK_STALE_SECONDS, rssi_threshold=1)
+        self._sort_keys = {}
+        self._order = []
+        self._rows = []
+        self._row_edits = []
+        self._pending_signal = {}
+        self.scan_cache = ScanCache(os.path.join(self.user_data_dir, 'scan_cache.db'))
+        self.results_log = ResultsLog(RESULTS_CAPACITY, spill_path=os.path.join(self.user_data_dir, 'results.log'))
+        # Shared state: worker threads set() it, bound widgets update on the next frame
+        self.state = ObservableState(
+            Clock.schedule_once,
+            root_access=hasattr(os, 'geteuid') and os.geteuid() == 0,
+            monitor_active=False,
+            operation=None,
+            scanning=False
+        )
         
     def build(self):
         # Main layout
@@ -237,25 +316,75 @@ class WiFiSecurityApp(App):
         control_tab.add_widget(control_layout)
         tab_panel.add_widget(control_tab)
         
-        # Networks tab
-        networks_tab = TabbedPanelItem(text='Networks')
-        self.networks_layout = self.create_networks_layout()
-        networks_tab.add_widget(self.networks_layout)
-        tab_panel.add_widget(networks_tab)
+        # Networks and Results tabs are built the first time they are needed
+        self.networks_tab = TabbedPanelItem(text='Networks')
+        self._lazy_tabs[self.networks_tab] = self._build_networks_tab
+        tab_panel.add_widget(self.networks_tab)
         
-        # Results tab
-        results_tab = TabbedPanelItem(text='Results')
-        self.results_layout = self.create_results_layout()
-        results_tab.add_widget(self.results_layout)
-        tab_panel.add_widget(results_tab)
+        self.results_tab = TabbedPanelItem(text='Results')
+        self._lazy_tabs[self.results_tab] = self._build_results_tab
+        tab_panel.add_widget(self.results_tab)
         
+        tab_panel.bind(current_tab=lambda panel, tab: self.ensure_tab_built(tab))
         main_layout.add_widget(tab_panel)
         
-        # Start status updates
-        Clock.schedule_interval(self.update_status, 2)
+        # Status bar and buttons follow the shared state; nothing polls
+        self.state.bind(self.update_status, 'root_access', 'monitor_active', 'operation')
+        self.update_status()
+        self._signal_trigger = Clock.create_trigger(self.flush_signal_updates, 1 / SIGNAL_REFRESH_HZ)
         
         return main_layout
     
+    def on_start(self):
+        # Show the last known networks while the radio is brought up
+        thread = threading.Thread(target=self.load_cached_networks)
+        thread.daemon = True
+        thread.start()
+    
+    def load_cached_networks(self):
+        """Seed the network list from the local scan cache"""
+        try:
+            networks = self.scan_cache.last_survey()
+            Clock.schedule_once(lambda dt: self.apply_scan(networks), 0)
+        except Exception as e:
+            print(f"Scan cache load error: {e}")
+    
+    def apply_scan(self, networks):
+        """Diff a scan and patch the list; main thread only, like scan_diff itself"""
+        events = self.scan_diff.update(networks)
+        self.apply_network_events(events)
+        return events
+    
+    @property
+    def wifi_manager(self):
+        """Shared WiFiManager, created on first use"""
+        if self._wifi_manager is None:
+            from wifi_manager import WiFiManager
+            self._wifi_manager = WiFiManager()
+        return self._wifi_manager
+    
+    def scan_needs_monitor(self):
+        """Whether the scan backend resolves to airodump-ng, which needs monitor mode"""
+        if self._wifi_manager is None:
+            # Before first use no monitor interface is set, so 'auto' means managed;
+            # answered from the environment so the first frame does not load wifi_manager
+            return os.environ.get('SCAN_BACKEND', 'auto') == 'airodump'
+        return self.wifi_manager.resolve_scan_backend() == 'airodump'
+    
+    def ensure_tab_built(self, tab):
+        """Build a lazily created tab's layout if it has not been built yet"""
+        builder = self._lazy_tabs.pop(tab, None)
+        if builder:
+            builder()
+    
+    def _build_networks_tab(self):
+        self.networks_layout = self.create_networks_layout()
+        self.networks_tab.add_widget(self.networks_layout)
+    
+    def _build_results_tab(self):
+        self.results_layout = self.create_results_layout()
+        self.results_tab.add_widget(self.results_layout)
+    
     def _update_header_rect(self, instance, value):
         instance.rect.pos = instance.pos
         instance.rect.size = instance.size
@@ -398,16 +527,7 @@ class WiFiSecurityApp(App):
         header.add_widget(self.network_count_label)
         layout.add_widget(header)
         
-        # Networks scroll view
-        self.networks_scroll = ScrollView()
-        self.networks_container = BoxLayout(
-            orientation='vertical',
-            spacing=dp(5),
-            size_hint_y=None
-        )
-        self.networks_container.bind(minimum_height=self.networks_container.setter('height'))
-        
-        # Initial message
+        # Initial message, shown instead of the list while it is empty
         self.no_networks_label = Label(
             text='No networks scanned yet.\nEnable monitor mode and scan for networks.',
             font_size='14sp',
@@ -415,10 +535,11 @@ class WiFiSecurityApp(App):
             size_hint_y=None,
             height=dp(60)
         )
-        self.networks_container.add_widget(self.no_networks_label)
+        layout.add_widget(self.no_networks_label)
         
-        self.networks_scroll.add_widget(self.networks_container)
-        layout.add_widget(self.networks_scroll)
+        # Virtualised network list
+        self.networks_list = NetworkList()
+        layout.add_widget(self.networks_list)
         
         return layout
     
@@ -434,48 +555,45 @@ class WiFiSecurityApp(App):
             color=(0, 0, 0, 1)
         ))
         
-        self.results_scroll = ScrollView()
-        self.results_text = Label(
+        # Initial message, shown instead of the console while it is empty
+        self.no_results_label = Label(
             text='No attacks performed yet.',
             font_size='12sp',
-            text_size=(None, None),
-            color=(0, 0, 0, 1)
+            color=(0, 0, 0, 1),
+            size_hint_y=None,
+            height=dp(40)
         )
-        self.results_scroll.add_widget(self.results_text)
-        layout.add_widget(self.results_scroll)
+        layout.add_widget(self.no_results_label)
+        
+        # Virtualised results console over the ring buffer
+        self.results_list = ResultsList()
+        self.results_list.data = [result_row(entry) for entry in self.results_log]
+        layout.add_widget(self.results_list)
+        self.update_results_placeholder()
         
         return layout
     
-    def update_status(self, dt):
-        """Update system status"""
-        try:
-            # Check root access
-            self.root_access = os.geteuid() == 0
-            
-            # Update UI
-            self.status_bar.update_status(
-                root_access=self.root_access,
-                monitor_active=self.monitor_active,
-                operation=self.current_operation
-            )
-            
-            # Update button states  
-            self.update_button_states()
-            
-        except Exception as e:
-            print(f"Status update error: {e}")
+    def update_status(self, changes=None):
+        """Refresh the status bar and buttons from the shared state"""
+        self.status_bar.update_status(
+            root_access=self.state['root_access'],
+            monitor_active=self.state['monitor_active'],
+            operation=self.state['operation']
+        )
+        self.update_button_states()
     
     def update_button_states(self):
         """Update button enabled/disabled states"""
-        has_operation = self.current_operation is not None
+        has_operation = self.state['operation'] is not None
+        monitor_active = self.state['monitor_active']
         
         self.setup_btn.disabled = has_operation
-        self.monitor_btn.disabled = not self.root_access or has_operation
-        self.scan_btn.disabled = not self.monitor_active or has_operation
+        self.monitor_btn.disabled = not self.state['root_access'] or has_operation
+        self.scan_btn.disabled = (self.scan_needs_monitor() and not monitor_active) or has_operation
         self.stop_btn.disabled = not has_operation
         
         # Update monitor button text
-        if self.monitor_active:
+        if monitor_active:
             self.monitor_btn.text = 'Disable Monitor Mode'
             self.monitor_btn.background_color = (0.8, 0.2, 0.2, 1)
         else:
@@ -484,11 +602,11 @@ class WiFiSecurityApp(App):
     
     def setup_system(self, instance):
         """Setup system dependencies"""
-        if not self.root_access:
+        if not self.state['root_access']:
             self.show_popup('Error', 'Root access required for system setup')
             return
         
-        self.current_operation = 'Installing dependencies...'
+        self.state.set(operation='Installing dependencies...')
         
         def run_setup():
             try:
@@ -497,21 +615,15 @@ class WiFiSecurityApp(App):
                                       capture_output=True, text=True, timeout=300)
                 
                 if result.returncode == 0:
-                    self.current_operation = 'Setup completed successfully'
+                    self.state.flash(STATUS_MESSAGE_SECONDS, operation='Setup completed successfully')
                     Clock.schedule_once(lambda dt: self.show_popup('Success', 'Dependencies installed successfully'), 0)
                 else:
-                    self.current_operation = 'Setup failed'
+                    self.state.flash(STATUS_MESSAGE_SECONDS, operation='Setup failed')
                     Clock.schedule_once(lambda dt: self.show_popup('Error', f'Setup failed: {result.stderr}'), 0)
                 
-                # Clear operation after delay
-                time.sleep(3)
-                self.current_operation = None
-                
             except Exception as e:
-                self.current_operation = f'Setup error: {str(e)}'
+                self.state.flash(STATUS_MESSAGE_SECONDS, operation=f'Setup error: {str(e)}')
                 Clock.schedule_once(lambda dt: self.show_popup('Error', f'Setup error: {str(e)}'), 0)
-                time.sleep(3)
-                self.current_operation = None
         
         thread = threading.Thread(target=run_setup)
         thread.daemon = True
@@ -519,32 +631,30 @@ class WiFiSecurityApp(App):
     
     def toggle_monitor_mode(self, instance):
         """Toggle monitor mode on/off"""
-        if not self.root_access:
+        if not self.state['root_access']:
             self.show_popup('Error', 'Root access required for monitor mode')
             return
         
-        self.current_operation = 'Toggling monitor mode...'
+        self.state.set(operation='Toggling monitor mode...')
         
         def run_toggle():
             try:
-                from wifi_manager import WiFiManager
-                wifi_manager = WiFiManager()
+                wifi_manager = self.wifi_manager
                 
-                if self.monitor_active:
+                if self.state['monitor_active']:
                     result = wifi_manager.disable_monitor_mode()
-                    self.monitor_active = False
+                    self.state.set(monitor_active=False, operation=None)
                     message = 'Monitor mode disabled'
                 else:
                     result = wifi_manager.enable_monitor_mode()
-                    self.monitor_active = result
+                    self.state.set(monitor_active=bool(result), operation=None)
                     message = 'Monitor mode enabled' if result else 'Failed to enable monitor mode'
                 
                 Clock.schedule_once(lambda dt: self.show_popup('Info', message), 0)
-                self.current_operation = None
                 
             except Exception as e:
                 Clock.schedule_once(lambda dt: self.show_popup('Error', f'Monitor mode error: {str(e)}'), 0)
-                self.current_operation = None
+                self.state.set(operation=None)
         
         thread = threading.Thread(target=run_toggle)
         thread.daemon = True
@@ -552,62 +662,146 @@ class WiFiSecurityApp(App):
     
     def scan_networks(self, instance):
         """Scan for WiFi networks"""
-        if not self.monitor_active:
+        # Without monitor mode the default backend surveys from the managed interface
+        if self.scan_needs_monitor() and not self.state['monitor_active']:
             self.show_popup('Error', 'Monitor mode must be enabled for scanning')
             return
         
-        self.current_operation = 'Scanning for networks...'
-        self.scanning = True
+        self.state.set(operation='Scanning for networks...', scanning=True)
         
         def run_scan():
             try:
-                from wifi_manager import WiFiManager
-                wifi_manager = WiFiManager()
+                wifi_manager = self.wifi_manager
                 
                 networks = wifi_manager.scan_networks()
-                self.networks = networks
                 
-                Clock.schedule_once(lambda dt: self.update_networks_display(), 0)
+                Clock.schedule_once(lambda dt: self.apply_scan(networks), 0)
+                self.scan_cache.record_scan(networks)
                 
-                self.current_operation = f'Found {len(networks)} networks'
-                time.sleep(2)
-                self.current_operation = None
-                self.scanning = False
+                self.state.set(scanning=False)
+                self.state.flash(2, operation=f'Found {len(networks)} networks')
                 
             except Exception as e:
                 Clock.schedule_once(lambda dt: self.show_popup('Error', f'Scan error: {str(e)}'), 0)
-                self.current_operation = None
-                self.scanning = False
+                self.state.set(operation=None, scanning=False)
         
         thread = threading.Thread(target=run_scan)
         thread.daemon = True
         thread.start()
     
-    def update_networks_display(self):
-        """Update the networks display"""
-        self.networks_container.clear_widgets()
-        self.network_count_label.text = f'{len(self.networks)} networks'
-        
-        if not self.networks:
-            self.no_networks_label = Label(
-                text='No networks found. Try scanning again.',
-                font_size='14sp',
-                color=(0.5, 0.5, 0.5, 1),
-                size_hint_y=None,
-                height=dp(60)
-            )
-            self.networks_container.add_widget(self.no_networks_label)
+    def apply_network_events(self, events):
+        """Patch the network list with per-BSSID scan deltas"""
+        self.ensure_tab_built(self.networks_tab)
+        for event in events:
+            if event.kind == APPEARED:
+                self._insert_row(event.bssid_int, event.record)
+            elif event.kind == CHANGED:
+                self._pending_signal.pop(event.bssid_int, None)
+                self._update_row(event.bssid_int, event.record)
+            elif event.kind == RSSI:
+                # Coalesced and applied by flush_signal_updates()
+                self._pending_signal[event.bssid_int] = event.record
+                self._signal_trigger()
+            elif event.kind == DISAPPEARED:
+                self._pending_signal.pop(event.bssid_int, None)
+                self._remove_row(event.bssid_int)
+        self.publish_rows()
+        self.update_network_count()
+    
+    def flush_signal_updates(self, dt):
+        """Apply the signal changes collected since the last UI refresh"""
+        if not self._pending_signal:
+            return
+        pending, self._pending_signal = self._pending_signal, {}
+        for bssid, network in pending.items():
+            if bssid in self._sort_keys:
+                self._update_row(bssid, network)
+        self.publish_rows()
+    
+    def publish_rows(self):
+        """Give the RecycleView the patched rows: one data refresh per batch, of the edited rows only"""
+        edits, self._row_edits = self._row_edits, []
+        if not edits:
+            return
+        view = self.networks_list
+        data = view.data
+        grown = sum((kind == 'inserted') - (kind == 'removed') for kind, index, row in edits)
+        if len(edits) > len(self._rows) // 2 or len(data) != len(self._rows) - grown:
+            # Most rows changed (e.g. the first scan): one full refresh is cheaper
+            view.data = list(self._rows)
+            return
+        # Replay the edits with plain list methods, which skip the per-operation
+        # events of Kivy's ObservableList, then flag the same indices in one refresh
+        flags = []
+        for kind, index, row in edits:
+            if kind == 'inserted':
+                list.insert(data, index, row)
+                flags.append({'inserted': index})
+            elif kind == 'removed':
+                list.__delitem__(data, index)
+                flags.append({'removed': index})
+            else:
+                list.__setitem__(data, index, row)
+                flags.append({'modified': slice(index, index + 1)})
+        view.data_model._last_len = len(data)
+        for flag in flags:
+            view.refresh_from_data(**flag)
+    
+    def update_network_count(self):
+        count = len(self._sort_keys)
+        self.network_count_label.text = f'{count} networks'
+        if count:
+            self.no_networks_label.height = 0
+            self.no_networks_label.opacity = 0
+        else:
+            self.no_networks_label.text = 'No networks found. Try scanning again.'
+            self.no_networks_label.height = dp(60)
+            self.no_networks_label.opacity = 1
+    
+    @staticmethod
+    def _sort_key(bssid, network):
+        power = network.get('power')
+        return (-(power if power is not None else -1000), bssid)
+    
+    def _insert_row(self, bssid, network):
+        if bssid in self._sort_keys:
+            return self._update_row(bssid, network)
+        key = self._sort_key(bssid, network)
+        index = bisect_left(self._order, key)
+        self._order.insert(index, key)
+        self._sort_keys[bssid] = key
+        row = network_row(network)
+        self._rows.insert(index, row)
+        self._row_edits.append(('inserted', index, row))
+    
+    def _update_row(self, bssid, network):
+        key = self._sort_keys.get(bssid)
+        if key is None:
+            return self._insert_row(bssid, network)
+        if key == self._sort_key(bssid, network):
+            # Same position: only this row changes
+            index = bisect_left(self._order, key)
+            row = self._rows[index] = network_row(network)
+            self._row_edits.append(('modified', index, row))
         else:
-            for network in self.networks:
-                network_item = NetworkItem(network, self.attack_network)
-                self.networks_container.add_widget(network_item)
+            self._remove_row(bssid)
+            self._insert_row(bssid, network)
+    
+    def _remove_row(self, bssid):
+        key = self._sort_keys.pop(bssid, None)
+        if key is None:
+            return
+        index = bisect_left(self._order, key)
+        del self._order[index]
+        del self._rows[index]
+        self._row_edits.append(('removed', index, None))
     
     def attack_network(self, network_data):
         """Attack selected network"""
         bssid = network_data.get('bssid')
         essid = network_data.get('essid', 'Hidden')
         
-        if not self.monitor_active:
+        if not self.state['monitor_active']:
             self.show_popup('Error', 'Monitor mode must be enabled for attacks')
             return
         
@@ -618,7 +812,8 @@ class WiFiSecurityApp(App):
             font_size='14sp'
         ))
         
-        wps_pins = network_data.get('wps_pins', [])
+        # Pin suggestions are only worked out when an attack is being set up
+        wps_pins = self.wifi_manager.suggested_pins(bssid)
         if wps_pins:
             pins_text = '\n'.join([f"{pin['name']}: {pin['pin']}" for pin in wps_pins[:3]])
             content.add_widget(Label(
@@ -659,12 +854,11 @@ class WiFiSecurityApp(App):
         bssid = network_data.get('bssid')
         essid = network_data.get('essid', 'Hidden')
         
-        self.current_operation = f'Attacking {essid}...'
+        self.state.set(operation=f'Attacking {essid}...')
         
         def run_attack():
             try:
-                from wifi_manager import WiFiManager
-                wifi_manager = WiFiManager()
+                wifi_manager = self.wifi_manager
                 
                 result = wifi_manager.attack_network(bssid, essid)
                 
@@ -677,24 +871,35 @@ class WiFiSecurityApp(App):
                     Clock.schedule_once(lambda dt: self.show_popup('Failed', message), 0)
                     Clock.schedule_once(lambda dt: self.update_results(f"Attack failed on {essid}: {result.get('error', 'Unknown error')}"), 0)
                 
-                self.current_operation = None
+                self.state.set(operation=None)
                 
             except Exception as e:
                 Clock.schedule_once(lambda dt: self.show_popup('Error', f'Attack error: {str(e)}'), 0)
                 Clock.schedule_once(lambda dt: self.update_results(f"Attack error on {essid}: {str(e)}"), 0)
-                self.current_operation = None
+                self.state.set(operation=None)
         
         thread = threading.Thread(target=run_attack)
         thread.daemon = True
         thread.start()
     
     def update_results(self, result_text):
-        """Update attack results"""
-        current_text = self.results_text.text
-        if current_text == 'No attacks performed yet.':
-            self.results_text.text = result_text
+        """Append a line to the results console"""
+        self.ensure_tab_built(self.results_tab)
+        entry, evicted = self.results_log.append(result_text)
+        data = self.results_list.data
+        if evicted is not None and data:
+            del data[0]
+        data.append(result_row(entry))
+        self.results_list.scroll_y = 0
+        self.update_results_placeholder()
+    
+    def update_results_placeholder(self):
+        if len(self.results_log):
+            self.no_results_label.height = 0
+            self.no_results_label.opacity = 0
         else:
-            self.results_text.text = f"{current_text}\n\n{result_text}"
+            self.no_results_label.height = dp(40)
+            self.no_results_label.opacity = 1
     
     def stop_operation(self, instance):
         """Stop current operation"""
@@ -703,8 +908,7 @@ class WiFiSecurityApp(App):
             subprocess.run(['pkill', '-f', 'airodump-ng'], capture_output=True)
             subprocess.run(['pkill', '-f', 'reaver'], capture_output=True)
             
-            self.current_operation = None
-            self.scanning = False
+            self.state.set(operation=None, scanning=False)
             self.show_popup('Info', 'Operation stopped')
             
         except Exception as e:
@@ -727,5 +931,9 @@ class WiFiSecurityApp(App):
         close_btn.bind(on_press=popup.dismiss)
         popup.open()
 
+    def on_stop(self):
+        self.results_log.close()
+        self.scan_cache.close()
+
 if __name__ == '__main__':
     WiFiSecurityApp().run()
\ No newline at end of file
@@ -14,9 +14,22 @@ from sqlalchemy.dialects.postgresql import JSON
 
 db = SQLAlchemy()
 
+# Bump whenever a table, column or index is added so workers re-run
+# ensure_schema(). create_all() only creates missing tables; columns and
+# indexes added to an existing table must also be listed in SCHEMA_MIGRATIONS.
+SCHEMA_VERSION = 5
+
+# Additions to existing tables by the version that introduced them:
+# "table.column" for a column, otherwise the name of an index
+SCHEMA_MIGRATIONS = {
+    3: ['networks.client_count', 'ix_networks_client_count'],
+    4: ['ix_networks_manufacturer', 'ix_networks_wps_state'],
+}
+
 class Network(db.Model):
     """Model for discovered WiFi networks"""
     __tablename__ = 'networks'
+    __table_args__ = (db.Index('ix_networks_wps_state', 'wps_enabled', 'wps_locked'),)
     
     id = db.Column(db.Integer, primary_key=True)
     bssid = db.Column(db.String(17), unique=True, nullable=False)  # MAC address
@@ -27,13 +40,15 @@ class Network(db.Model):
     signal_strength = db.Column(db.Integer, nullable=True)  # dBm
     wps_enabled = db.Column(db.Boolean, default=False)
     wps_locked = db.Column(db.Boolean, default=False)
-    manufacturer = db.Column(db.String(100), nullable=True)
+    manufacturer = db.Column(db.String(100), nullable=True, index=True)
+    client_count = db.Column(db.Integer, default=0, index=True)  # Distinct stations ever associated
     first_seen = db.Column(db.DateTime, default=datetime.utcnow)
     last_seen = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
     scan_results = db.relationship('ScanResult', backref='network', lazy=True, cascade='all, delete-orphan')
     attack_logs = db.relationship('AttackLog', backref='network', lazy=True, cascade='all, delete-orphan')
+    associations = db.relationship('Association', backref='network', lazy=True, cascade='all, delete-orphan')
     
     def __repr__(self):
         return f'<Network {self.bssid}: {self.ssid}>'
@@ -50,10 +65,93 @@ class Network(db.Model):
             'wps_enabled': self.wps_enabled,
             'wps_locked': self.wps_locked,
             'manufacturer': self.manufacturer,
+            'client_count': self.client_count,
+            'first_seen': self.first_seen.isoformat() if self.first_seen else None,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None
+        }
+
+class Station(db.Model):
+    """Model for client stations seen in the station section of a scan"""
+    __tablename__ = 'stations'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    mac = db.Column(db.String(17), unique=True, nullable=False)
+    manufacturer = db.Column(db.String(100), nullable=True)
+    signal_strength = db.Column(db.Integer, nullable=True)  # dBm
+    packets = db.Column(db.Integer, default=0)
+    probed_essids = db.Column(JSON, nullable=True)
+    current_network_id = db.Column(db.Integer, db.ForeignKey('networks.id'), nullable=True, index=True)
+    ap_count = db.Column(db.Integer, default=0, index=True)  # Distinct APs ever associated with
+    first_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    associations = db.relationship('Association', backref='station', lazy=True, cascade='all, delete-orphan')
+    
+    def __repr__(self):
+        return f'<Station {self.mac}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'mac': self.mac,
+            'manufacturer': self.manufacturer,
+            'signal_strength': self.signal_strength,
+            'packets': self.packets,
+            'probed_essids': self.probed_essids,
+            'current_network_id': self.current_network_id,
+            'ap_count': self.ap_count,
+            'first_seen': self.first_seen.isoformat() if self.first_seen else None,
+            'last_seen': self.last_seen.isoformat() if self.last_seen else None
+        }
+
+class Association(db.Model):
+    """Model for a station-to-AP association edge"""
+    __tablename__ = 'associations'
+    __table_args__ = (db.UniqueConstraint('station_id', 'network_id'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    station_id = db.Column(db.Integer, db.ForeignKey('stations.id'), nullable=False, index=True)
+    network_id = db.Column(db.Integer, db.ForeignKey('networks.id'), nullable=False, index=True)
+    sightings = db.Column(db.Integer, default=1)
+    first_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    last_seen = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Association station {self.station_id} -> network {self.network_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'station_id': self.station_id,
+            'network_id': self.network_id,
+            'sightings': self.sightings,
             'first_seen': self.first_seen.isoformat() if self.first_seen else None,
             'last_seen': self.last_seen.isoformat() if self.last_seen else None
         }
 
+class RoamEvent(db.Model):
+    """Model for a station moving from one AP to another between scans"""
+    __tablename__ = 'roam_events'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    station_id = db.Column(db.Integer, db.ForeignKey('stations.id'), nullable=False, index=True)
+    from_network_id = db.Column(db.Integer, db.ForeignKey('networks.id'), nullable=True)
+    to_network_id = db.Column(db.Integer, db.ForeignKey('networks.id'), nullable=False)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    
+    def __repr__(self):
+        return f'<RoamEvent station {self.station_id}: {self.from_network_id} -> {self.to_network_id}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'station_id': self.station_id,
+            'from_network_id': self.from_network_id,
+            'to_network_id': self.to_network_id,
+            'timestamp': self.timestamp.isoformat() if self.timestamp else None
+        }
+
 class ScanResult(db.Model):
     """Model for individual scan results"""
     __tablename__ = 'scan_results'
@@ -174,4 +272,50 @@ class Session(db.Model):
             'activities': self.activities,
             'networks_scanned': self.networks_scanned,
             'attacks_performed': self.attacks_performed
-        }
\ No newline at end of file
+        }
+
+class TrustedNetwork(db.Model):
+    """Model for an allow-listed AP of our own, used for evil-twin detection"""
+    __tablename__ = 'trusted_networks'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    bssid = db.Column(db.String(17), unique=True, nullable=False)
+    ssid = db.Column(db.String(255), nullable=False, index=True)
+    channel = db.Column(db.Integer, nullable=True)
+    encryption = db.Column(db.String(50), nullable=True)
+    manufacturer = db.Column(db.String(100), nullable=True)
+    notes = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<TrustedNetwork {self.bssid}: {self.ssid}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'bssid': self.bssid,
+            'ssid': self.ssid,
+            'channel': self.channel,
+            'encryption': self.encryption,
+            'manufacturer': self.manufacturer,
+            'notes': self.notes,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class AppState(db.Model):
+    """Model for runtime state shared between worker processes"""
+    __tablename__ = 'app_state'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    value = db.Column(JSON, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<AppState {self.key}>'
+    
+    def to_dict(self):
+        return {
+            'key': self.key,
+            'value': self.value,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Virtual Monitor Interfaces
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Adds a monitor-mode vif next to the managed interface on the same phy
+(nl80211 NEW_INTERFACE, then rtnetlink to bring it up) and removes it
+again with DEL_INTERFACE. The managed interface and NetworkManager keep
+running, so the host stays connected; while it is associated the vif
+listens on the managed interface's channel. Falls back to
+`iw phy#<index> interface add` / `iw dev <vif> del` without nl80211.
+"""
+
+import logging
+import socket
+import netlink
+from iface_watcher import IFINFOMSG, IFF_UP, RTM_NEWLINK
+from wireless_caps import (capabilities, parse_nl80211_interface, phy_index, IFTYPE_IDS, NL80211_ATTR_WIPHY,
+                           NL80211_ATTR_IFINDEX, NL80211_ATTR_IFNAME, NL80211_ATTR_IFTYPE)
+from metrics import timed_run
+
+logger = logging.getLogger(__name__)
+
+NL80211_CMD_NEW_INTERFACE = 7
+NL80211_CMD_DEL_INTERFACE = 8
+IFNAMSIZ = 16
+
+def vif_name(interface):
+    """Monitor vif name for a managed interface, e.g. wlan0 -> wlan0mon"""
+    return interface[:IFNAMSIZ - 4] + 'mon'
+
+def _nl80211():
+    """nl80211 socket, or None where netlink or the nl80211 family is unavailable"""
+    if not netlink.available():
+        return None
+    try:
+        return netlink.GenericNetlink('nl80211')
+    except OSError as e:
+        logger.debug(f"nl80211 unavailable ({e}); using iw")
+        return None
+
+def set_link_up(ifindex, up=True):
+    """Set or clear IFF_UP on a link through rtnetlink"""
+    with netlink.NetlinkSocket(netlink.NETLINK_ROUTE) as route:
+        route.request(RTM_NEWLINK, IFINFOMSG.pack(0, 0, ifindex, IFF_UP if up else 0, IFF_UP))
+
+def add_monitor_vif(phy, name):
+    """Create and bring up a monitor vif on phy; returns its interface dict"""
+    nl = _nl80211()
+    if nl is None:
+        # iw addresses a phy by index as phy#<index>, which survives renames
+        index = phy_index(phy)
+        target = ['phy', phy] if index is None else [f'phy#{index}']
+        result = timed_run(['iw'] + target + ['interface', 'add', name, 'type', 'monitor'],
+                           capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"iw could not add {name}: {result.stderr.strip()}")
+        try:
+            timed_run(['ip', 'link', 'set', name, 'up'], check=True)
+        except Exception:
+            _discard_vif(name)
+            raise
+        return {'ifname': name, 'ifindex': None, 'phy': phy, 'type': 'monitor'}
+
+    phy_caps = capabilities.phy(phy)
+    if phy_caps is None:
+        raise Exception(f"Unknown phy {phy}")
+    with nl:
+        replies = nl.command(NL80211_CMD_NEW_INTERFACE,
+                             netlink.attr_u32(NL80211_ATTR_WIPHY, phy_caps.index) +
+                             netlink.attr_str(NL80211_ATTR_IFNAME, name) +
+                             netlink.attr_u32(NL80211_ATTR_IFTYPE, IFTYPE_IDS['monitor']))
+    try:
+        iface = parse_nl80211_interface(replies[0][1]) if replies else {'ifindex': None}
+        if iface['ifindex'] is None:
+            iface = dict(iface, ifname=name, ifindex=socket.if_nametoindex(name), phy=phy, type='monitor')
+        set_link_up(iface['ifindex'])
+    except Exception:
+        _discard_vif(name)
+        raise
+    return iface
+
+def _discard_vif(name):
+    """Remove a vif that was created but could not be brought up; the original error is what gets raised"""
+    try:
+        delete_monitor_vif(name)
+    except Exception as e:
+        logger.warning(f"Could not remove {name} after a failed setup: {e}")
+
+def delete_monitor_vif(name):
+    """Remove a vif created by add_monitor_vif()"""
+    nl = _nl80211()
+    if nl is None:
+        timed_run(['iw', 'dev', name, 'del'], check=True, capture_output=True, text=True)
+        return
+    with nl:
+        nl.command(NL80211_CMD_DEL_INTERFACE, netlink.attr_u32(NL80211_ATTR_IFINDEX, socket.if_nametoindex(name)))
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Netlink Sockets
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Minimal netlink / generic netlink client on the standard library's
+AF_NETLINK sockets: message framing, attribute packing and parsing,
+request/dump with ACK handling, and generic netlink family resolution.
+Used for nl80211 and rtnetlink so wireless state can be read and changed
+without forking iw or ip.
+"""
+
+import errno
+import os
+import socket
+import struct
+import threading
+
+NETLINK_ROUTE = 0
+NETLINK_GENERIC = 16
+
+NLMSG_NOOP = 1
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLM_F_REQUEST = 0x1
+NLM_F_MULTI = 0x2
+NLM_F_ACK = 0x4
+NLM_F_DUMP = 0x300
+NLM_F_CREATE = 0x400
+NLM_F_EXCL = 0x200
+
+NLA_F_NESTED = 0x8000
+NLA_TYPE_MASK = 0x3fff
+
+SOL_NETLINK = 270
+NETLINK_ADD_MEMBERSHIP = 1
+
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+CTRL_ATTR_MCAST_GROUPS = 7
+CTRL_ATTR_MCAST_GRP_NAME = 1
+CTRL_ATTR_MCAST_GRP_ID = 2
+
+RECV_BUFFER = 1 << 17
+
+NLMSG_HEADER = struct.Struct('=IHHII')
+NLA_HEADER = struct.Struct('=HH')
+GENL_HEADER = struct.Struct('=BBH')
+U8 = struct.Struct('=B')
+U16 = struct.Struct('=H')
+U32 = struct.Struct('=I')
+U64 = struct.Struct('=Q')
+I32 = struct.Struct('=i')
+
+class NetlinkError(OSError):
+    """A netlink request was rejected by the kernel"""
+
+def available():
+    return hasattr(socket, 'AF_NETLINK')
+
+def _align(length):
+    return (length + 3) & ~3
+
+def attr(attr_type, data=b''):
+    """One netlink attribute, padded to 4 bytes"""
+    length = NLA_HEADER.size + len(data)
+    return NLA_HEADER.pack(length, attr_type) + data + b'\0' * (_align(length) - length)
+
+def attr_u32(attr_type, value):
+    return attr(attr_type, U32.pack(value))
+
+def attr_str(attr_type, value):
+    return attr(attr_type, value.encode() + b'\0')
+
+def attr_flag(attr_type):
+    return attr(attr_type)
+
+def attr_nested(attr_type, *children):
+    return attr(attr_type | NLA_F_NESTED, b''.join(children))
+
+def iter_attrs(data, offset=0):
+    """Yield (type, payload) for each attribute in data"""
+    end = len(data)
+    unpack = NLA_HEADER.unpack_from
+    while offset + NLA_HEADER.size <= end:
+        length, attr_type = unpack(data, offset)
+        if length < NLA_HEADER.size:
+            break
+        yield attr_type & NLA_TYPE_MASK, data[offset + NLA_HEADER.size:offset + length]
+        offset += _align(length)
+
+def parse_attrs(data, offset=0):
+    """Attributes as {type: payload}; later duplicates win"""
+    return dict(iter_attrs(data, offset))
+
+def get_u8(attrs, attr_type, default=None):
+    value = attrs.get(attr_type)
+    return U8.unpack_from(value)[0] if value else default
+
+def get_u16(attrs, attr_type, default=None):
+    value = attrs.get(attr_type)
+    return U16.unpack_from(value)[0] if value else default
+
+def get_u32(attrs, attr_type, default=None):
+    value = attrs.get(attr_type)
+    return U32.unpack_from(value)[0] if value else default
+
+def get_s32(attrs, attr_type, default=None):
+    value = attrs.get(attr_type)
+    return I32.unpack_from(value)[0] if value else default
+
+def get_u64(attrs, attr_type, default=None):
+    value = attrs.get(attr_type)
+    return U64.unpack_from(value)[0] if value else default
+
+def get_str(attrs, attr_type, default=None):
+    value = attrs.get(attr_type)
+    return value.split(b'\0', 1)[0].decode(errors='replace') if value is not None else default
+
+def iter_messages(data):
+    """Yield (type, flags, seq, payload) for each message in a datagram"""
+    offset = 0
+    end = len(data)
+    while offset + NLMSG_HEADER.size <= end:
+        length, msg_type, flags, seq, _pid = NLMSG_HEADER.unpack_from(data, offset)
+        if length < NLMSG_HEADER.size:
+            break
+        yield msg_type, flags, seq, data[offset + NLMSG_HEADER.size:offset + length]
+        offset += _align(length)
+
+class NetlinkSocket:
+    """A netlink socket with request/response and multicast helpers"""
+
+    def __init__(self, protocol, groups=0):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW | socket.SOCK_CLOEXEC, protocol)
+        self.sock.bind((0, groups))
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def close(self):
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_membership(self, group):
+        self.sock.setsockopt(SOL_NETLINK, NETLINK_ADD_MEMBERSHIP, group)
+
+    def request(self, msg_type, payload, flags=0, dump=False):
+        """Send one request and collect the replies until DONE or the ACK; raises NetlinkError"""
+        flags |= NLM_F_REQUEST | (NLM_F_DUMP if dump else NLM_F_ACK)
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            self.sock.send(NLMSG_HEADER.pack(NLMSG_HEADER.size + len(payload), msg_type, flags, seq, 0) + payload)
+            replies = []
+            while True:
+                data = self.sock.recv(RECV_BUFFER)
+                for reply_type, _flags, reply_seq, body in iter_messages(data):
+                    if reply_seq != seq:
+                        continue  # multicast notification or a stale reply
+                    if reply_type == NLMSG_ERROR:
+                        code = -I32.unpack_from(body)[0]
+                        if code:
+                            raise NetlinkError(code, os.strerror(code))
+                        return replies
+                    if reply_type == NLMSG_DONE:
+                        return replies
+                    if reply_type != NLMSG_NOOP:
+                        replies.append((reply_type, body))
+
+    def receive(self):
+        """Block for the next datagram; returns its (type, payload) messages"""
+        data = self.sock.recv(RECV_BUFFER)
+        return [(msg_type, body) for msg_type, _flags, _seq, body in iter_messages(data)]
+
+class GenericNetlink(NetlinkSocket):
+    """Generic netlink socket bound to one family (e.g. nl80211)"""
+
+    def __init__(self, family):
+        super().__init__(NETLINK_GENERIC)
+        self.family = family
+        try:
+            self.family_id, self.groups = self._resolve(family)
+        except OSError:
+            self.close()
+            raise
+
+    def _resolve(self, family):
+        payload = GENL_HEADER.pack(CTRL_CMD_GETFAMILY, 1, 0) + attr_str(CTRL_ATTR_FAMILY_NAME, family)
+        try:
+            replies = self.request(GENL_ID_CTRL, payload)
+        except NetlinkError as e:
+            if e.errno == errno.ENOENT:
+                raise NetlinkError(errno.ENOENT, f'generic netlink family {family} not found') from None
+            raise
+        attrs = parse_attrs(replies[0][1], GENL_HEADER.size)
+        groups = {}
+        for _index, group in iter_attrs(attrs.get(CTRL_ATTR_MCAST_GROUPS, b'')):
+            group_attrs = parse_attrs(group)
+            groups[get_str(group_attrs, CTRL_ATTR_MCAST_GRP_NAME)] = get_u32(group_attrs, CTRL_ATTR_MCAST_GRP_ID)
+        return get_u16(attrs, CTRL_ATTR_FAMILY_ID), groups
+
+    def command(self, cmd, attrs=b'', dump=False, flags=0):
+        """Run a family command; returns (cmd, {attr: payload}) per reply"""
+        payload = GENL_HEADER.pack(cmd, 1, 0) + attrs
+        return [(body[0], parse_attrs(body, GENL_HEADER.size))
+                for _type, body in self.request(self.family_id, payload, flags=flags, dump=dump)]
+
+    def subscribe(self, group):
+        """Join one of the family's multicast groups by name"""
+        if group not in self.groups:
+            raise NetlinkError(errno.ENOENT, f'{self.family} has no multicast group {group}')
+        self.add_membership(self.groups[group])
+
+    def receive(self):
+        """Block for the next datagram; returns (cmd, {attr: payload}) for this family's messages"""
+        return [(body[0], parse_attrs(body, GENL_HEADER.size))
+                for msg_type, body in super().receive() if msg_type == self.family_id]
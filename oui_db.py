@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - OUI Vendor Index
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Resolves MAC addresses to the registered vendor. The IEEE MA-L, MA-M and
+MA-S registries (24, 28 and 36-bit prefixes) are compiled once into a
+sorted fixed-width binary file, which is memory-mapped and binary-searched
+longest prefix first. Nothing is loaded into a dict at startup.
+
+    python3 oui_db.py build oui.csv mam.csv oui36.csv -o oui.idx
+    python3 oui_db.py download -o oui.idx
+    python3 oui_db.py lookup 00:1A:2B:00:00:01
+"""
+
+import argparse
+import csv
+import io
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = os.environ.get('OUI_DB') or os.path.join(os.path.dirname(os.path.abspath(__file__)), 'oui.idx')
+IEEE_SOURCES = (
+    'https://standards-oui.ieee.org/oui/oui.csv',
+    'https://standards-oui.ieee.org/oui28/mam.csv',
+    'https://standards-oui.ieee.org/oui36/oui36.csv',
+)
+LOCALLY_ADMINISTERED = 'Locally administered'
+
+MAGIC = b'OUIX'
+VERSION = 1
+PREFIX_BITS = (36, 28, 24)  # Searched in this order, so the longest match wins
+HEADER = struct.Struct('>4sHxx' + 'BxxxII' * len(PREFIX_BITS) + 'I')
+RECORD = struct.Struct('>QI')  # prefix, offset of the vendor name
+CACHE_SIZE = 65536
+
+def mac_value(mac):
+    """Accept a MAC as text or as a 48-bit int"""
+    if isinstance(mac, int):
+        return mac
+    return int(mac.replace(':', '').replace('-', '').replace('.', ''), 16)
+
+def is_locally_administered(mac):
+    """True for locally administered addresses, which includes randomized client MACs"""
+    return bool((mac_value(mac) >> 40) & 0x02)
+
+def is_multicast(mac):
+    return bool((mac_value(mac) >> 40) & 0x01)
+
+def read_registry(fileobj):
+    """Yield (prefix_bits, prefix, vendor) from an IEEE registry CSV"""
+    for row in csv.DictReader(fileobj):
+        assignment = (row.get('Assignment') or '').strip()
+        vendor = (row.get('Organization Name') or '').strip()
+        if not assignment or not vendor:
+            continue
+        try:
+            prefix = int(assignment, 16)
+        except ValueError:
+            continue
+        yield len(assignment) * 4, prefix, vendor
+
+def build_index(entries, path):
+    """Compile (prefix_bits, prefix, vendor) entries into a sorted index file"""
+    sections = {bits: {} for bits in PREFIX_BITS}
+    for bits, prefix, vendor in entries:
+        if bits in sections:
+            sections[bits][prefix] = vendor
+
+    names = bytearray()
+    name_offsets = {}
+    tables = []
+    for bits in PREFIX_BITS:
+        table = bytearray()
+        for prefix in sorted(sections[bits]):
+            vendor = sections[bits][prefix]
+            offset = name_offsets.get(vendor)
+            if offset is None:
+                encoded = vendor.encode('utf-8')[:255]
+                offset = name_offsets[vendor] = len(names)
+                names += bytes((len(encoded),)) + encoded
+            table += RECORD.pack(prefix, offset)
+        tables.append((bits, len(sections[bits]), table))
+
+    layout = []
+    offset = HEADER.size
+    for bits, count, table in tables:
+        layout += [bits, count, offset]
+        offset += len(table)
+    header = HEADER.pack(MAGIC, VERSION, *layout, offset)
+
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(header)
+        for _, _, table in tables:
+            f.write(table)
+        f.write(names)
+    os.replace(tmp, path)
+    return sum(count for _, count, _ in tables)
+
+class OUIIndex:
+    """Memory-mapped vendor index with an LRU cache in front of the search"""
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        fields = HEADER.unpack_from(self._mm, 0)
+        if fields[0] != MAGIC or fields[1] != VERSION:
+            self._mm.close()
+            raise ValueError(f'{path} is not an OUI index')
+        values = fields[2:-1]
+        # (shift, count, table offset) per prefix length
+        self._sections = [(48 - values[i], values[i + 1], values[i + 2]) for i in range(0, len(values), 3)]
+        self._names = fields[-1]
+        # 24-bit blocks the IEEE subdivides into MA-M/MA-S assignments (a few
+        # hundred); every other MAC resolves, and caches, by its 24-bit OUI
+        self._subdivided = frozenset(
+            prefix >> (24 - shift)
+            for shift, count, table in self._sections if shift < 24
+            for prefix, _ in RECORD.iter_unpack(self._mm[table:table + count * RECORD.size]))
+        self._by_oui = lru_cache(maxsize=CACHE_SIZE)(self._search)
+        self._by_prefix = lru_cache(maxsize=CACHE_SIZE)(self._search_subdivided)
+
+    def __len__(self):
+        return sum(count for _, count, _ in self._sections)
+
+    def _find(self, shift, count, table, key):
+        mm = self._mm
+        unpack = RECORD.unpack_from
+        size = RECORD.size
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            prefix, name = unpack(mm, table + mid * size)
+            if prefix < key:
+                lo = mid + 1
+            elif prefix > key:
+                hi = mid
+            else:
+                start = self._names + name
+                return mm[start + 1:start + 1 + mm[start]].decode('utf-8', 'replace')
+        return None
+
+    def _search(self, oui):
+        shift, count, table = self._sections[-1]
+        return self._find(shift, count, table, oui)
+
+    def _search_subdivided(self, prefix36):
+        """Longest-prefix match for the top 36 bits of a MAC"""
+        for shift, count, table in self._sections:
+            vendor = self._find(shift, count, table, prefix36 >> (shift - 12))
+            if vendor is not None:
+                return vendor
+        return None
+
+    def lookup(self, mac):
+        """Vendor name for a MAC, LOCALLY_ADMINISTERED for random/local addresses, else None"""
+        value = mac_value(mac)
+        oui = value >> 24
+        if oui & 0x020000:
+            return LOCALLY_ADMINISTERED
+        if oui in self._subdivided:
+            return self._by_prefix(value >> 12)
+        return self._by_oui(oui)
+
+    def close(self):
+        self._mm.close()
+
+_index = None
+_index_lock = threading.Lock()
+_index_missing = False
+
+def get_index():
+    """Shared index for this process, or None when no index file is installed"""
+    global _index, _index_missing
+    if _index is None and not _index_missing:
+        with _index_lock:
+            if _index is None and not _index_missing:
+                try:
+                    _index = OUIIndex()
+                except (OSError, ValueError) as e:
+                    _index_missing = True
+                    logger.warning(f"OUI vendor index unavailable ({e}); run 'python3 oui_db.py download'")
+    return _index
+
+def lookup_vendor(mac):
+    """Resolve a MAC to its vendor using the shared index; None if unknown"""
+    if not mac:
+        return None
+    index = get_index()
+    try:
+        if index is None:
+            return LOCALLY_ADMINISTERED if is_locally_administered(mac) else None
+        return index.lookup(mac)
+    except ValueError:
+        return None
+
+def download_registries(path, timeout=60):
+    """Fetch the IEEE registries and compile them into path"""
+    import urllib.request
+
+    entries = []
+    for url in IEEE_SOURCES:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            text = io.TextIOWrapper(response, encoding='utf-8', errors='replace')
+            entries.extend(read_registry(text))
+    return build_index(entries, path)
+
+def main():
+    parser = argparse.ArgumentParser(description='OUI vendor index')
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help='compile IEEE registry CSV files')
+    build.add_argument('sources', nargs='+')
+    build.add_argument('-o', '--output', default=INDEX_PATH)
+    download = sub.add_parser('download', help='fetch the IEEE registries and compile them')
+    download.add_argument('-o', '--output', default=INDEX_PATH)
+    lookup = sub.add_parser('lookup', help='resolve MAC addresses')
+    lookup.add_argument('macs', nargs='+')
+    lookup.add_argument('-i', '--index', default=INDEX_PATH)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        entries = []
+        for source in args.sources:
+            with open(source, newline='', encoding='utf-8', errors='replace') as f:
+                entries.extend(read_registry(f))
+        print(f'{build_index(entries, args.output)} prefixes written to {args.output}')
+    elif args.command == 'download':
+        print(f'{download_registries(args.output)} prefixes written to {args.output}')
+    else:
+        index = OUIIndex(args.index)
+        for mac in args.macs:
+            print(f'{mac}  {index.lookup(mac) or "Unknown"}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,498 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Offline Capture Reader
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Memory-mapped pcap/pcapng reader with radiotap and 802.11 management frame
+parsing. Beacons and probe responses (including their WPS and vendor IEs)
+are folded into the same APRecord / StationRecord objects the airodump-ng
+parser produces, so offline captures go through the normal ingest path.
+
+    python3 pcap_reader.py capture.pcapng
+"""
+
+import mmap
+import os
+import struct
+import sys
+from datetime import datetime
+from ap_records import APRecord, StationRecord, small_int, intern_text
+
+LINKTYPE_IEEE802_11 = 105
+LINKTYPE_RADIOTAP = 127
+
+PCAP_MAGIC = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_IDB = 1
+PCAPNG_SPB = 3
+PCAPNG_EPB = 6
+
+# 802.11 management subtypes
+SUBTYPE_PROBE_REQ = 4
+SUBTYPE_PROBE_RESP = 5
+SUBTYPE_BEACON = 8
+
+IE_SSID = 0
+IE_DS_PARAMS = 3
+IE_RSN = 48
+IE_VENDOR = 221
+
+MS_OUI = b'\x00\x50\xf2'
+RSN_OUI = b'\x00\x0f\xac'
+# WPS attribute types (Wi-Fi Simple Configuration, big-endian TLVs)
+WPS_STATE = 0x1044
+WPS_AP_SETUP_LOCKED = 0x1057
+WPS_MANUFACTURER = 0x1021
+WPS_MODEL_NAME = 0x1023
+WPS_DEVICE_NAME = 0x1011
+CIPHER_NAMES = {1: 'WEP40', 2: 'TKIP', 4: 'CCMP', 5: 'WEP104', 8: 'GCMP', 9: 'GCMP-256', 10: 'CCMP-256'}
+AKM_NAMES = {1: 'MGT', 2: 'PSK', 8: 'SAE', 12: 'MGT', 18: 'OWE'}
+
+# Radiotap fields before dBm antenna signal: (alignment, size) by present bit
+RADIOTAP_FIELDS = ((8, 8), (1, 1), (1, 1), (2, 4), (2, 2), (1, 1))
+
+class CaptureFormatError(Exception):
+    """Raised when a file is not a pcap or pcapng capture"""
+
+def iter_frames(buf):
+    """
+    Iterator of (linktype, timestamp, offset, length) for every packet in a
+    pcap or pcapng buffer. Packet bytes are left in place; callers slice as
+    needed. Raises CaptureFormatError for anything else.
+    """
+    magic = bytes(buf[:4])
+    if magic in PCAP_MAGIC:
+        return _iter_pcap(buf, *PCAP_MAGIC[magic])
+    if len(buf) >= 12 and struct.unpack_from('<I', buf, 0)[0] == PCAPNG_SHB:
+        return _iter_pcapng(buf)
+    raise CaptureFormatError('Not a pcap or pcapng capture')
+
+def _iter_pcap(buf, endian, resolution):
+    linktype = struct.unpack_from(endian + 'I', buf, 20)[0] & 0x0FFFFFFF
+    record = struct.Struct(endian + 'IIII')
+    size = len(buf)
+    pos = 24
+    while pos + 16 <= size:
+        ts_sec, ts_frac, incl_len, _ = record.unpack_from(buf, pos)
+        pos += 16
+        if pos + incl_len > size:
+            break
+        yield linktype, ts_sec + ts_frac * resolution, pos, incl_len
+        pos += incl_len
+
+def _iter_pcapng(buf):
+    size = len(buf)
+    pos = 0
+    endian = '<'
+    head = struct.Struct('<II')
+    # Block type and length plus the enhanced packet block fields, in one read
+    epb = struct.Struct('<IIIIII')
+    interfaces = []
+    while pos + 12 <= size:
+        if pos + 28 <= size:
+            block_type, block_len, iface, ts_high, ts_low, cap_len = epb.unpack_from(buf, pos)
+        else:
+            block_type, block_len = head.unpack_from(buf, pos)
+        if block_type == PCAPNG_SHB:
+            # Each section header sets the byte order and resets interfaces
+            endian = '<' if bytes(buf[pos + 8:pos + 12]) == b'\x4d\x3c\x2b\x1a' else '>'
+            head, epb = struct.Struct(endian + 'II'), struct.Struct(endian + 'IIIIII')
+            block_len = head.unpack_from(buf, pos)[1]
+            interfaces = []
+        if block_len < 12 or pos + block_len > size:
+            break
+        body = pos + 8
+        if block_type == PCAPNG_EPB:
+            # Skip blocks too short for their header or captured length
+            if block_len >= 32 and 32 + cap_len <= block_len and iface < len(interfaces):
+                linktype, resolution = interfaces[iface]
+                yield linktype, ((ts_high << 32) | ts_low) * resolution, body + 20, cap_len
+        elif block_type == PCAPNG_IDB:
+            linktype = struct.unpack_from(endian + 'H', buf, body)[0]
+            interfaces.append((linktype, _pcapng_tsresol(buf, body + 8, pos + block_len - 4, endian)))
+        elif block_type == PCAPNG_SPB and interfaces:
+            linktype, _ = interfaces[0]
+            yield linktype, 0.0, body + 4, min(struct.unpack_from(endian + 'I', buf, body)[0], block_len - 16)
+        pos += block_len
+
+def _pcapng_tsresol(buf, pos, end, endian):
+    """Read the if_tsresol option of an interface description block"""
+    while pos + 4 <= end:
+        code, length = struct.unpack_from(endian + 'HH', buf, pos)
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            value = buf[pos + 4]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        pos += 4 + ((length + 3) & ~3)
+    return 1e-6
+
+_U16 = struct.Struct('<H')
+_U32 = struct.Struct('<I')
+# Parsed radiotap headers by their raw bytes; a capture repeats a few
+# layouts and, per transmitter, only a handful of signal levels. Signals
+# are already shared ints, so the records can take them as they are
+_radiotap_headers = {}
+RADIOTAP_CACHE_SIZE = 4096
+
+def _radiotap_fields(header, present):
+    """Offsets of the Flags, Channel and dBm signal fields (None when absent)"""
+    header_len = len(header)
+    offset = 8
+    word = present
+    # Skip extended presence bitmaps
+    while word & 0x80000000 and offset + 4 <= header_len:
+        word = _U32.unpack_from(header, offset)[0]
+        offset += 4
+    found = [None] * len(RADIOTAP_FIELDS)
+    for bit, (align, size) in enumerate(RADIOTAP_FIELDS):
+        if not present & (1 << bit):
+            continue
+        offset = (offset + align - 1) & ~(align - 1)
+        if offset + size > header_len:
+            break
+        found[bit] = offset
+        offset += size
+    return found[1], found[3], found[5]
+
+def _parse_radiotap_header(header):
+    flags_at, channel_at, signal_at = _radiotap_fields(header, _U32.unpack_from(header, 4)[0])
+    has_fcs = flags_at is not None and bool(header[flags_at] & 0x10)
+    frequency = _U16.unpack_from(header, channel_at)[0] if channel_at is not None else None
+    signal = header[signal_at] if signal_at is not None else None
+    if signal is not None and signal > 127:
+        signal -= 256
+    return len(header), frequency, small_int(signal), has_fcs
+
+def parse_radiotap(buf, pos, length):
+    """
+    Return (header_length, frequency, signal_dbm, has_fcs) for a radiotap
+    header, or None when the header does not fit in the captured frame.
+    """
+    header_len = buf[pos + 2] | buf[pos + 3] << 8
+    if header_len < 8 or header_len > length:
+        return None
+    header = buf[pos:pos + header_len]
+    parsed = _radiotap_headers.get(header)
+    if parsed is None:
+        parsed = _parse_radiotap_header(header)
+        if len(_radiotap_headers) >= RADIOTAP_CACHE_SIZE:
+            _radiotap_headers.clear()
+        _radiotap_headers[header] = parsed
+    return parsed
+
+def frequency_to_channel(frequency):
+    if not frequency:
+        return None
+    if frequency == 2484:
+        return 14
+    if 2412 <= frequency < 2484:
+        return (frequency - 2407) // 5
+    if 5000 <= frequency < 5925:
+        return (frequency - 5000) // 5
+    if 5955 <= frequency <= 7115:
+        return (frequency - 5950) // 5
+    return None
+
+def parse_rsn(ie, offset=0):
+    """Return (ciphers, akms) from an RSN or WPA IE body starting at the version field"""
+    ciphers = []
+    akms = []
+    try:
+        pos = offset + 2 + 4  # version, group cipher
+        count = struct.unpack_from('<H', ie, pos)[0]
+        pos += 2
+        for _ in range(count):
+            ciphers.append(CIPHER_NAMES.get(ie[pos + 3], 'UNKNOWN'))
+            pos += 4
+        count = struct.unpack_from('<H', ie, pos)[0]
+        pos += 2
+        for _ in range(count):
+            akms.append(AKM_NAMES.get(ie[pos + 3], 'UNKNOWN'))
+            pos += 4
+    except (struct.error, IndexError):
+        pass
+    return ciphers, akms
+
+def parse_wps(ie):
+    """Return (configured, locked, manufacturer, model) from a WPS vendor IE body"""
+    configured = locked = None
+    manufacturer = model = None
+    pos = 0
+    size = len(ie)
+    while pos + 4 <= size:
+        attr, length = struct.unpack_from('>HH', ie, pos)
+        start = pos + 4
+        if start + length > size:
+            break
+        if attr == WPS_STATE and length >= 1:
+            configured = ie[start] == 2
+        elif attr == WPS_AP_SETUP_LOCKED and length >= 1:
+            locked = ie[start] == 1
+        elif attr == WPS_MANUFACTURER:
+            manufacturer = _wps_text(ie[start:start + length])
+        elif attr in (WPS_MODEL_NAME, WPS_DEVICE_NAME) and not model:
+            model = _wps_text(ie[start:start + length])
+        pos = start + length
+    return configured, locked, manufacturer, model
+
+def _wps_text(value):
+    return intern_text(value.rstrip(b'\x00').decode('utf-8', 'replace').strip())
+
+def parse_information_elements(body):
+    """Parse tagged parameters of a beacon or probe response body"""
+    info = {'ssid': None, 'channel': None, 'rsn': None, 'wpa': None, 'wps': None, 'vendor_ouis': []}
+    pos = 0
+    size = len(body)
+    while pos + 2 <= size:
+        ie_id = body[pos]
+        ie_len = body[pos + 1]
+        start = pos + 2
+        end = start + ie_len
+        if end > size:
+            break
+        if ie_id == IE_SSID:
+            info['ssid'] = body[start:end]
+        elif ie_id == IE_DS_PARAMS and ie_len >= 1:
+            info['channel'] = body[start]
+        elif ie_id == IE_RSN:
+            info['rsn'] = parse_rsn(body[start:end])
+        elif ie_id == IE_VENDOR and ie_len >= 4:
+            oui = body[start:start + 3]
+            if oui == MS_OUI and body[start + 3] == 1:
+                info['wpa'] = parse_rsn(body[start + 4:end])
+            elif oui == MS_OUI and body[start + 3] == 4:
+                # Long WPS IEs are split across consecutive vendor IEs
+                info['wps'] = (info['wps'] or b'') + body[start + 4:end]
+            info['vendor_ouis'].append(oui.hex(':').upper())
+        pos = end
+    return info
+
+def describe_security(info, capability):
+    """Summarise security the way airodump-ng's Privacy/Cipher/Auth columns do"""
+    ciphers = []
+    akms = []
+    if info['rsn']:
+        ciphers, akms = info['rsn']
+        privacy = 'WPA3' if 'SAE' in akms and 'PSK' not in akms else 'WPA2'
+        if 'SAE' in akms and 'PSK' in akms:
+            privacy = 'WPA3 WPA2'
+        if info['wpa']:
+            privacy += ' WPA'
+    elif info['wpa']:
+        ciphers, akms = info['wpa']
+        privacy = 'WPA'
+    elif capability & 0x0010:
+        privacy, ciphers = 'WEP', ['WEP']
+    else:
+        privacy = 'OPN'
+    return privacy, ' '.join(dict.fromkeys(ciphers)), ' '.join(dict.fromkeys(akms))
+
+def apply_beacon_details(record, info):
+    """Set WPS state, device details and vendor OUIs on a record from parsed IEs"""
+    record.wps = info['wps'] is not None
+    if record.wps:
+        _, locked, manufacturer, model = parse_wps(info['wps'])
+        record.wps_locked = bool(locked)
+        record.manufacturer = manufacturer or None
+        record.model = model or None
+    else:
+        record.wps_locked = False
+    record.vendor_ouis = tuple(info['vendor_ouis'])
+
+def record_from_elements(bssid, elements, capability, frequency, signal, timestamp):
+    """APRecord for one BSS from its tagged parameters, e.g. an nl80211 scan result"""
+    info = parse_information_elements(elements)
+    privacy, cipher, auth = describe_security(info, capability)
+    ssid = info['ssid'] or b''
+    essid = '' if not ssid.strip(b'\x00') else ssid.decode('utf-8', 'replace')
+    seen = format_time(timestamp)
+    record = APRecord(bssid, intern_text(essid), small_int(info['channel'] or frequency_to_channel(frequency)),
+                      small_int(signal), None, intern_text(privacy), intern_text(cipher), intern_text(auth),
+                      1, 0, '0.0.0.0', len(ssid), seen, seen)
+    apply_beacon_details(record, info)
+    return record
+
+class CaptureSurvey:
+    """Folds frames from a capture into per-BSSID and per-station records"""
+
+    def __init__(self):
+        self.aps = {}
+        self.stations = {}
+        self._last_body = {}
+        # (station, bssid) by the raw addr1+addr2 of to-DS / from-DS data frames
+        self._links = ({}, {})
+        self.frames = 0
+
+    def add_frame(self, buf, timestamp, pos, length, linktype):
+        self.frames += 1
+        frequency = signal = None
+        end = pos + length
+        if linktype == LINKTYPE_RADIOTAP:
+            if length < 8:
+                return
+            radiotap = parse_radiotap(buf, pos, length)
+            if radiotap is None:
+                return
+            header_len, frequency, signal, has_fcs = radiotap
+            pos += header_len
+            if has_fcs:
+                end -= 4
+        elif linktype != LINKTYPE_IEEE802_11:
+            return
+        if end - pos < 24:
+            return
+
+        fc = buf[pos]
+        frame_type = (fc >> 2) & 3
+        if frame_type == 2:
+            direction = buf[pos + 1] & 3
+            if direction == 1 or direction == 2:
+                self._add_data(buf, timestamp, pos, direction, signal)
+            return
+        subtype = (fc >> 4) & 0xF
+        if frame_type == 0 and subtype in (SUBTYPE_BEACON, SUBTYPE_PROBE_RESP):
+            self._add_beacon(buf, timestamp, pos, end, frequency, signal)
+        elif frame_type == 0 and subtype == SUBTYPE_PROBE_REQ:
+            self._add_station(buf, timestamp, pos + 10, None, signal, probe_body=(pos + 24, end))
+
+    def _add_data(self, buf, timestamp, pos, direction, signal):
+        """Count a to-DS (1) or from-DS (2) data frame for its station"""
+        links = self._links[direction - 1]
+        addresses = buf[pos + 4:pos + 16]
+        link = links.get(addresses)
+        if link is None:
+            if direction == 1:
+                station = self._add_station(buf, timestamp, pos + 10, pos + 4, signal)
+            else:
+                station = self._add_station(buf, timestamp, pos + 4, pos + 10, None)
+            # Group-addressed frames map to None and are skipped from now on
+            links[addresses] = (station, station.bssid_int) if station is not None else None
+            return
+        station, bssid = link
+        station.packets += 1
+        station.last_seen = timestamp
+        station.bssid_int = bssid
+        if direction == 1 and signal is not None:
+            station.power = signal
+
+    def _add_beacon(self, buf, timestamp, pos, end, frequency, signal):
+        bssid = int.from_bytes(buf[pos + 16:pos + 22], 'big')
+        # Skip the 8-byte TSF so unchanged beacons compare equal
+        body = buf[pos + 32:end]
+        record = self.aps.get(bssid)
+        if record is not None:
+            record.beacons += 1
+            record.last_seen = timestamp
+            if signal is not None:
+                record.power = signal
+            if self._last_body.get(bssid) == body:
+                return
+        self._last_body[bssid] = body
+
+        capability = struct.unpack_from('<H', body, 2)[0] if len(body) >= 4 else 0
+        info = parse_information_elements(body[4:])
+        privacy, cipher, auth = describe_security(info, capability)
+        ssid = info['ssid'] or b''
+        essid = '' if not ssid.strip(b'\x00') else ssid.decode('utf-8', 'replace')
+        channel = info['channel'] or frequency_to_channel(frequency)
+
+        if record is None:
+            record = APRecord(bssid, intern_text(essid), small_int(channel), signal, None,
+                              intern_text(privacy), intern_text(cipher), intern_text(auth),
+                              1, 0, '0.0.0.0', len(ssid), timestamp, timestamp)
+            self.aps[bssid] = record
+        else:
+            if essid:
+                record.essid = intern_text(essid)
+                record.id_length = len(ssid)
+            record.channel = small_int(channel)
+            record.privacy = intern_text(privacy)
+            record.cipher = intern_text(cipher)
+            record.authentication = intern_text(auth)
+        apply_beacon_details(record, info)
+
+    def _add_station(self, buf, timestamp, mac_pos, bssid_pos, signal, probe_body=None):
+        mac_bytes = buf[mac_pos:mac_pos + 6]
+        if mac_bytes[0] & 1:  # group address
+            return None
+        mac = int.from_bytes(mac_bytes, 'big')
+        bssid = int.from_bytes(buf[bssid_pos:bssid_pos + 6], 'big') if bssid_pos is not None else None
+        station = self.stations.get(mac)
+        if station is None:
+            station = StationRecord(mac, bssid, signal, 0, (), timestamp, timestamp)
+            self.stations[mac] = station
+        station.packets += 1
+        station.last_seen = timestamp
+        if bssid is not None:
+            station.bssid_int = bssid
+        if signal is not None:
+            station.power = signal
+        if probe_body is not None:
+            info = parse_information_elements(buf[probe_body[0]:probe_body[1]])
+            if info['ssid']:
+                probe = intern_text(info['ssid'].decode('utf-8', 'replace'))
+                if probe not in station.probed_essids:
+                    station.probed_essids += (probe,)
+        return station
+
+    def results(self):
+        """Return (aps, stations); stations only include those tied to a known AP or probing"""
+        stations = [s for s in self.stations.values()
+                    if s.bssid_int in self.aps or (s.bssid_int is None and s.probed_essids)]
+        for station in stations:
+            if station.bssid_int is not None and station.bssid_int not in self.aps:
+                station.bssid_int = None
+        # Times are kept as capture timestamps while folding and formatted once here
+        for record in (*self.aps.values(), *stations):
+            record.first_seen = format_time(record.first_seen)
+            record.last_seen = format_time(record.last_seen)
+        return list(self.aps.values()), stations
+
+def format_time(timestamp):
+    return intern_text(datetime.fromtimestamp(int(timestamp)).strftime('%Y-%m-%d %H:%M:%S'))
+
+def read_capture(path):
+    """Parse a pcap/pcapng file into (aps, stations) without loading it into memory"""
+    survey = CaptureSurvey()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [], []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            add_frame = survey.add_frame
+            for linktype, timestamp, pos, length in iter_frames(mm):
+                add_frame(mm, timestamp, pos, length, linktype)
+    return survey.results()
+
+def merge_beacon_details(networks, path):
+    """
+    Copy WPS and vendor details from the beacons in an airodump-ng .cap file
+    onto the records parsed from its CSV, matched by BSSID.
+    """
+    beacons = {ap.bssid_int: ap for ap in read_capture(path)[0]}
+    for network in networks:
+        beacon = beacons.get(network.bssid_int)
+        if beacon is not None:
+            network.wps = beacon.wps
+            network.wps_locked = beacon.wps_locked
+            network.manufacturer = beacon.manufacturer
+            network.model = beacon.model
+            network.vendor_ouis = beacon.vendor_ouis
+    return networks
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print('usage: pcap_reader.py <capture.pcap|capture.pcapng>')
+        sys.exit(1)
+    aps, stations = read_capture(sys.argv[1])
+    for ap in sorted(aps, key=lambda r: r.power if r.power is not None else -999, reverse=True):
+        print(f"{ap.bssid}  ch {ap.channel or '-':>3}  {ap.power if ap.power is not None else '-':>4} dBm  "
+              f"{ap.privacy:10s} {'WPS ' if ap.wps else ''}{ap.essid or '<hidden>'}")
+    print(f'{len(aps)} access points, {len(stations)} stations')
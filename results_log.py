@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Results Log
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Fixed-capacity ring buffer of result entries for the mobile results console.
+Appending is O(1) and memory is bounded by the capacity; entries pushed out
+of the buffer can be spilled to a JSON-lines file, which is rotated once it
+reaches max_spill_bytes so disk use is bounded too.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CAPACITY = 500
+DEFAULT_MAX_SPILL_BYTES = 1024 * 1024
+
+class ResultEntry:
+    """One line of the results console"""
+    __slots__ = ('seq', 'timestamp', 'text')
+
+    def __init__(self, seq, timestamp, text):
+        self.seq = seq
+        self.timestamp = timestamp
+        self.text = text
+
+    def to_dict(self):
+        return {'seq': self.seq, 'timestamp': self.timestamp, 'text': self.text}
+
+    def __repr__(self):
+        return f'<ResultEntry {self.seq}>'
+
+class ResultsLog:
+    """
+    Most recent results, oldest first.
+    spill_path: optional JSON-lines file that receives evicted entries.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, spill_path=None, max_spill_bytes=DEFAULT_MAX_SPILL_BYTES):
+        self.capacity = capacity
+        self.spill_path = spill_path
+        self.max_spill_bytes = max_spill_bytes
+        self.evicted = 0
+        self._entries = deque(maxlen=capacity)
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._spill = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def append(self, text, timestamp=None):
+        """Add one entry; returns (entry, evicted entry or None)"""
+        with self._lock:
+            self._seq += 1
+            entry = ResultEntry(self._seq, timestamp if timestamp is not None else time.time(), text)
+            evicted = self._entries[0] if len(self._entries) == self.capacity else None
+            self._entries.append(entry)
+            if evicted is not None:
+                self.evicted += 1
+                if self.spill_path:
+                    self._write_spill(evicted)
+            return entry, evicted
+
+    def _write_spill(self, entry):
+        try:
+            if self._spill is None:
+                self._spill = open(self.spill_path, 'a', encoding='utf-8')
+            self._spill.write(json.dumps(entry.to_dict()) + '\n')
+            self._spill.flush()
+            if self._spill.tell() >= self.max_spill_bytes:
+                self._spill.close()
+                self._spill = None
+                os.replace(self.spill_path, self.spill_path + '.1')
+        except OSError as e:
+            logger.error(f"Results spill error: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def close(self):
+        with self._lock:
+            if self._spill is not None:
+                self._spill.close()
+                self._spill = None
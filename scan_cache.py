@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Local Scan Cache
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+On-device SQLite (WAL) cache of the last survey and its signal history for
+the mobile app, which has no database server. The tables mirror the
+server's networks / scan_results models, and rows are built with the same
+ap_records.network_columns() mapping the server ingest uses. Each network
+also keeps the full scan record it was last seen with, so a survey loaded
+from the cache diffs cleanly against the next scan. Retention is bounded by
+age and by the number of history rows.
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from ap_records import network_columns, UPDATED_COLUMNS, OPTIONAL_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_MAX_HISTORY = 50000
+# Networks seen within this many seconds of the newest sighting make up the last survey
+SURVEY_WINDOW_SECONDS = 120
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS networks (
+    id INTEGER PRIMARY KEY,
+    bssid TEXT UNIQUE NOT NULL,
+    ssid TEXT,
+    channel INTEGER,
+    encryption TEXT,
+    signal_strength INTEGER,
+    wps_enabled INTEGER,
+    wps_locked INTEGER,
+    manufacturer TEXT,
+    record TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_networks_last_seen ON networks (last_seen);
+CREATE TABLE IF NOT EXISTS scan_results (
+    id INTEGER PRIMARY KEY,
+    network_id INTEGER NOT NULL REFERENCES networks (id) ON DELETE CASCADE,
+    signal_strength INTEGER,
+    timestamp REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_scan_results_network ON scan_results (network_id, timestamp);
+CREATE INDEX IF NOT EXISTS ix_scan_results_timestamp ON scan_results (timestamp);
+"""
+
+# Known networks get the same refresh as the server ingest; optional columns the
+# scan did not report keep their stored values
+UPSERT_NETWORK = (
+    'INSERT INTO networks (bssid, ssid, channel, encryption, signal_strength, wps_enabled, '
+    'wps_locked, manufacturer, record, first_seen, last_seen) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+    'ON CONFLICT (bssid) DO UPDATE SET '
+    + ', '.join(f'{column} = COALESCE(excluded.{column}, {column})' if column in OPTIONAL_COLUMNS
+                else f'{column} = excluded.{column}' for column in UPDATED_COLUMNS)
+    + ', record = excluded.record, last_seen = excluded.last_seen')
+
+class ScanCache:
+    """SQLite cache of networks and their signal history"""
+
+    def __init__(self, path, retention_days=DEFAULT_RETENTION_DAYS, max_history=DEFAULT_MAX_HISTORY):
+        self.path = path
+        self.retention = retention_days * 86400
+        self.max_history = max_history
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute('PRAGMA foreign_keys=ON')
+        self._conn.executescript(SCHEMA)
+        # Caches written before the record column was added
+        if 'record' not in {row[1] for row in self._conn.execute('PRAGMA table_info(networks)')}:
+            self._conn.execute('ALTER TABLE networks ADD COLUMN record TEXT')
+
+    def record_scan(self, networks, now=None):
+        """Upsert one scan's networks and append their signal readings, then apply retention"""
+        now = now if now is not None else time.time()
+        rows = []
+        for network_data in networks:
+            columns = network_columns(network_data)
+            record = network_data.to_dict() if hasattr(network_data, 'to_dict') else network_data
+            rows.append((columns['bssid'], columns['ssid'], columns['channel'], columns['encryption'],
+                         columns['signal_strength'], columns.get('wps_enabled'), columns.get('wps_locked'),
+                         columns.get('manufacturer'), json.dumps(record, default=str), now, now))
+        with self._lock:
+            conn = self._conn
+            conn.execute('BEGIN')
+            try:
+                conn.executemany(UPSERT_NETWORK, rows)
+                conn.executemany(
+                    'INSERT INTO scan_results (network_id, signal_strength, timestamp) '
+                    'SELECT id, ?, ? FROM networks WHERE bssid = ?',
+                    [(row[4], now, row[0]) for row in rows])
+                self._apply_retention(now)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def _apply_retention(self, now):
+        cutoff = now - self.retention
+        conn = self._conn
+        conn.execute('DELETE FROM scan_results WHERE timestamp < ?', (cutoff,))
+        conn.execute('DELETE FROM networks WHERE last_seen < ?', (cutoff,))
+        conn.execute('DELETE FROM scan_results WHERE id <= (SELECT id FROM scan_results ORDER BY id DESC '
+                     'LIMIT 1 OFFSET ?)', (self.max_history,))
+
+    def last_survey(self, window=SURVEY_WINDOW_SECONDS):
+        """Networks from the most recent survey, as scan-record dicts ordered by signal"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT bssid, ssid, channel, encryption, signal_strength, wps_enabled, wps_locked, '
+                'manufacturer, record, last_seen FROM networks '
+                'WHERE last_seen >= (SELECT MAX(last_seen) FROM networks) - ? '
+                'ORDER BY signal_strength DESC', (window,)).fetchall()
+        networks = []
+        for bssid, ssid, channel, encryption, power, wps, locked, manufacturer, record, last_seen in rows:
+            if record is not None:
+                networks.append(json.loads(record))
+                continue
+            # Rows cached before full records were kept
+            networks.append({
+                'bssid': bssid,
+                'essid': ssid,
+                'channel': channel,
+                'power': power,
+                'privacy': encryption,
+                'encryption': encryption,
+                'wps': bool(wps) if wps is not None else None,
+                'wps_locked': bool(locked) if locked is not None else None,
+                'manufacturer': manufacturer,
+                'last_seen': last_seen
+            })
+        return networks
+
+    def history(self, bssid, limit=100):
+        """Most recent (timestamp, signal) readings for one BSSID, newest first"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT scan_results.timestamp, scan_results.signal_strength FROM scan_results '
+                'JOIN networks ON networks.id = scan_results.network_id WHERE networks.bssid = ? '
+                'ORDER BY scan_results.timestamp DESC LIMIT ?', (bssid, limit)).fetchall()
+
+    def stats(self):
+        with self._lock:
+            networks = self._conn.execute('SELECT COUNT(*) FROM networks').fetchone()[0]
+            readings = self._conn.execute('SELECT COUNT(*) FROM scan_results').fetchone()[0]
+        return {'networks': networks, 'readings': readings}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
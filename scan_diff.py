@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Scan Diff Engine
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Turns successive scans into appeared / disappeared / changed / RSSI events.
+Each BSSID keeps a fingerprint of its configuration and the last reported
+signal, so a sighting is an O(1) comparison. Entries are kept in last-seen
+order, so expiring absent APs only touches the ones that have expired.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from ap_records import mac_to_int, int_to_mac
+
+logger = logging.getLogger(__name__)
+
+APPEARED = 'appeared'
+DISAPPEARED = 'disappeared'
+CHANGED = 'changed'
+RSSI = 'rssi'
+
+FINGERPRINT_FIELDS = ('essid', 'channel', 'privacy', 'cipher', 'authentication', 'manufacturer')
+
+class ScanEvent:
+    """One change to a BSSID between scans"""
+    __slots__ = ('kind', 'bssid_int', 'timestamp', 'record', 'previous')
+
+    def __init__(self, kind, bssid_int, timestamp, record=None, previous=None):
+        self.kind = kind
+        self.bssid_int = bssid_int
+        self.timestamp = timestamp
+        self.record = record
+        self.previous = previous
+
+    @property
+    def bssid(self):
+        return int_to_mac(self.bssid_int)
+
+    def to_dict(self):
+        data = {'type': self.kind, 'bssid': self.bssid, 'timestamp': self.timestamp}
+        if self.record is not None:
+            data['network'] = {field: self.record.get(field) for field in FINGERPRINT_FIELDS + ('power',)}
+        if self.previous is not None:
+            data['previous'] = self.previous
+        return data
+
+    def __repr__(self):
+        return f'<ScanEvent {self.kind} {self.bssid}>'
+
+class _Tracked:
+    __slots__ = ('fingerprint', 'values', 'power', 'last_seen')
+
+    def __init__(self, fingerprint, values, power, last_seen):
+        self.fingerprint = fingerprint
+        self.values = values
+        self.power = power
+        self.last_seen = last_seen
+
+def _bssid_int(record):
+    value = getattr(record, 'bssid_int', None)
+    return value if value is not None else mac_to_int(record['bssid'])
+
+class ScanDiff:
+    """
+    Per-BSSID fingerprints of the survey so far.
+    absence_window: seconds an AP may go unseen before it is reported gone.
+    rssi_threshold: dB change from the last reported signal that is reported.
+    """
+
+    def __init__(self, absence_window=60, rssi_threshold=10):
+        self.absence_window = absence_window
+        self.rssi_threshold = rssi_threshold
+        self._tracked = OrderedDict()
+        self._listeners = []
+
+    def __len__(self):
+        return len(self._tracked)
+
+    def __contains__(self, bssid):
+        return (bssid if isinstance(bssid, int) else mac_to_int(bssid)) in self._tracked
+
+    def subscribe(self, callback):
+        """Call callback(events) with each non-empty batch of events"""
+        self._listeners.append(callback)
+        return callback
+
+    def observe(self, record, now=None):
+        """Compare one sighting with what is known about its BSSID; return an event or None"""
+        now = now if now is not None else time.time()
+        bssid = _bssid_int(record)
+        values = tuple(record.get(field) for field in FINGERPRINT_FIELDS)
+        fingerprint = hash(values)
+        power = record.get('power')
+        tracked = self._tracked.get(bssid)
+
+        if tracked is None:
+            self._tracked[bssid] = _Tracked(fingerprint, values, power, now)
+            return ScanEvent(APPEARED, bssid, now, record)
+
+        tracked.last_seen = now
+        self._tracked.move_to_end(bssid)
+        if fingerprint != tracked.fingerprint or values != tracked.values:
+            previous = {field: old for field, old, new in zip(FINGERPRINT_FIELDS, tracked.values, values)
+                        if old != new}
+            tracked.fingerprint, tracked.values, tracked.power = fingerprint, values, power
+            return ScanEvent(CHANGED, bssid, now, record, previous)
+        if power is not None and (tracked.power is None or abs(power - tracked.power) >= self.rssi_threshold):
+            previous = {'power': tracked.power}
+            tracked.power = power
+            return ScanEvent(RSSI, bssid, now, record, previous)
+        return None
+
+    def expire(self, now=None):
+        """Report and forget APs unseen for longer than the absence window"""
+        now = now if now is not None else time.time()
+        cutoff = now - self.absence_window
+        events = []
+        tracked = self._tracked
+        while tracked:
+            bssid, entry = next(iter(tracked.items()))
+            if entry.last_seen >= cutoff:
+                break
+            del tracked[bssid]
+            events.append(ScanEvent(DISAPPEARED, bssid, now,
+                                    previous={'last_seen': entry.last_seen, 'power': entry.power}))
+        return events
+
+    def update(self, records, now=None, publish=True):
+        """Apply one scan; returns the events it produced, in order"""
+        now = now if now is not None else time.time()
+        events = []
+        observe = self.observe
+        for record in records:
+            event = observe(record, now)
+            if event is not None:
+                events.append(event)
+        events.extend(self.expire(now))
+        if events and publish:
+            self.publish(events)
+        return events
+
+    def publish(self, events):
+        """Pass a batch of events to the subscribers"""
+        for callback in self._listeners:
+            try:
+                callback(events)
+            except Exception as e:
+                logger.error(f"Scan event listener failed: {e}")
+
+    def reset(self):
+        self._tracked.clear()
+
+    def dump(self):
+        """The tracked APs as JSON-friendly rows, least recently seen first"""
+        return [[bssid, list(entry.values), entry.power, entry.last_seen]
+                for bssid, entry in self._tracked.items()]
+
+    def load(self, rows):
+        """Replace the tracked APs with rows from dump(), e.g. another process's"""
+        tracked = OrderedDict()
+        for bssid, values, power, last_seen in rows:
+            values = tuple(values)
+            tracked[bssid] = _Tracked(hash(values), values, power, last_seen)
+        self._tracked = tracked
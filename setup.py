@@ -15,82 +15,33 @@ def check_root():
     """Check if running with root privileges"""
     return os.geteuid() == 0
 
-def install_python_dependencies():
-    """Install Python dependencies"""
-    packages = ['flask', 'wcwidth']
-    
-    for package in packages:
-        try:
-            print(f"Installing {package}...")
-            subprocess.run([sys.executable, '-m', 'pip', 'install', package], check=True)
-            print(f"✓ {package} installed successfully")
-        except subprocess.CalledProcessError:
-            print(f"✗ Failed to install {package}")
-            return False
-    return True
-
-def install_system_dependencies():
-    """Install system dependencies"""
-    if not check_root():
+def install_dependencies():
+    """Install missing system and Python dependencies, one transaction per package manager"""
+    from install_planner import InstallPlanner, PipBackend, detect_backend
+    
+    system_backend = None
+    if check_root():
+        system_backend = detect_backend()
+        if system_backend:
+            print(f"Using package manager: {system_backend.name}")
+        else:
+            print("No supported package manager found")
+    else:
         print("Root privileges required for system dependency installation")
         print("Please run: sudo python3 setup.py")
-        return False
-    
-    # Detect package manager
-    package_managers = {
-        'apt-get': ['apt-get', 'update'],
-        'yum': ['yum', 'update'],
-        'pacman': ['pacman', '-Sy'],
-        'zypper': ['zypper', 'refresh']
-    }
-    
-    package_manager = None
-    for pm in package_managers:
-        if subprocess.run(['which', pm], capture_output=True).returncode == 0:
-            package_manager = pm
-            break
-    
-    if not package_manager:
-        print("No supported package manager found")
-        return False
-    
-    print(f"Using package manager: {package_manager}")
-    
-    # Update package lists
-    try:
-        print("Updating package lists...")
-        subprocess.run(package_managers[package_manager], check=True)
-    except subprocess.CalledProcessError:
-        print("Failed to update package lists")
-        return False
     
-    # Define packages for different package managers
-    packages = {
-        'apt-get': ['aircrack-ng', 'reaver', 'pixiewps', 'iw', 'wireless-tools', 'python3-pip'],
-        'yum': ['aircrack-ng', 'reaver', 'pixiewps', 'iw', 'wireless-tools', 'python3-pip'],
-        'pacman': ['aircrack-ng', 'reaver', 'pixiewps', 'iw', 'wireless_tools', 'python-pip'],
-        'zypper': ['aircrack-ng', 'reaver', 'pixiewps', 'iw', 'wireless-tools', 'python3-pip']
-    }
-    
-    install_commands = {
-        'apt-get': ['apt-get', 'install', '-y'],
-        'yum': ['yum', 'install', '-y'],
-        'pacman': ['pacman', '-S', '--noconfirm'],
-        'zypper': ['zypper', 'install', '-y']
-    }
-    
-    # Install packages
-    for package in packages[package_manager]:
-        try:
-            print(f"Installing {package}...")
-            cmd = install_commands[package_manager] + [package]
-            subprocess.run(cmd, check=True)
-            print(f"✓ {package} installed successfully")
-        except subprocess.CalledProcessError:
-            print(f"✗ Failed to install {package}")
-            # Continue with other packages
-    
-    return True
+    planner = InstallPlanner(system_backend=system_backend, python_backend=PipBackend())
+    status = planner.probe()
+    for key, installed in status.items():
+        if installed:
+            print(f"✓ {key} already installed")
+    
+    report = planner.apply(planner.plan(status))
+    for key in report['installed']:
+        print(f"✓ {key} installed successfully")
+    for key in report['failed']:
+        print(f"✗ Failed to install {key}")
+    return report
 
 def setup_permissions():
     """Setup proper permissions"""
@@ -123,6 +74,18 @@ def setup_permissions():
         print(f"Warning: Could not set all permissions: {e}")
         return True
 
+def build_vendor_index():
+    """Download the IEEE OUI registries and compile the vendor index"""
+    try:
+        from oui_db import download_registries, INDEX_PATH
+        count = download_registries(INDEX_PATH)
+        print(f"✓ Vendor index built ({count} prefixes): {INDEX_PATH}")
+        return True
+    except Exception as e:
+        print(f"Warning: Could not build vendor index: {e}")
+        print("Run 'python3 oui_db.py download' later to enable vendor lookups")
+        return False
+
 def create_desktop_shortcut():
     """Create desktop shortcut"""
     try:
@@ -162,30 +125,30 @@ def main():
     print(f"Root access: {'Yes' if check_root() else 'No'}")
     print()
     
-    # Install Python dependencies
-    print("Step 1: Installing Python dependencies...")
-    if not install_python_dependencies():
+    # Install system and Python dependencies
+    print("Step 1: Installing dependencies...")
+    report = install_dependencies()
+    if any(key.startswith('python-') for key in report['failed']):
         print("Failed to install Python dependencies")
         sys.exit(1)
-    print()
-    
-    # Install system dependencies
-    print("Step 2: Installing system dependencies...")
-    if not install_system_dependencies():
+    missing = [key for key in report['failed'] + report['unavailable'] if not key.startswith('python-')]
+    if missing:
         print("Failed to install system dependencies")
         print("You may need to install them manually:")
-        print("- aircrack-ng")
-        print("- reaver") 
-        print("- pixiewps")
-        print("- iw")
-        print("- wireless-tools")
+        for key in missing:
+            print(f"- {key}")
     print()
     
     # Setup permissions
-    print("Step 3: Setting up permissions...")
+    print("Step 2: Setting up permissions...")
     setup_permissions()
     print()
     
+    # Build OUI vendor index
+    print("Step 3: Building vendor index...")
+    build_vendor_index()
+    print()
+    
     # Create desktop shortcut
     print("Step 4: Creating desktop shortcut...")
     create_desktop_shortcut()
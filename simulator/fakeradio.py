@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Radio Simulator
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Shared code for the airodump-ng, iw and airmon-ng stand-ins in this
+directory: a persistent fake interface table and a synthetic survey that
+writes airodump-ng style CSV, beacon or traffic captures, or `iw scan`
+output.
+"""
+
+import json
+import os
+import random
+import struct
+import tempfile
+import time
+from datetime import datetime
+
+STATE_FILE = os.environ.get('SIM_STATE_FILE') or os.path.join(tempfile.gettempdir(), 'wifi-sim-state.json')
+
+ENCRYPTIONS = (
+    ('WPA2', 'CCMP', 'PSK'),
+    ('WPA2', 'CCMP', 'MGT'),
+    ('WPA3 WPA2', 'CCMP', 'SAE PSK'),
+    ('WPA2 WPA', 'CCMP TKIP', 'PSK'),
+    ('WEP', 'WEP', ''),
+    ('OPN', '', ''),
+)
+CHANNELS = (1, 6, 11, 1, 6, 11, 36, 40, 44, 48, 149, 153, 157, 161)
+OUIS = (0x001A2B, 0x14D64D, 0x1C7EE5, 0x28107B, 0x00E04C, 0x5067F0, 0xC86000, 0xF46D04, 0x7054F5, 0x08C6B3)
+WPS_VENDORS = (('TP-LINK', 'Archer C7'), ('NETGEAR', 'R7000'), ('ASUSTeK Computer Inc.', 'RT-AC68U'),
+               ('D-Link Corporation', 'DIR-842'), ('Huawei', 'HG8245H'))
+SUITES = {'WEP': 1, 'TKIP': 2, 'CCMP': 4, 'MGT': 1, 'PSK': 2, 'SAE': 8}
+SSID_WORDS = ('Home', 'Office', 'Guest', 'Cafe', 'Lab', 'Net', 'Link', 'WiFi', 'Corp', 'IoT')
+
+def default_state():
+    return {
+        'phys': {'phy0': {'interfaces': ['wlan0']}},
+        'interfaces': {'wlan0': {'phy': 'phy0', 'type': 'managed', 'up': True}}
+    }
+
+def load_state():
+    """Load the fake interface table shared by all stand-in tools"""
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default_state()
+
+def save_state(state):
+    tmp = STATE_FILE + '.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(state, f)
+    os.replace(tmp, STATE_FILE)
+
+def env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def env_float(name, default):
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+def mac_str(value):
+    return ':'.join(f'{(value >> shift) & 0xFF:02X}' for shift in range(40, -8, -8))
+
+class Survey:
+    """Synthetic set of APs and stations that churns over time"""
+
+    def __init__(self, aps=50, stations=100, churn=0.02, seed=None):
+        self.rng = random.Random(seed)
+        self.churn = churn
+        self.started = datetime.now()
+        self._next_id = 0
+        self.aps = [self._new_ap() for _ in range(aps)]
+        self.stations = [self._new_station() for _ in range(stations)]
+
+    def _new_ap(self):
+        rng = self.rng
+        self._next_id += 1
+        privacy, cipher, auth = rng.choice(ENCRYPTIONS)
+        roll = rng.random()
+        if roll < 0.05:
+            essid = ''
+        elif roll < 0.10:
+            # Commas and quotes appear in real ESSIDs and break naive parsers
+            essid = f'{rng.choice(SSID_WORDS)}, {rng.choice(SSID_WORDS)} "{self._next_id}"'
+        else:
+            essid = f'{rng.choice(SSID_WORDS)}{rng.choice(SSID_WORDS)}-{self._next_id}'
+        return {
+            'bssid': (rng.choice(OUIS) << 24) | rng.getrandbits(24),
+            'first_seen': datetime.now(),
+            'channel': rng.choice(CHANNELS),
+            'speed': rng.choice((54, 130, 270, 540, 866, 1200)),
+            'privacy': privacy,
+            'cipher': cipher,
+            'auth': auth,
+            'power': rng.randint(-92, -30),
+            'beacons': rng.randint(1, 50),
+            'ivs': 0,
+            'essid': essid,
+            'wps': rng.choice(WPS_VENDORS) if privacy.startswith('WPA') and rng.random() < 0.4 else None,
+            'wps_locked': rng.random() < 0.2
+        }
+
+    def _new_station(self):
+        rng = self.rng
+        bssid = rng.choice(self.aps)['bssid'] if self.aps and rng.random() < 0.8 else None
+        probes = ','.join(f'{rng.choice(SSID_WORDS)}{rng.randint(1, 99)}' for _ in range(rng.randint(0, 2)))
+        return {
+            'mac': (0x02 << 40) | rng.getrandbits(40) if rng.random() < 0.3 else (rng.choice(OUIS) << 24) | rng.getrandbits(24),
+            'first_seen': datetime.now(),
+            'power': rng.randint(-95, -35),
+            'packets': rng.randint(1, 200),
+            'bssid': bssid,
+            'probes': probes
+        }
+
+    def tick(self):
+        """Advance one write interval: update counters and replace a churn fraction of APs"""
+        rng = self.rng
+        for ap in self.aps:
+            ap['beacons'] += rng.randint(5, 15)
+            ap['power'] = max(-95, min(-20, ap['power'] + rng.randint(-3, 3)))
+        replace = int(len(self.aps) * self.churn)
+        for _ in range(replace):
+            self.aps[rng.randrange(len(self.aps))] = self._new_ap()
+        for station in self.stations:
+            station['packets'] += rng.randint(0, 10)
+            if self.aps and rng.random() < self.churn:
+                station['bssid'] = rng.choice(self.aps)['bssid']
+
+    def write_csv(self, path):
+        """Write the survey as airodump-ng CSV, replacing path atomically"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        lines = ['', 'BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, '
+                     'Authentication, Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key']
+        for ap in self.aps:
+            lines.append(
+                f"{mac_str(ap['bssid'])}, {ap['first_seen']:%Y-%m-%d %H:%M:%S}, {now}, "
+                f"{ap['channel']:2d}, {ap['speed']:3d}, {ap['privacy']}, {ap['cipher']}, {ap['auth']}, "
+                f"{ap['power']:3d}, {ap['beacons']:8d}, {ap['ivs']:8d},   0.  0.  0.   0, "
+                f"{len(ap['essid'].encode()):3d}, {ap['essid']}, ")
+        lines.append('')
+        lines.append('Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs')
+        for station in self.stations:
+            bssid = mac_str(station['bssid']) if station['bssid'] is not None else '(not associated) '
+            lines.append(
+                f"{mac_str(station['mac'])}, {station['first_seen']:%Y-%m-%d %H:%M:%S}, {now}, "
+                f"{station['power']:3d}, {station['packets']:8d}, {bssid}, {station['probes']}")
+        lines.append('')
+        tmp = path + '.tmp'
+        with open(tmp, 'w', newline='') as f:
+            f.write('\r\n'.join(lines))
+        os.replace(tmp, path)
+        return path
+
+    def write_cap(self, path):
+        """Write one beacon per AP as a radiotap pcap, like airodump-ng's .cap output"""
+        now = time.time()
+        tmp = path + '.tmp'
+        write_pcap(tmp, ((now, beacon_frame(ap)) for ap in self.aps))
+        os.replace(tmp, path)
+        return path
+
+    def traffic(self, seconds=10, payload=(64, 1500)):
+        """
+        Frames a monitor interface would capture: a beacon per AP every
+        102.4 ms, a data frame per associated station and interval (payload
+        size drawn from `payload`), and probe requests from the others.
+        Yields (timestamp, frame).
+        """
+        rng = self.rng
+        channels = {ap['bssid']: ap['channel'] for ap in self.aps}
+        beacons = {ap['bssid']: beacon_frame(ap) for ap in self.aps}
+        start = time.time() - seconds
+        for interval in range(int(seconds / 0.1024)):
+            now = start + interval * 0.1024
+            for bssid, frame in beacons.items():
+                yield now, frame
+            for station in self.stations:
+                if station['bssid'] in channels:
+                    size = rng.randint(*payload)
+                    yield now, data_frame(station, channels[station['bssid']], rng.randbytes(size))
+                elif station['probes'] and interval % 10 == 0:
+                    yield now, probe_request(station, station['probes'].split(',')[0])
+
+    def iw_scan(self, interface):
+        """The survey as `iw dev <interface> scan` prints it"""
+        lines = []
+        for ap in self.aps:
+            frequency = channel_frequency(ap['channel'])
+            capability = 0x0411 if ap['privacy'] != 'OPN' else 0x0401
+            lines += [f"BSS {mac_str(ap['bssid']).lower()}(on {interface})",
+                      f"\tfreq: {frequency}",
+                      "\tbeacon interval: 100 TUs",
+                      f"\tcapability: ESS{' Privacy' if capability & 0x10 else ''} ShortSlotTime (0x{capability:04x})",
+                      f"\tsignal: {ap['power']:.2f} dBm",
+                      f"\tlast seen: {self.rng.randint(0, 900)} ms ago",
+                      f"\tSSID: {ap['essid']}",
+                      f"\tDS Parameter set: channel {ap['channel']}"]
+            suites = ' '.join({'PSK': 'PSK', 'MGT': 'IEEE 802.1X', 'SAE': 'SAE'}[a] for a in ap['auth'].split())
+            if 'WPA2' in ap['privacy'] or 'WPA3' in ap['privacy']:
+                lines += ["\tRSN:\t * Version: 1", "\t\t * Group cipher: CCMP",
+                          f"\t\t * Pairwise ciphers: {ap['cipher']}", f"\t\t * Authentication suites: {suites}"]
+            if ap['privacy'].endswith('WPA'):
+                lines += ["\tWPA:\t * Version: 1", "\t\t * Group cipher: TKIP",
+                          "\t\t * Pairwise ciphers: TKIP", f"\t\t * Authentication suites: {suites}"]
+            if ap['wps']:
+                manufacturer, model = ap['wps']
+                lines += ["\tWPS:\t * Version: 1.0", "\t\t * Wi-Fi Protected Setup State: 2 (Configured)",
+                          f"\t\t * AP setup locked: 0x0{int(ap['wps_locked'])}",
+                          f"\t\t * Manufacturer: {manufacturer}", f"\t\t * Model: {model}"]
+        return '\n'.join(lines) + '\n'
+
+def channel_frequency(channel):
+    return 2407 + channel * 5 if channel <= 13 else 5000 + channel * 5
+
+def _ie(ie_id, payload):
+    return bytes((ie_id, len(payload))) + payload
+
+def _suite_list(names, oui):
+    suites = [SUITES[n] for n in names.split() if n in SUITES]
+    return struct.pack('<H', len(suites)) + b''.join(oui + bytes((n,)) for n in suites)
+
+def radiotap_header(channel, power):
+    """Radiotap header with Flags, Channel and dBm antenna signal"""
+    return struct.pack('<BBHIBxHHb', 0, 0, 15, 0b101010, 0, channel_frequency(channel), 0x00a0, power)
+
+def beacon_frame(ap):
+    """Radiotap + 802.11 beacon for one AP, with RSN/WPA and WPS IEs"""
+    radiotap = radiotap_header(ap['channel'], ap['power'])
+    bssid = ap['bssid'].to_bytes(6, 'big')
+    header = b'\x80\x00\x00\x00' + b'\xff' * 6 + bssid + bssid + b'\x00\x00'
+    capability = 0x0011 if ap['privacy'] != 'OPN' else 0x0001
+    body = struct.pack('<QHH', 0, 100, capability)
+    body += _ie(0, ap['essid'].encode()[:32]) + _ie(3, bytes((ap['channel'],)))
+    if 'WPA2' in ap['privacy'] or 'WPA3' in ap['privacy']:
+        rsn_oui = b'\x00\x0f\xac'
+        body += _ie(48, struct.pack('<H', 1) + rsn_oui + b'\x04' + _suite_list(ap['cipher'], rsn_oui)
+                    + _suite_list(ap['auth'], rsn_oui) + b'\x00\x00')
+    if ap['privacy'].endswith('WPA'):
+        ms_oui = b'\x00\x50\xf2'
+        body += _ie(221, ms_oui + b'\x01' + struct.pack('<H', 1) + ms_oui + b'\x02'
+                    + _suite_list('TKIP', ms_oui) + _suite_list(ap['auth'], ms_oui))
+    if ap['wps']:
+        manufacturer, model = (v.encode() for v in ap['wps'])
+        attrs = (struct.pack('>HHB', 0x104A, 1, 0x10) + struct.pack('>HHB', 0x1044, 1, 2)
+                 + struct.pack('>HHB', 0x1057, 1, int(ap['wps_locked']))
+                 + struct.pack('>HH', 0x1021, len(manufacturer)) + manufacturer
+                 + struct.pack('>HH', 0x1023, len(model)) + model)
+        body += _ie(221, b'\x00\x50\xf2\x04' + attrs)
+    return radiotap + header + body
+
+def data_frame(station, channel, payload):
+    """Radiotap + 802.11 to-DS data frame from an associated station"""
+    bssid = station['bssid'].to_bytes(6, 'big')
+    header = b'\x08\x01\x00\x00' + bssid + station['mac'].to_bytes(6, 'big') + bssid + b'\x00\x00'
+    return radiotap_header(channel, station['power']) + header + payload
+
+def probe_request(station, essid):
+    """Radiotap + 802.11 probe request from a station, for one ESSID"""
+    header = b'\x40\x00\x00\x00' + b'\xff' * 6 + station['mac'].to_bytes(6, 'big') + b'\xff' * 6 + b'\x00\x00'
+    return radiotap_header(1, station['power']) + header + _ie(0, essid.encode()) + _ie(1, b'\x82\x84\x8b\x96')
+
+def write_pcapng(path, frames):
+    """Write (timestamp, frame) pairs as a little-endian radiotap pcapng file"""
+    def block(block_type, body):
+        body += b'\x00' * (-len(body) % 4)
+        return struct.pack('<II', block_type, len(body) + 12) + body + struct.pack('<I', len(body) + 12)
+    chunks = [block(0x0A0D0D0A, struct.pack('<IHHq', 0x1A2B3C4D, 1, 0, -1)),
+              block(1, struct.pack('<HHI', 127, 0, 65535))]
+    for timestamp, frame in frames:
+        micros = int(timestamp * 1e6)
+        chunks.append(block(6, struct.pack('<IIIII', 0, micros >> 32, micros & 0xFFFFFFFF, len(frame), len(frame))
+                            + frame))
+    with open(path, 'wb') as f:
+        f.write(b''.join(chunks))
+    return path
+
+def write_pcap(path, frames):
+    """Write (timestamp, frame) pairs as a radiotap pcap file"""
+    chunks = [struct.pack('<IHHiIII', 0xA1B2C3D4, 2, 4, 0, 0, 65535, 127)]
+    for timestamp, frame in frames:
+        chunks.append(struct.pack('<IIII', int(timestamp), int(timestamp % 1 * 1e6), len(frame), len(frame)))
+        chunks.append(frame)
+    with open(path, 'wb') as f:
+        f.write(b''.join(chunks))
+    return path
+
+def survey_from_env(seed=None):
+    """Build a Survey from SIM_APS / SIM_STATIONS / SIM_CHURN / SIM_SEED"""
+    if seed is None and os.environ.get('SIM_SEED'):
+        seed = env_int('SIM_SEED', 0)
+    return Survey(aps=env_int('SIM_APS', 50), stations=env_int('SIM_STATIONS', 100),
+                  churn=env_float('SIM_CHURN', 0.02), seed=seed)
+
+def sleep_until(deadline):
+    remaining = deadline - time.monotonic()
+    if remaining > 0:
+        time.sleep(remaining)
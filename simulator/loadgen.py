@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Scan Pipeline Load Generator
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Drives the scan pipeline with synthetic surveys and reports throughput,
+latency and peak memory, without wireless hardware. The parse benchmark
+also reports how much memory the parsed survey keeps as __slots__ records
+and how much the same survey takes as plain dicts.
+
+    python3 simulator/loadgen.py --aps 50000 --stations 20000 --rounds 5
+    python3 simulator/loadgen.py --aps 2000 --ingest --database-url sqlite:////tmp/load.db
+    python3 simulator/loadgen.py --aps 500 --live --scan-seconds 3
+    python3 simulator/loadgen.py --aps 200 --stations 400 --capture --capture-seconds 60
+    python3 simulator/loadgen.py --http --workers 1,2,4 --concurrency 8 --seconds 10
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import urllib.request
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SIM_DIR)
+sys.path.insert(1, os.path.dirname(SIM_DIR))
+
+import fakeradio
+from ap_records import to_dicts
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def report(name, timings, items, peak_bytes=None):
+    total = sum(timings)
+    line = (f"{name:8s} rounds={len(timings)} items/round={items} "
+            f"p50={statistics.median(timings) * 1000:.1f}ms p95={percentile(timings, 95) * 1000:.1f}ms "
+            f"throughput={items * len(timings) / total if total else 0:,.0f}/s")
+    if peak_bytes is not None:
+        line += f" peak_mem={peak_bytes / 1024 / 1024:.1f}MiB"
+    print(line)
+
+# airodump_parser is level with the legacy loop on small surveys, where
+# per-parse setup and the station rows it also reads weigh the most
+PARSE_CHECK_APS = 50000
+
+def legacy_parse(path):
+    """The readlines/split loop used before airodump_parser (5 AP columns, no stations, no WPS pins)"""
+    networks = []
+    with open(path, 'r') as f:
+        lines = f.readlines()
+    ap_start = 0
+    for i, line in enumerate(lines):
+        if 'BSSID' in line and 'First time seen' in line:
+            ap_start = i + 1
+            break
+    for line in lines[ap_start:]:
+        if not line.strip() or 'Station MAC' in line:
+            break
+        fields = [field.strip() for field in line.split(',')]
+        if len(fields) >= 14 and fields[0]:
+            networks.append({'bssid': fields[0], 'essid': fields[13] or 'Hidden', 'channel': fields[3],
+                             'power': fields[8], 'encryption': fields[5]})
+    return networks
+
+def run_parse(args, manager, workdir):
+    """Time CSV parsing over a churning survey, next to the pre-airodump_parser loop"""
+    survey = fakeradio.Survey(aps=args.aps, stations=args.stations, churn=args.churn, seed=args.seed)
+    path = os.path.join(workdir, 'load-01.csv')
+    timings = []
+    legacy = []
+    networks = []
+    for round_no in range(args.rounds):
+        survey.write_csv(path)
+        survey.tick()
+        # Alternate which parser goes first, so neither always inherits the other's freed memory
+        for which in ((legacy, timings) if round_no % 2 else (timings, legacy)):
+            start = time.perf_counter()
+            if which is legacy:
+                legacy_parse(path)
+            else:
+                networks = manager._parse_airodump_csv(path)
+            which.append(time.perf_counter() - start)
+    # Peak memory from one more, untimed pass; tracing slows parsing several times over
+    tracemalloc.start()
+    records = manager._parse_airodump_csv(path) + manager.last_stations
+    peak = tracemalloc.get_traced_memory()[1]
+    kept_records = tracemalloc.get_traced_memory()[0]
+    # The same survey as dicts: they share the records' values, so drop the
+    # records before measuring what the dicts keep alive
+    dicts = to_dicts(records)
+    count = len(records)
+    del records
+    kept_dicts = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del dicts
+    report('legacy', legacy, args.aps)
+    report('parse', timings, args.aps, peak)
+    print(f"memory   items={count} records={kept_records / 1024 / 1024:.1f}MiB "
+          f"({kept_records / count:.0f}B/item) dicts={kept_dicts / 1024 / 1024:.1f}MiB "
+          f"({kept_dicts / count:.0f}B/item) dicts/records={kept_dicts / kept_records:.2f}")
+    # Both parsers run back to back in every round, so the per-round ratio
+    # cancels out load that a comparison of the two medians would pick up
+    ratio = statistics.median(new / old for new, old in zip(timings, legacy))
+    print(f"parse/legacy p50 ratio={ratio:.2f}")
+    if args.aps >= PARSE_CHECK_APS and ratio >= 1:
+        raise SystemExit(f"airodump_parser was not faster than the legacy loop (ratio {ratio:.2f})")
+    return networks
+
+def run_ingest(args, networks, stations):
+    """Time database ingest of one parsed survey per round"""
+    from app import create_app, ingest_scan_results, ensure_schema
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.database_url, 'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    timings = []
+    with app.app_context():
+        ensure_schema()
+        for round_no in range(args.rounds):
+            start = time.perf_counter()
+            ingest_scan_results(networks, f'loadgen-{round_no}', stations=stations)
+            timings.append(time.perf_counter() - start)
+    report('ingest', timings, len(networks))
+
+def run_capture(args, workdir):
+    """Time pcap_reader over a synthetic monitor-mode capture, as pcap and pcapng"""
+    from pcap_reader import read_capture
+
+    survey = fakeradio.Survey(aps=args.aps, stations=args.stations, churn=args.churn, seed=args.seed)
+    frames = list(survey.traffic(args.capture_seconds))
+    for name, write in (('pcap', fakeradio.write_pcap), ('pcapng', fakeradio.write_pcapng)):
+        path = write(os.path.join(workdir, f'load.{name}'), frames)
+        size = os.path.getsize(path)
+        timings = []
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            read_capture(path)
+            timings.append(time.perf_counter() - start)
+        report(name, timings, len(frames))
+        print(f"{name:8s} {size / 1e6:.0f}MB best={size / 1e6 / min(timings):.0f}MB/s")
+
+def run_live(args, manager, workdir):
+    """Run full scan_networks() cycles against the fake airodump-ng"""
+    os.environ['PATH'] = SIM_DIR + os.pathsep + os.environ.get('PATH', '')
+    os.environ['SIM_APS'] = str(args.aps)
+    os.environ['SIM_STATIONS'] = str(args.stations)
+    os.environ['SIM_CHURN'] = str(args.churn)
+    os.environ['SIM_STATE_FILE'] = os.path.join(workdir, 'state.json')
+    fakeradio.STATE_FILE = os.environ['SIM_STATE_FILE']
+    fakeradio.save_state(fakeradio.default_state())
+    manager.monitor_interface = 'wlan0'
+
+    timings = []
+    found = 0
+    for _ in range(args.rounds):
+        start = time.perf_counter()
+        found = len(manager.scan_networks(duration=args.scan_seconds))
+        timings.append(time.perf_counter() - start)
+    report('live', timings, found)
+
+def _wait_for_port(port, proc, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise SystemExit(f'gunicorn exited with {proc.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise SystemExit('gunicorn did not start listening')
+
+def _hammer(url, seconds, concurrency):
+    """GET url from concurrency client threads for seconds; returns (latencies, errors)"""
+    latencies = []
+    errors = []
+    deadline = time.monotonic() + seconds
+
+    def client():
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as response:
+                    response.read()
+                latencies.append(time.perf_counter() - start)
+            except OSError as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors
+
+def run_http(args, workdir):
+    """Request throughput of the web app under gunicorn, per worker count"""
+    env = dict(os.environ, WIFI_TOOL_DIR=SIM_DIR, SIM_STATE_FILE=os.path.join(workdir, 'state.json'),
+               DATABASE_URL=f"sqlite:///{os.path.join(workdir, 'http.db')}")
+    print(f"cpus={os.cpu_count()} concurrency={args.concurrency} seconds={args.seconds}")
+    for workers in (int(w) for w in args.workers.split(',')):
+        port = args.port
+        proc = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-w', str(workers), '-b', f'127.0.0.1:{port}',
+                                 '--log-level', 'warning', 'wsgi:app'],
+                                cwd=os.path.dirname(SIM_DIR), env=env, stderr=subprocess.DEVNULL)
+        try:
+            _wait_for_port(port, proc)
+            for path in args.paths.split(','):
+                url = f'http://127.0.0.1:{port}{path}'
+                _hammer(url, 1, args.concurrency)  # warm every worker up
+                latencies, errors = _hammer(url, args.seconds, args.concurrency)
+                print(f"workers={workers} {path:18s} requests={len(latencies)} errors={len(errors)} "
+                      f"throughput={len(latencies) / args.seconds:,.1f}/s "
+                      f"p50={statistics.median(latencies) * 1000:.1f}ms p95={percentile(latencies, 95) * 1000:.1f}ms")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='Scan pipeline load generator')
+    parser.add_argument('--aps', type=int, default=5000)
+    parser.add_argument('--stations', type=int, default=2000)
+    parser.add_argument('--churn', type=float, default=0.02)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--ingest', action='store_true', help='also time database ingest')
+    parser.add_argument('--database-url', default='sqlite://')
+    parser.add_argument('--live', action='store_true', help='run scan_networks() against fake airodump-ng')
+    parser.add_argument('--scan-seconds', type=float, default=2)
+    parser.add_argument('--capture', action='store_true', help='benchmark pcap_reader on a traffic capture')
+    parser.add_argument('--capture-seconds', type=float, default=10)
+    parser.add_argument('--http', action='store_true', help='benchmark the web app under gunicorn')
+    parser.add_argument('--workers', default='1,2,4', help='gunicorn worker counts to compare')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--paths', default='/api/status,/api/db/networks')
+    parser.add_argument('--port', type=int, default=5077)
+    args = parser.parse_args()
+
+    if args.http:
+        with tempfile.TemporaryDirectory() as workdir:
+            run_http(args, workdir)
+        return 0
+    if args.capture:
+        with tempfile.TemporaryDirectory() as workdir:
+            run_capture(args, workdir)
+        return 0
+
+    from wifi_manager import WiFiManager
+    manager = WiFiManager()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.live:
+            run_live(args, manager, workdir)
+            return 0
+        networks = run_parse(args, manager, workdir)
+        if args.ingest:
+            run_ingest(args, networks, manager.last_stations)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Mobile UI Frame-Time Benchmark
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Runs the Kivy app in a headless window and feeds it a churning synthetic
+survey, one scan per second, while scrolling the network list. Reports
+frame times; a continuous survey should stay under 16.7 ms (60 fps).
+
+With --from-cache the first scan is put in the app's scan cache and the app
+starts from it, as after a restart; the first live scan repeats the cached
+one, so it should produce no events (`rescan_events`).
+
+    python3 simulator/mobile_bench.py --aps 300 --seconds 10
+    python3 simulator/mobile_bench.py --aps 300 --seconds 3 --from-cache
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SIM_DIR)
+sys.path.insert(1, os.path.dirname(SIM_DIR))
+
+# Headless window; must be set before Kivy is imported
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+os.environ.setdefault('KIVY_NO_CONSOLELOG', '1')
+# SDL's offscreen driver renders through EGL (Mesa's software rasteriser without a GPU);
+# the dummy driver never creates a window
+os.environ.setdefault('KIVY_WINDOW', 'sdl2')
+os.environ.setdefault('SDL_VIDEODRIVER', 'offscreen')
+# Fresh app data dir (scan cache, results log) per run; Kivy only creates its last component
+os.environ.setdefault('XDG_CONFIG_HOME', tempfile.mkdtemp(prefix='mobile-bench-'))
+
+import fakeradio
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def load_rounds(aps, rounds, churn, seed):
+    """Parse one synthetic scan per round ahead of time, off the UI thread"""
+    from airodump_parser import parse_airodump_csv
+
+    survey = fakeradio.Survey(aps=aps, stations=0, churn=churn, seed=seed)
+    scans = []
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'bench-01.csv')
+        for _ in range(rounds):
+            survey.write_csv(path)
+            survey.tick()
+            scans.append(parse_airodump_csv(path)[0])
+    return scans
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mobile UI frame-time benchmark')
+    parser.add_argument('--aps', type=int, default=300)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--churn', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--from-cache', action='store_true',
+                        help='start from a scan cache holding the first scan')
+    args = parser.parse_args(argv)
+
+    from kivy.clock import Clock
+    from kivy.uix.tabbedpanel import TabbedPanel
+    from mobile_app import WiFiSecurityApp
+
+    scans = load_rounds(args.aps, int(args.seconds) + 1, args.churn, args.seed)
+    frames = []
+    updates = []
+    flushes = []
+    batches = []
+
+    class BenchApp(WiFiSecurityApp):
+        def on_start(self):
+            # Show the list, so rows are instantiated, laid out and recycled while scrolling
+            panel = next(w for w in self.root.walk() if isinstance(w, TabbedPanel))
+            Clock.schedule_once(lambda dt: panel.switch_to(self.networks_tab), 0)
+            self.ensure_tab_built(self.networks_tab)
+            self._deadline = time.perf_counter() + args.seconds
+            if args.from_cache:
+                # Loaded by the real startup path; the first tick rescans the same APs
+                self.scan_cache.record_scan(scans[0])
+                super().on_start()
+            else:
+                self._apply_scan(0)
+            Clock.schedule_interval(self._apply_scan, 1)
+            Clock.schedule_interval(self._frame, 0)
+
+        def apply_scan(self, networks):
+            start = time.perf_counter()
+            events = super().apply_scan(networks)
+            updates.append(time.perf_counter() - start)
+            batches.append(events)
+            return events
+
+        def _apply_scan(self, dt):
+            if not scans:
+                return False
+            self.apply_scan(scans.pop(0))
+
+        def flush_signal_updates(self, dt):
+            start = time.perf_counter()
+            super().flush_signal_updates(dt)
+            flushes.append(time.perf_counter() - start)
+
+        def _frame(self, dt):
+            frames.append(dt)
+            # Sweep the list top to bottom and back to exercise recycling
+            phase = (len(frames) % 240) / 120
+            self.networks_list.scroll_y = 1 - phase if phase <= 1 else phase - 1
+            if time.perf_counter() >= self._deadline:
+                self.stop()
+                return False
+
+    BenchApp().run()
+
+    frames = frames[1:] or [0]
+    # From the cache the first batch is the cached survey and the second the rescan
+    rescan_events = len(batches[1]) if args.from_cache and len(batches) > 1 else None
+    updates = updates or [0]
+    flushes = flushes or [0]
+    print(f"aps={args.aps} scans={len(updates)} update_p50={statistics.median(updates) * 1000:.1f}ms "
+          f"update_max={max(updates) * 1000:.1f}ms flush_p50={statistics.median(flushes) * 1000:.1f}ms "
+          f"flush_max={max(flushes) * 1000:.1f}ms frames={len(frames)} "
+          f"p50={statistics.median(frames) * 1000:.1f}ms p95={percentile(frames, 95) * 1000:.1f}ms "
+          f"max={max(frames) * 1000:.1f}ms over_16ms={sum(f > 1 / 60 for f in frames)}"
+          + (f" rescan_events={rescan_events}" if args.from_cache else ''))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
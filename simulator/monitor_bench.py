@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Monitor Mode Toggle Benchmark
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Times enable/disable of monitor mode for the vif and airmon-ng methods and
+checks that the managed interface survived. Runs against real radios
+(e.g. `modprobe mac80211_hwsim radios=1`, as root) or, with
+WIFI_TOOL_DIR=simulator, against the stand-in tools.
+
+    sudo python3 simulator/monitor_bench.py --rounds 10
+    WIFI_TOOL_DIR=simulator python3 simulator/monitor_bench.py
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(SIM_DIR))
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def bench(manager, method, rounds):
+    from iface_watcher import get_watcher
+
+    enable, disable = [], []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        if not manager.enable_monitor_mode(method=method):
+            raise SystemExit(f'{method}: enable_monitor_mode failed')
+        enable.append(time.perf_counter() - start)
+        managed = get_watcher().get(manager.original_interface)
+        kept = managed is not None and managed['type'] == 'managed'
+        used = manager.monitor_method
+        start = time.perf_counter()
+        manager.disable_monitor_mode()
+        disable.append(time.perf_counter() - start)
+    return used, kept, enable, disable
+
+def main():
+    parser = argparse.ArgumentParser(description='Monitor mode toggle benchmark')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--methods', default='vif,airmon')
+    args = parser.parse_args()
+
+    from wifi_manager import WiFiManager
+
+    manager = WiFiManager()
+    print(f"{'method':8} {'used':7} {'managed kept':13} {'enable p50':>11} {'p95':>8} {'disable p50':>12} {'p95':>8}")
+    for method in args.methods.split(','):
+        used, kept, enable, disable = bench(manager, method, args.rounds)
+        print(f"{method:8} {used:7} {str(kept):13} "
+              f"{statistics.median(enable) * 1000:9.1f}ms {percentile(enable, 95) * 1000:6.1f}ms "
+              f"{statistics.median(disable) * 1000:10.1f}ms {percentile(disable, 95) * 1000:6.1f}ms")
+
+if __name__ == '__main__':
+    main()
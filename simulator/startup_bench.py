@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Cold-Start Benchmark
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Measures cold start in fresh interpreters: `python -X importtime` for the
+web and mobile entry modules, time from process spawn to the web app's
+first response, and to the Kivy app's first drawn frame (headless, SDL's
+offscreen driver). Exits non-zero when a run is over its budget.
+
+    python3 simulator/startup_bench.py
+    python3 simulator/startup_bench.py --runs 5 --no-frame
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(SIM_DIR)
+
+# Budgets in milliseconds for the median of the runs, about twice what one
+# slow CPU measures; STARTUP_BUDGET_SCALE scales all of them for other hosts
+BUDGETS_MS = {
+    'import_app': 1300,
+    'import_mobile_app': 1000,
+    'first_response': 1600,
+    'first_frame': 1200,
+}
+
+_IMPORTTIME = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|\s*(\S+)\s*$')
+
+# Child for time-to-first-response: build the app and serve one database-backed
+# API request in-process (the first request also runs the schema check)
+_FIRST_RESPONSE = """
+from app import create_app
+app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+response = app.test_client().get('/api/db/networks')
+print(response.status_code, flush=True)
+"""
+
+# Child for time-to-first-frame: report once the window has flipped a frame
+_FIRST_FRAME = """
+import os
+from kivy.base import EventLoop
+from mobile_app import WiFiSecurityApp
+
+class FirstFrameApp(WiFiSecurityApp):
+    def on_start(self):
+        super().on_start()
+        EventLoop.window.bind(on_flip=self._first_frame)
+
+    def _first_frame(self, *args):
+        print('frame', flush=True)
+        os._exit(0)
+
+FirstFrameApp().run()
+"""
+
+def child_env():
+    env = dict(os.environ)
+    env.pop('DATABASE_URL', None)
+    env['PYTHONPATH'] = REPO_DIR + os.pathsep + env.get('PYTHONPATH', '')
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    # Headless Kivy: the offscreen driver renders through EGL without a display
+    env.setdefault('KIVY_NO_ARGS', '1')
+    env.setdefault('KIVY_NO_CONSOLELOG', '1')
+    env.setdefault('KIVY_WINDOW', 'sdl2')
+    env.setdefault('SDL_VIDEODRIVER', 'offscreen')
+    return env
+
+def import_time(module):
+    """Cumulative import time of module in a fresh interpreter, in ms"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=REPO_DIR, env=child_env(), capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed: {result.stderr.strip().splitlines()[-1:]}")
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match and match.group(3) == module:
+            return int(match.group(2)) / 1000
+    raise RuntimeError(f"no importtime entry for {module}")
+
+def time_to_output(code, expected, timeout=60):
+    """Wall time from spawning a fresh interpreter until it prints `expected`, in ms"""
+    env = child_env()
+    with tempfile.TemporaryDirectory(prefix='startup-bench-') as workdir:
+        # Fresh Kivy data dir; Kivy only creates its last component
+        env['XDG_CONFIG_HOME'] = workdir
+        # A file rather than -c: Kivy looks up the app class's source file for its .kv
+        script = os.path.join(workdir, 'startup_child.py')
+        with open(script, 'w') as f:
+            f.write(code)
+        start = time.perf_counter()
+        child = subprocess.Popen([sys.executable, script], cwd=REPO_DIR, env=env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        try:
+            line = child.stdout.readline().strip()
+            elapsed = (time.perf_counter() - start) * 1000
+            child.wait(timeout=timeout)
+        finally:
+            if child.poll() is None:
+                child.kill()
+                child.wait()
+        if line != expected:
+            raise RuntimeError(f"expected {expected!r}, got {line!r}: {child.stderr.read().strip()[-500:]}")
+    return elapsed
+
+MEASUREMENTS = {
+    'import_app': lambda: import_time('app'),
+    'import_mobile_app': lambda: import_time('mobile_app'),
+    'first_response': lambda: time_to_output(_FIRST_RESPONSE, '200'),
+    'first_frame': lambda: time_to_output(_FIRST_FRAME, 'frame'),
+}
+
+def measure(name, runs=3):
+    """Median of `runs` cold-start measurements, in ms"""
+    return statistics.median(MEASUREMENTS[name]() for _ in range(runs))
+
+def budget(name):
+    return BUDGETS_MS[name] * float(os.environ.get('STARTUP_BUDGET_SCALE', 1))
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold-start benchmark')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--no-frame', action='store_true', help='skip the Kivy first-frame measurement')
+    args = parser.parse_args()
+
+    over = 0
+    for name in MEASUREMENTS:
+        if name == 'first_frame' and args.no_frame:
+            continue
+        value = measure(name, args.runs)
+        limit = budget(name)
+        status = 'ok' if value <= limit else 'OVER'
+        over += value > limit
+        print(f"{name:18s} median={value:7.1f}ms budget={limit:7.0f}ms {status}")
+    return 1 if over else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
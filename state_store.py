@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Shared State
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Runtime state (scan results, monitor mode, current operation) kept in the
+app_state table so every worker process sees the same values.
+"""
+
+import logging
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import flag_modified
+from models import db, AppState
+
+logger = logging.getLogger(__name__)
+
+class StateStore:
+    """Key/value view over the app_state table"""
+
+    DEFAULTS = {
+        'scan_results': [],
+        'scan_events': [],
+        'rogue_aps': [],
+        'alerts': [],
+        'scan_baseline': [],
+        'twin_baseline': {},
+        'alert_rules': None,
+        'trusted_version': 0,
+        'monitor_mode_active': False,
+        'monitor_interface': None,
+        'monitor_method': None,
+        'current_operation': None
+    }
+
+    def get(self, key, default=None):
+        """Get a state value, falling back to the built-in default"""
+        if default is None:
+            default = self.DEFAULTS.get(key)
+        try:
+            row = db.session.get(AppState, key)
+            return row.value if row is not None else default
+        except Exception as e:
+            logger.error(f"Failed to read state {key}: {e}")
+            db.session.rollback()
+            return default
+
+    def set(self, key, value):
+        """Store a state value and commit it immediately"""
+        try:
+            row = db.session.get(AppState, key)
+            if row is None:
+                row = AppState(key=key)
+                db.session.add(row)
+            row.value = value
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write state {key}: {e}")
+            db.session.rollback()
+            raise
+
+    def update(self, **values):
+        """Store several state values in one transaction"""
+        try:
+            for key, value in values.items():
+                row = db.session.get(AppState, key)
+                if row is None:
+                    row = AppState(key=key)
+                    db.session.add(row)
+                row.value = value
+            db.session.commit()
+        except Exception as e:
+            logger.error(f"Failed to write state: {e}")
+            db.session.rollback()
+            raise
+
+    def modify(self, key, change):
+        """
+        Replace a state value with change(value) in one transaction. The row
+        is read with SELECT ... FOR UPDATE, so a worker updating the same key
+        waits for this commit instead of overwriting it (SQLite ignores FOR
+        UPDATE, but it only allows one writer at a time). Returns the new value.
+        """
+        try:
+            row = self._locked_row(key)
+            row.value = change(self.DEFAULTS.get(key) if row.value is None else row.value)
+            flag_modified(row, 'value')
+            db.session.commit()
+            return row.value
+        except Exception as e:
+            logger.error(f"Failed to update state {key}: {e}")
+            db.session.rollback()
+            raise
+
+    def _locked_row(self, key):
+        query = db.session.query(AppState).filter_by(key=key).with_for_update().populate_existing()
+        row = query.one_or_none()
+        if row is None:
+            # Nothing to lock yet; create the row, or find that another worker just did
+            try:
+                db.session.add(AppState(key=key))
+                db.session.commit()
+            except IntegrityError:
+                db.session.rollback()
+            row = query.one()
+        return row
+
+    def snapshot(self, *keys):
+        """Get state values as a dict: all of them, or only the given keys"""
+        state = dict(self.DEFAULTS)
+        try:
+            query = AppState.query
+            if keys:
+                query = query.filter(AppState.key.in_(keys))
+            for row in query.all():
+                state[row.key] = row.value
+        except Exception as e:
+            logger.error(f"Failed to read state: {e}")
+            db.session.rollback()
+        return state
@@ -5,118 +5,81 @@ System utilities for dependency management and system checks
 """
 
 import os
-import subprocess
 import sys
 import logging
+from tracing import traced
+from metrics import timed_run
+from wireless_caps import capabilities
+from install_planner import InstallPlanner, PipBackend, RUNTIME_REQUIREMENTS, SYSTEM, PYTHON, detect_backend
 
 logger = logging.getLogger(__name__)
 
 class SystemUtils:
     def __init__(self):
-        self.required_packages = [
-            'aircrack-ng',
-            'reaver',
-            'pixiewps',
-            'iw',
-            'wireless-tools'
-        ]
-        
-        self.python_packages = [
-            'flask',
-            'wcwidth'
-        ]
+        self.requirements = RUNTIME_REQUIREMENTS
+        self.required_packages = [req.name for req in RUNTIME_REQUIREMENTS if req.kind == SYSTEM]
+        self.python_packages = [req.name for req in RUNTIME_REQUIREMENTS if req.kind == PYTHON]
+    
+    def _planner(self, install=False):
+        system_backend = detect_backend(run=timed_run) if install else None
+        python_backend = PipBackend(run=timed_run) if install else None
+        return InstallPlanner(self.requirements, system_backend=system_backend, python_backend=python_backend)
     
     def check_root(self):
         """Check if running with root privileges"""
         return os.geteuid() == 0
     
+    @traced(category='system')
     def check_monitor_capability(self):
         """Check if system supports monitor mode"""
-        try:
-            result = subprocess.run(['iw', 'list'], capture_output=True, text=True)
-            return 'monitor' in result.stdout.lower()
-        except:
-            return False
+        return any(phy.supports('monitor') for phy in capabilities.get())
     
-    def check_dependencies(self):
-        """Check if all required dependencies are installed"""
-        status = {}
-        
-        # Check system packages
-        for package in self.required_packages:
-            status[package] = self._check_package_installed(package)
-        
-        # Check Python packages
-        for package in self.python_packages:
-            status[f"python-{package}"] = self._check_python_package(package)
-        
-        return status
-    
-    def _check_package_installed(self, package):
-        """Check if a system package is installed"""
-        try:
-            result = subprocess.run(['which', package], 
-                                  capture_output=True, text=True)
-            return result.returncode == 0
-        except:
-            return False
+    def get_wireless_capabilities(self):
+        """Per-phy capability summaries (cached until a phy is added or removed)"""
+        return [phy.summary() for phy in capabilities.get()]
     
-    def _check_python_package(self, package):
-        """Check if a Python package is installed"""
-        try:
-            __import__(package)
-            return True
-        except ImportError:
-            return False
+    @traced(category='system')
+    def check_dependencies(self):
+        """Check if all required dependencies are installed (probed concurrently)"""
+        return self._planner().probe()
     
+    @traced(category='system')
     def install_dependencies(self):
-        """Install all required dependencies"""
+        """Install all missing dependencies, one transaction per package manager"""
         if not self.check_root():
             raise Exception("Root access required for installation")
         
-        try:
-            # Update package lists
-            logger.info("Updating package lists...")
-            subprocess.run(['apt-get', 'update'], check=True)
-            
-            # Install system packages
-            logger.info("Installing system packages...")
-            for package in self.required_packages:
-                if not self._check_package_installed(package):
-                    logger.info(f"Installing {package}...")
-                    subprocess.run(['apt-get', 'install', '-y', package], check=True)
-            
-            # Install Python packages
-            logger.info("Installing Python packages...")
-            for package in self.python_packages:
-                if not self._check_python_package(package):
-                    logger.info(f"Installing python-{package}...")
-                    subprocess.run([sys.executable, '-m', 'pip', 'install', package], check=True)
-            
-            logger.info("All dependencies installed successfully")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to install dependencies: {e}")
-            raise
+        planner = self._planner(install=True)
+        if planner.backends[SYSTEM] is None:
+            raise Exception("No supported package manager found")
+        
+        report = planner.apply()
+        if report['failed']:
+            logger.error(f"Failed to install dependencies: {', '.join(report['failed'])}")
+            raise Exception(f"Failed to install: {', '.join(report['failed'])}")
+        
+        logger.info(f"All dependencies installed successfully ({report['transactions']} transaction(s))")
+        return True
     
+    @traced(category='system')
     def setup_permissions(self):
         """Setup proper permissions for wireless operations"""
         try:
             # Add user to required groups
             username = os.environ.get('SUDO_USER', os.environ.get('USER'))
             if username:
-                subprocess.run(['usermod', '-a', '-G', 'netdev', username])
+                timed_run(['usermod', '-a', '-G', 'netdev', username])
             
             # Set capabilities for tools
             tools = ['/usr/bin/reaver', '/usr/bin/airodump-ng', '/usr/bin/aircrack-ng']
             for tool in tools:
                 if os.path.exists(tool):
-                    subprocess.run(['setcap', 'cap_net_raw,cap_net_admin=eip', tool])
+                    timed_run(['setcap', 'cap_net_raw,cap_net_admin=eip', tool])
             
         except Exception as e:
             logger.error(f"Failed to setup permissions: {e}")
     
+    @traced(category='system')
     def get_system_info(self):
         """Get system information"""
         info = {}
@@ -133,7 +96,7 @@ class SystemUtils:
         
         # Kernel version
         try:
-            result = subprocess.run(['uname', '-r'], capture_output=True, text=True)
+            result = timed_run(['uname', '-r'], capture_output=True, text=True)
             info['kernel'] = result.stdout.strip()
         except:
             info['kernel'] = 'Unknown'
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Regenerates capture.pcap and capture.pcapng with the simulator's frame
+builders: two APs beaconing twice, an associated station, a probing
+station, and a data frame whose radiotap header overruns the capture.
+The pcapng copy also ends with an EPB whose length overruns its block.
+
+    python3 tests/fixtures/make_captures.py
+"""
+
+import os
+import struct
+import sys
+
+FIXTURES = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(FIXTURES)), 'simulator'))
+
+import fakeradio
+
+START = 1700000000
+CAFE = {'bssid': 0x001122334455, 'essid': 'Cafe', 'channel': 6, 'power': -40, 'privacy': 'WPA2',
+        'cipher': 'CCMP', 'auth': 'PSK', 'wps': ('Acme', 'Router 1'), 'wps_locked': False}
+OPEN = {'bssid': 0x001122334466, 'essid': 'Open', 'channel': 36, 'power': -70, 'privacy': 'OPN',
+        'cipher': '', 'auth': '', 'wps': None, 'wps_locked': False}
+ASSOCIATED = {'mac': 0x00AABBCCDD01, 'bssid': CAFE['bssid'], 'power': -50}
+PROBING = {'mac': 0x00AABBCCDD02, 'bssid': None, 'power': -60}
+TRUNCATED = {'mac': 0x00AABBCCDD03, 'bssid': CAFE['bssid'], 'power': -55}
+
+def frames():
+    truncated = bytearray(fakeradio.data_frame(TRUNCATED, 6, b'\x00' * 8))
+    truncated[2:4] = struct.pack('<H', 200)
+    return [
+        (START, fakeradio.beacon_frame(CAFE)),
+        (START, fakeradio.beacon_frame(OPEN)),
+        (START + 1, fakeradio.data_frame(ASSOCIATED, 6, b'\x00' * 32)),
+        (START + 2, fakeradio.probe_request(PROBING, 'Home')),
+        (START + 3, bytes(truncated)),
+        (START + 4, fakeradio.data_frame(ASSOCIATED, 6, b'\x00' * 64)),
+        (START + 5, fakeradio.beacon_frame(CAFE)),
+        (START + 5, fakeradio.beacon_frame(OPEN)),
+    ]
+
+def main():
+    fakeradio.write_pcap(os.path.join(FIXTURES, 'capture.pcap'), frames())
+    path = fakeradio.write_pcapng(os.path.join(FIXTURES, 'capture.pcapng'), frames())
+    # EPB claiming 4000 captured bytes in a 48-byte block
+    body = struct.pack('<IIIII', 0, 0, 0, 4000, 4000) + b'\x00' * 16
+    with open(path, 'ab') as f:
+        f.write(struct.pack('<II', 6, len(body) + 12) + body + struct.pack('<I', len(body) + 12))
+
+if __name__ == '__main__':
+    main()
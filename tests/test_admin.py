@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+import app as web
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(web, '_schema_checked', False)
+    monkeypatch.delenv('ADMIN_TOKEN', raising=False)
+    flask_app = web.create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'wifi.db'}",
+                                'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    return flask_app.test_client()
+
+def test_localhost_is_not_admin_without_a_token(client):
+    response = client.get('/api/admin/trace', environ_base={'REMOTE_ADDR': '127.0.0.1'})
+    assert response.status_code == 403
+
+@pytest.mark.parametrize('header', [None, '', 'wrong', 'sécret'])
+def test_wrong_token_is_refused(client, monkeypatch, header):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    headers = {} if header is None else {'X-Admin-Token': header}
+    assert client.post('/api/admin/trace', json={'action': 'stop'}, headers=headers).status_code == 403
+
+def test_matching_token_is_admin(client, monkeypatch):
+    monkeypatch.setenv('ADMIN_TOKEN', 'secret')
+    response = client.post('/api/admin/trace', json={'action': 'stop'}, headers={'X-Admin-Token': 'secret'})
+    assert response.status_code == 200
+    assert response.get_json()['success'] is True
@@ -0,0 +1,61 @@
+from airodump_parser import parse_airodump_buffer, parse_airodump_csv
+
+AP_HEADER = ('BSSID, First time seen, Last time seen, channel, Speed, Privacy, Cipher, '
+             'Authentication, Power, # beacons, # IV, LAN IP, ID-length, ESSID, Key')
+STATION_HEADER = 'Station MAC, First time seen, Last time seen, Power, # packets, BSSID, Probed ESSIDs'
+
+def ap_row(bssid, essid, id_length=None, channel=' 6', power='-40'):
+    id_length = len(essid.encode()) if id_length is None else id_length
+    return (f'{bssid}, 2024-01-01 00:00:00, 2024-01-01 00:00:09, {channel},  54, WPA2, CCMP, PSK, '
+            f'{power},       10,        0,   0.  0.  0.   0, {id_length:3d}, {essid}, ')
+
+def csv(*rows, stations=()):
+    lines = ['', AP_HEADER, *rows, '', STATION_HEADER, *stations, '']
+    return '\r\n'.join(lines).encode('utf-8')
+
+def test_ap_columns():
+    (ap,), stations = parse_airodump_buffer(csv(ap_row('00:11:22:33:44:55', 'Cafe')))
+    assert stations == []
+    assert ap.to_dict() == {
+        'bssid': '00:11:22:33:44:55', 'essid': 'Cafe', 'channel': 6, 'power': -40, 'speed': 54,
+        'privacy': 'WPA2', 'encryption': 'WPA2', 'cipher': 'CCMP', 'authentication': 'PSK',
+        'beacons': 10, 'ivs': 0, 'lan_ip': '0.0.0.0', 'id_length': 4,
+        'first_seen': '2024-01-01 00:00:00', 'last_seen': '2024-01-01 00:00:09',
+        'wps': None, 'wps_locked': None, 'manufacturer': None, 'model': None, 'vendor_ouis': ()}
+
+def test_essids_are_cut_by_id_length():
+    aps, _ = parse_airodump_buffer(csv(
+        ap_row('00:11:22:33:44:01', 'Cafe, Free WiFi'),
+        ap_row('00:11:22:33:44:02', 'Café ☕'),
+        ap_row('00:11:22:33:44:03', '\x00\x00\x00\x00'),
+        ap_row('00:11:22:33:44:04', '', id_length=0),
+        ap_row('00:11:22:33:44:05', 'Trailing,', id_length=99)))
+    assert [ap.essid for ap in aps] == ['Cafe, Free WiFi', 'Café ☕', '', '', 'Trailing,']
+
+def test_malformed_rows_are_skipped():
+    aps, _ = parse_airodump_buffer(csv(
+        'not a row', ap_row('zz:11:22:33:44:55', 'Bad'), ap_row('00:11:22:33:44:55', 'Good', channel='-1',
+                                                                power='x')))
+    assert [(ap.essid, ap.channel, ap.power) for ap in aps] == [('Good', -1, None)]
+
+def test_stations():
+    _, stations = parse_airodump_buffer(csv(stations=[
+        'AA:BB:CC:DD:EE:01, 2024-01-01 00:00:00, 2024-01-01 00:00:09, -50,       12, 00:11:22:33:44:55, Home,Work',
+        'AA:BB:CC:DD:EE:02, 2024-01-01 00:00:00, 2024-01-01 00:00:09, -60,        3, (not associated) , ',
+        'AA:BB:CC:DD:EE:03, 2024-01-01 00:00:00, 2024-01-01 00:00:09, -70,        1, (not associated) ']))
+    assert [(s.mac, s.bssid, s.power, s.packets, s.probed_essids) for s in stations] == [
+        ('AA:BB:CC:DD:EE:01', '00:11:22:33:44:55', -50, 12, ('Home', 'Work')),
+        ('AA:BB:CC:DD:EE:02', None, -60, 3, ()),
+        ('AA:BB:CC:DD:EE:03', None, -70, 1, ())]
+
+def test_rows_across_chunk_boundaries(monkeypatch):
+    import airodump_parser
+    monkeypatch.setattr(airodump_parser, 'CHUNK_SIZE', 64)
+    rows = [ap_row(f'00:11:22:33:44:{i:02X}', f'Net{i}') for i in range(50)]
+    aps, _ = parse_airodump_buffer(csv(*rows))
+    assert [ap.essid for ap in aps] == [f'Net{i}' for i in range(50)]
+
+def test_empty_file(tmp_path):
+    path = tmp_path / 'scan-01.csv'
+    path.write_bytes(b'')
+    assert parse_airodump_csv(str(path)) == ([], [])
@@ -0,0 +1,154 @@
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import pytest
+from alert_rules import CompiledRule, RuleEngine, RuleError, SpoolSink, WebhookSink
+from ap_records import mac_to_int
+from scan_diff import APPEARED, CHANGED, DISAPPEARED, RSSI, ScanEvent
+
+def event(kind, bssid, essid='Office', privacy='WPA2', channel=6, power=-50, previous=None):
+    record = None if kind == DISAPPEARED else {'essid': essid, 'privacy': privacy, 'channel': channel,
+                                               'power': power}
+    return ScanEvent(kind, mac_to_int(bssid), 1000, record, previous)
+
+class ListSink:
+    def __init__(self):
+        self.alerts = []
+
+    def send(self, alert):
+        self.alerts.append(alert)
+
+def fired(rules, events, **kwargs):
+    return [(alert['rule'], alert['bssid']) for alert in RuleEngine(rules).evaluate(events, **kwargs)]
+
+@pytest.mark.parametrize('definition, message', [
+    ({}, 'needs a name'),
+    ('Open network', 'needs a name'),
+    ({'name': 'r', 'events': ['appeared', 'vanished']}, 'unknown event type(s) vanished'),
+    ({'name': 'r', 'events': 5}, 'events must be a list'),
+    ({'name': 'r', 'bssid': 'not-a-mac'}, 'r: '),
+    ({'name': 'r', 'bssid_prefix': 'XY:ZZ'}, 'r: '),
+    ({'name': 'r', 'bssid_prefix': '00:11:22:33:44:55:66'}, 'longer than a MAC'),
+    ({'name': 'r', 'ssid_regex': '(unclosed'}, 'r: '),
+    ({'name': 'r', 'channel': 'six'}, 'r: '),
+    ({'name': 'r', 'signal_drop': 'a lot'}, 'r: '),
+    ({'name': 'r', 'cooldown': 'soon'}, 'r: '),
+    ({'name': 'r', 'rate_limit': None}, 'r: '),
+])
+def test_invalid_rules(definition, message):
+    with pytest.raises(RuleError, match=re.escape(message)):
+        CompiledRule(definition)
+
+def test_one_bad_rule_rejects_the_set():
+    engine = RuleEngine([{'name': 'ok'}])
+    with pytest.raises(RuleError):
+        engine.load([{'name': 'still ok'}, {'name': 'bad', 'events': ['gone']}])
+    assert [rule.name for rule in engine.rules] == ['ok']
+
+def test_rule_defaults():
+    rule = CompiledRule({'name': 'Anything'})
+    assert (rule.severity, rule.events, rule.cooldown, rule.rate_limit, rule.index_key) == \
+        ('medium', (APPEARED, DISAPPEARED, CHANGED, RSSI), 300, 60, None)
+    assert CompiledRule({'name': 'one', 'events': 'rssi'}).events == (RSSI,)
+
+@pytest.mark.parametrize('definition, index_key', [
+    ({'bssid': '00:11:22:33:44:55', 'ssid': 'Office'}, ('bssid', 0x001122334455)),
+    ({'bssid_prefix': '00:1A:2B', 'ssid': 'Office'}, ('prefix', 24, 0x001A2B)),
+    ({'ssid': 'Office', 'encryption': 'OPN'}, ('ssid', 'Office')),
+    ({'encryption': ['OPN']}, ('encryption', 'OPN')),
+    ({'encryption': ['OPN', 'WEP']}, None),
+    ({'ssid_regex': 'Guest'}, None),
+])
+def test_index_key_is_the_most_selective_field(definition, index_key):
+    assert CompiledRule(dict(definition, name='r')).index_key == index_key
+
+def test_matching():
+    rules = [
+        {'name': 'open', 'events': ['appeared'], 'encryption': 'OPN'},
+        {'name': 'corp', 'bssid_prefix': '00:1A:2B', 'channel': [1, 6, 11]},
+        {'name': 'guest', 'ssid_regex': '^Guest', 'events': ['changed']},
+        {'name': 'one ap', 'bssid': '00:11:22:33:44:55', 'events': ['disappeared']},
+        {'name': 'weak', 'signal_drop': 15, 'signal_below': -70},
+    ]
+    events = [
+        event(APPEARED, '00:AA:00:00:00:01', privacy='OPN'),
+        event(APPEARED, '00:AA:00:00:00:02'),
+        event(APPEARED, '00:1A:2B:00:00:01', channel=6),
+        event(APPEARED, '00:1A:2B:00:00:02', channel=36),
+        event(CHANGED, '00:AA:00:00:00:03', essid='Guest-5G'),
+        event(CHANGED, '00:AA:00:00:00:04', essid='My Guest'),
+        event(DISAPPEARED, '00:11:22:33:44:55'),
+        event(DISAPPEARED, '00:11:22:33:44:66'),
+        event(RSSI, '00:AA:00:00:00:05', power=-80, previous={'power': -60}),
+        event(RSSI, '00:AA:00:00:00:06', power=-72, previous={'power': -62}),
+    ]
+    assert fired(rules, events) == [('open', '00:AA:00:00:00:01'), ('corp', '00:1A:2B:00:00:01'),
+                                    ('guest', '00:AA:00:00:00:03'), ('one ap', '00:11:22:33:44:55'),
+                                    ('weak', '00:AA:00:00:00:05')]
+
+def test_record_fields_do_not_match_disappeared_events():
+    assert fired([{'name': 'open', 'encryption': 'OPN'}], [event(DISAPPEARED, '00:AA:00:00:00:01')]) == []
+
+def test_cooldown_per_rule_and_bssid():
+    engine = RuleEngine([{'name': 'any', 'cooldown': 60}])
+    assert len(engine.evaluate([event(APPEARED, '00:AA:00:00:00:01')], now=0)) == 1
+    assert engine.evaluate([event(CHANGED, '00:AA:00:00:00:01')], now=30) == []
+    assert len(engine.evaluate([event(CHANGED, '00:AA:00:00:00:02')], now=30)) == 1
+    assert len(engine.evaluate([event(CHANGED, '00:AA:00:00:00:01')], now=61)) == 1
+    assert engine.suppressed == 1
+
+def test_rate_limit():
+    engine = RuleEngine([{'name': 'any', 'cooldown': 0, 'rate_limit': 3}])
+    alerts = engine.evaluate([event(APPEARED, f'00:AA:00:00:00:{i:02X}') for i in range(10)])
+    assert len(alerts) == 3 and engine.suppressed == 7
+
+def test_alerts_go_to_every_sink():
+    class BrokenSink:
+        def send(self, alert):
+            raise OSError('disk full')
+
+    first, last = ListSink(), ListSink()
+    engine = RuleEngine([{'name': 'open', 'severity': 'high', 'encryption': 'OPN'}],
+                        sinks=[first, BrokenSink(), last])
+    alerts = engine.evaluate([event(APPEARED, '00:AA:00:00:00:01', essid='Cafe', privacy='OPN', channel=11)],
+                             now=1000)
+    assert alerts == first.alerts == last.alerts == [{
+        'rule': 'open', 'severity': 'high', 'event': APPEARED, 'bssid': '00:AA:00:00:00:01', 'ssid': 'Cafe',
+        'encryption': 'OPN', 'channel': 11, 'power': -50, 'previous': None, 'timestamp': 1000}]
+
+def test_spool_sink_appends_json_lines(tmp_path):
+    sink = SpoolSink(str(tmp_path / 'spool'))
+    engine = RuleEngine([{'name': 'any'}], sinks=[sink])
+    engine.evaluate([event(APPEARED, '00:AA:00:00:00:01'), event(APPEARED, '00:AA:00:00:00:02')])
+    with open(sink.path) as f:
+        assert [json.loads(line)['bssid'] for line in f] == ['00:AA:00:00:00:01', '00:AA:00:00:00:02']
+
+def test_webhook_sink_posts_json():
+    received = []
+    done = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append((self.headers['Content-Type'],
+                             json.loads(self.rfile.read(int(self.headers['Content-Length'])))))
+            self.send_response(204)
+            self.end_headers()
+            done.set()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.handle_request, daemon=True)
+    thread.start()
+    try:
+        sink = WebhookSink(f'http://127.0.0.1:{server.server_port}/alerts')
+        RuleEngine([{'name': 'any'}], sinks=[sink]).evaluate([event(APPEARED, '00:AA:00:00:00:01')])
+        assert done.wait(5)
+    finally:
+        thread.join(5)
+        server.server_close()
+    [(content_type, alert)] = received
+    assert content_type == 'application/json'
+    assert (alert['rule'], alert['bssid']) == ('any', '00:AA:00:00:00:01')
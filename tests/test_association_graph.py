@@ -0,0 +1,123 @@
+from datetime import datetime, timedelta
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+import app as web
+import association_graph
+from models import Association, Network, RoamEvent, Station
+
+T0 = datetime(2024, 1, 1, 12, 0, 0)
+
+@pytest.fixture
+def flask_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(web, '_schema_checked', False)
+    monkeypatch.setattr(association_graph, 'lookup_vendor', lambda mac: None)
+    flask_app = web.create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'wifi.db'}",
+                                'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    with flask_app.app_context():
+        web.ensure_schema()
+        yield flask_app
+        web.db.session.remove()
+        web.db.engine.dispose()
+
+@pytest.fixture
+def networks(flask_app):
+    rows = {bssid: Network(bssid=bssid, ssid=ssid, client_count=0)
+            for bssid, ssid in (('00:11:22:00:00:01', 'Office'), ('00:11:22:00:00:02', 'Office'),
+                                ('00:11:22:00:00:03', 'Lab'))}
+    web.db.session.add_all(rows.values())
+    web.db.session.commit()
+    return {bssid: network.id for bssid, network in rows.items()}
+
+def sta(mac, bssid=None, power=-60, **fields):
+    return dict({'mac': mac, 'bssid': bssid, 'power': power, 'packets': 10}, **fields)
+
+def scan(networks, stations, minutes):
+    count = association_graph.ingest_stations(stations, networks, T0 + timedelta(minutes=minutes))
+    web.db.session.commit()
+    return count
+
+def station(mac):
+    return Station.query.filter_by(mac=mac).one()
+
+def test_stations_and_edges(networks):
+    assert scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:01'),
+                           sta('00:AA:00:00:00:02', '00:11:22:00:00:01'),
+                           sta('00:AA:00:00:00:03', probed_essids=['Home'])], 0) == 3
+    first, _, probing = station('00:AA:00:00:00:01'), station('00:AA:00:00:00:02'), station('00:AA:00:00:00:03')
+    assert (first.current_network_id, first.ap_count, first.signal_strength) == \
+        (networks['00:11:22:00:00:01'], 1, -60)
+    assert (probing.current_network_id, probing.ap_count, probing.probed_essids) == (None, 0, ['Home'])
+    assert Association.query.count() == 2
+    assert web.db.session.get(Network, networks['00:11:22:00:00:01']).client_count == 2
+
+def test_repeat_sightings_do_not_add_edges(networks):
+    for minute in range(3):
+        scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:01', power=-60 - minute)], minute)
+    edge = Association.query.one()
+    assert (edge.sightings, edge.first_seen, edge.last_seen) == (3, T0, T0 + timedelta(minutes=2))
+    client = station('00:AA:00:00:00:01')
+    assert (client.ap_count, client.signal_strength, client.first_seen) == (1, -62, T0)
+    assert web.db.session.get(Network, networks['00:11:22:00:00:01']).client_count == 1
+    assert RoamEvent.query.count() == 0
+
+def test_roams_are_recorded_between_scans(networks):
+    mac = '00:AA:00:00:00:01'
+    for minute, bssid in enumerate(('00:11:22:00:00:01', '00:11:22:00:00:02', None, '00:11:22:00:00:01')):
+        scan(networks, [sta(mac, bssid)], minute)
+    client = station(mac)
+    assert (client.ap_count, client.current_network_id) == (2, networks['00:11:22:00:00:01'])
+    # Dropping off an AP is not a roam; the history is newest first
+    assert [(roam.from_network_id, roam.to_network_id) for roam in association_graph.roam_history(client.id)] == \
+        [(networks['00:11:22:00:00:01'], networks['00:11:22:00:00:02'])]
+
+    scan(networks, [sta(mac, '00:11:22:00:00:03')], 10)
+    history = association_graph.roam_history(client.id)
+    assert [(roam.to_network_id, roam.timestamp) for roam in history] == \
+        [(networks['00:11:22:00:00:03'], T0 + timedelta(minutes=10)),
+         (networks['00:11:22:00:00:02'], T0 + timedelta(minutes=1))]
+    assert len(association_graph.roam_history(client.id, limit=1)) == 1
+
+def test_ap_outside_the_scan_leaves_the_station_unassociated(networks):
+    scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:01')], 0)
+    scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:99')], 1)
+    assert station('00:AA:00:00:00:01').current_network_id is None
+    assert RoamEvent.query.count() == 0
+
+def test_graph_queries(networks):
+    office, office2, lab = (networks[bssid] for bssid in ('00:11:22:00:00:01', '00:11:22:00:00:02',
+                                                          '00:11:22:00:00:03'))
+    scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:01'), sta('00:AA:00:00:00:02', '00:11:22:00:00:01'),
+                    sta('00:AA:00:00:00:03', '00:11:22:00:00:02'), sta('00:AA:00:00:00:04', '00:11:22:00:00:01')], 0)
+    scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:02'), sta('00:AA:00:00:00:02', '00:11:22:00:00:03')], 1)
+    scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:03')], 2)
+
+    busiest = association_graph.busiest_aps()
+    assert [n.client_count for n in busiest] == [3, 2, 2] and busiest[0].id == office
+    assert [n.id for n in association_graph.busiest_aps(limit=1)] == [office]
+    assert [(s.mac, s.ap_count) for s in association_graph.roaming_stations()] == \
+        [('00:AA:00:00:00:01', 3), ('00:AA:00:00:00:02', 2)]
+    assert [s.mac for s in association_graph.roaming_stations(min_aps=3)] == ['00:AA:00:00:00:01']
+    assert len(association_graph.roaming_stations(limit=1)) == 1
+
+    assert sorted(s.mac for s in association_graph.clients_of(office)) == \
+        ['00:AA:00:00:00:01', '00:AA:00:00:00:02', '00:AA:00:00:00:04']
+    assert [s.mac for s in association_graph.clients_of(office, current_only=True)] == ['00:AA:00:00:00:04']
+    assert sorted(s.mac for s in association_graph.clients_of(lab, current_only=True)) == \
+        ['00:AA:00:00:00:01', '00:AA:00:00:00:02']
+    assert sorted(s.mac for s in association_graph.clients_of(office2)) == ['00:AA:00:00:00:01', '00:AA:00:00:00:03']
+
+def test_graph_routes(flask_app, networks):
+    scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:01')], 0)
+    scan(networks, [sta('00:AA:00:00:00:01', '00:11:22:00:00:02')], 1)
+    client = flask_app.test_client()
+    stations = client.get('/api/db/stations?min_aps=2').get_json()['stations']
+    assert [s['mac'] for s in stations] == ['00:AA:00:00:00:01']
+    roams = client.get(f"/api/db/stations/{stations[0]['id']}/roams").get_json()['roams']
+    assert [(r['from_network_id'], r['to_network_id']) for r in roams] == \
+        [(networks['00:11:22:00:00:01'], networks['00:11:22:00:00:02'])]
+    busiest = client.get('/api/db/networks/busiest?limit=1').get_json()['networks']
+    assert len(busiest) == 1 and busiest[0]['client_count'] == 1
+    clients = client.get(f"/api/db/networks/{networks['00:11:22:00:00:02']}/clients?current=true").get_json()
+    assert [s['mac'] for s in clients['clients']] == ['00:AA:00:00:00:01']
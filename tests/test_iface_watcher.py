@@ -0,0 +1,230 @@
+import collections
+import errno
+import queue
+import socket
+import struct
+import threading
+import pytest
+import iface_watcher
+import netlink
+import wireless_caps
+from iface_watcher import ADDED, CHANGED, REMOVED, IFINFOMSG, InterfaceWatcher
+
+U32 = struct.Struct('=I')
+
+class FakeEvents:
+    """Multicast side of a fake netlink socket: select()able, fed by FakeKernel"""
+
+    def __init__(self):
+        self._reader, self._writer = socket.socketpair()
+        self._queue = collections.deque()
+
+    def fileno(self):
+        return self._reader.fileno()
+
+    def push(self, messages):
+        self._queue.append(messages)
+        self._writer.send(b'x')
+
+    def receive(self):
+        self._reader.recv(1)
+        messages = self._queue.popleft()
+        if isinstance(messages, Exception):
+            raise messages
+        return messages
+
+class FakeRoute(FakeEvents):
+    def __init__(self, kernel, groups):
+        super().__init__()
+        self.kernel = kernel
+        if groups:
+            kernel.route_listeners.append(self)
+
+    def request(self, msg_type, payload, flags=0, dump=False):
+        assert msg_type == iface_watcher.RTM_GETLINK and dump
+        return [(iface_watcher.RTM_NEWLINK, self.kernel.link_body(ifindex)) for ifindex in self.kernel.links]
+
+class FakeNl80211(FakeEvents):
+    def __init__(self, kernel, family):
+        super().__init__()
+        assert family == 'nl80211'
+        self.kernel = kernel
+
+    def subscribe(self, group):
+        assert group == 'config'
+        self.kernel.nl80211_listeners.append(self)
+
+    def command(self, cmd, attrs=b'', dump=False, flags=0):
+        assert cmd == wireless_caps.NL80211_CMD_GET_INTERFACE
+        wanted = netlink.get_u32(netlink.parse_attrs(attrs), wireless_caps.NL80211_ATTR_IFINDEX)
+        # Only wireless links have an nl80211 interface
+        return [(cmd, self.kernel.interface_attrs(ifindex)) for ifindex, link in self.kernel.links.items()
+                if link['phy'] is not None and (wanted is None or ifindex == wanted)]
+
+class FakeKernel:
+    """Links and the rtnetlink / nl80211 events a kernel would send as they change"""
+
+    def __init__(self):
+        self.links = {}
+        self.route_listeners = []
+        self.nl80211_listeners = []
+
+    def link_body(self, ifindex):
+        link = self.links[ifindex]
+        return (IFINFOMSG.pack(0, 0, ifindex, iface_watcher.IFF_UP if link['up'] else 0, 0)
+                + netlink.attr_str(iface_watcher.IFLA_IFNAME, link['ifname'])
+                + netlink.attr(iface_watcher.IFLA_ADDRESS, bytes((0, 0x11, 0x22, 0x33, 0x44, ifindex))))
+
+    def interface_attrs(self, ifindex):
+        link = self.links[ifindex]
+        return {wireless_caps.NL80211_ATTR_IFINDEX: U32.pack(ifindex),
+                wireless_caps.NL80211_ATTR_IFNAME: link['ifname'].encode() + b'\0',
+                wireless_caps.NL80211_ATTR_WIPHY: U32.pack(link['phy']),
+                wireless_caps.NL80211_ATTR_IFTYPE: U32.pack(wireless_caps.IFTYPE_IDS[link['type']])}
+
+    def _send(self, route=None, nl80211=None):
+        if route is not None:
+            for sock in self.route_listeners:
+                sock.push([route])
+        if nl80211 is not None:
+            for sock in self.nl80211_listeners:
+                sock.push([nl80211])
+
+    def add(self, ifindex, ifname, phy=0, type='managed', up=True, notify=True):
+        self.links[ifindex] = {'ifname': ifname, 'phy': phy, 'type': type, 'up': up}
+        if notify:
+            self._send((iface_watcher.RTM_NEWLINK, self.link_body(ifindex)),
+                       (iface_watcher.NL80211_CMD_NEW_INTERFACE, self.interface_attrs(ifindex))
+                       if phy is not None else None)
+
+    def remove(self, ifindex):
+        body, attrs = self.link_body(ifindex), self.interface_attrs(ifindex)
+        del self.links[ifindex]
+        self._send((iface_watcher.RTM_DELLINK, body), (iface_watcher.NL80211_CMD_DEL_INTERFACE, attrs))
+
+    def rename(self, ifindex, ifname):
+        # `ip link set wlan0 name wlan9` is only announced over rtnetlink
+        self.links[ifindex]['ifname'] = ifname
+        self._send((iface_watcher.RTM_NEWLINK, self.link_body(ifindex)))
+
+    def set_type(self, ifindex, type):
+        self.links[ifindex]['type'] = type
+        self._send(nl80211=(iface_watcher.NL80211_CMD_SET_INTERFACE, self.interface_attrs(ifindex)))
+
+    def new_phy(self):
+        self._send(nl80211=(iface_watcher.NL80211_CMD_NEW_WIPHY, {}))
+
+    def drop_events(self):
+        """The event socket overflowed (ENOBUFS)"""
+        for sock in self.route_listeners:
+            sock.push(OSError(errno.ENOBUFS, 'No buffer space available'))
+
+@pytest.fixture
+def kernel(monkeypatch):
+    kernel = FakeKernel()
+    kernel.add(3, 'wlan0', notify=False)
+    kernel.add(2, 'eth0', phy=None, notify=False)
+    monkeypatch.setattr(netlink, 'available', lambda: True)
+    monkeypatch.setattr(netlink, 'NetlinkSocket', lambda protocol, groups=0: FakeRoute(kernel, groups))
+    monkeypatch.setattr(netlink, 'GenericNetlink', lambda family: FakeNl80211(kernel, family))
+    monkeypatch.setattr(iface_watcher, 'is_wireless',
+                        lambda ifname: any(link['ifname'] == ifname and link['phy'] is not None
+                                           for link in kernel.links.values()))
+    return kernel
+
+@pytest.fixture
+def watcher(kernel):
+    watcher = InterfaceWatcher()
+    events = queue.Queue()
+    watcher.subscribe(events.put)
+    watcher.start()
+    watcher.events = events
+    return watcher
+
+def next_event(watcher, kind, timeout=2):
+    """Next event of a kind; rtnetlink and nl80211 may each announce part of one change"""
+    while True:
+        event = watcher.events.get(timeout=timeout)
+        if event['type'] == kind:
+            return event
+
+def names(watcher):
+    return [(iface['ifname'], iface['type']) for iface in watcher.interfaces()]
+
+def test_initial_table(watcher):
+    assert watcher.live
+    assert watcher.interfaces() == [{'ifname': 'wlan0', 'ifindex': 3, 'up': True, 'running': False,
+                                     'mac': '00:11:22:33:44:03', 'phy': 'phy0', 'type': 'managed'}]
+    assert watcher.events.get_nowait()['type'] == ADDED
+    assert watcher.events.empty()
+
+def test_added_and_removed(watcher, kernel):
+    watcher.events.get_nowait()
+    kernel.add(7, 'wlan0mon', type='monitor')
+    event = next_event(watcher, ADDED)
+    assert (event['interface']['ifname'], event['interface']['type']) == ('wlan0mon', 'monitor')
+    assert watcher.find(type='monitor', phy='phy0')[0]['ifname'] == 'wlan0mon'
+
+    kernel.remove(7)
+    assert next_event(watcher, REMOVED)['interface']['ifname'] == 'wlan0mon'
+    assert names(watcher) == [('wlan0', 'managed')]
+    # The nl80211 DEL_INTERFACE for the same link is not announced twice
+    with pytest.raises(queue.Empty):
+        next_event(watcher, REMOVED, timeout=0.2)
+
+def test_rename_keeps_the_ifindex(watcher, kernel):
+    watcher.events.get_nowait()
+    kernel.rename(3, 'wlan9')
+    event = watcher.events.get(timeout=2)
+    assert event['type'] == CHANGED
+    assert (event['previous']['ifname'], event['interface']['ifname']) == ('wlan0', 'wlan9')
+    assert event['interface']['phy'] == 'phy0' and event['interface']['ifindex'] == 3
+    assert watcher.get('wlan0') is None and watcher.get('wlan9')['ifindex'] == 3
+
+def test_mode_change(watcher, kernel):
+    watcher.events.get_nowait()
+    kernel.set_type(3, 'monitor')
+    event = watcher.events.get(timeout=2)
+    assert (event['type'], event['previous']['type'], event['interface']['type']) == (CHANGED, 'managed', 'monitor')
+
+def test_non_wireless_links_are_ignored(watcher, kernel):
+    watcher.events.get_nowait()
+    kernel.add(9, 'eth1', phy=None)
+    kernel.rename(3, 'wlan1')
+    # Events arrive in order, so eth1 was seen and skipped before the rename
+    assert watcher.events.get(timeout=2)['interface']['ifname'] == 'wlan1'
+    assert [iface['ifname'] for iface in watcher.interfaces()] == ['wlan1']
+
+def test_waiter_wakes_on_event(watcher, kernel):
+    timer = threading.Timer(0.1, kernel.add, (7, 'wlan0mon'), {'type': 'monitor'})
+    timer.start()
+    try:
+        found = watcher.wait_for(lambda ifs: [i['ifname'] for i in ifs if i['type'] == 'monitor'], timeout=5)
+    finally:
+        timer.join()
+    assert found == ['wlan0mon']
+
+def test_waiter_times_out(watcher):
+    assert watcher.wait_for(lambda ifs: [i for i in ifs if i['type'] == 'monitor'], timeout=0.1) == []
+
+def test_dropped_events_reload_the_table(watcher, kernel):
+    watcher.events.get_nowait()
+    kernel.add(7, 'wlan0mon', type='monitor', notify=False)
+    kernel.drop_events()
+    assert next_event(watcher, ADDED)['interface']['ifname'] == 'wlan0mon'
+
+def test_new_phy_invalidates_capabilities(watcher, kernel, monkeypatch):
+    invalidated = threading.Event()
+    monkeypatch.setattr(wireless_caps.capabilities, 'invalidate', invalidated.set)
+    kernel.new_phy()
+    assert invalidated.wait(2)
+
+def test_without_netlink_the_table_is_reread(monkeypatch):
+    table = [{'ifname': 'wlan0', 'ifindex': 3, 'phy': 'phy0', 'type': 'managed'}]
+    monkeypatch.setattr(netlink, 'available', lambda: False)
+    monkeypatch.setattr(wireless_caps, 'read_interfaces', lambda: [dict(iface) for iface in table])
+    watcher = InterfaceWatcher().start()
+    assert not watcher.live
+    table[0]['type'] = 'monitor'
+    assert names(watcher) == [('wlan0', 'monitor')]
+    assert watcher.wait_for(lambda ifs: [i['ifname'] for i in ifs if i['type'] == 'monitor']) == ['wlan0']
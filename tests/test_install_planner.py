@@ -0,0 +1,53 @@
+from install_planner import (FakeBackend, InstallPlanner, Requirement, PYTHON, REQUIREMENTS,
+                             RUNTIME_REQUIREMENTS)
+from system_utils import SystemUtils
+
+REQS = (
+    Requirement('aircrack-ng'),
+    Requirement('reaver'),
+    Requirement('wireless-tools', probe='iwconfig', packages={'fake': 'wireless_tools'}),
+    Requirement('flask', kind=PYTHON),
+    Requirement('wcwidth', kind=PYTHON),
+)
+
+def test_one_transaction_per_manager():
+    system = FakeBackend(installed={'reaver'})
+    python = FakeBackend(kind=PYTHON)
+    planner = InstallPlanner(REQS, system_backend=system, python_backend=python)
+    assert planner.probe() == {'aircrack-ng': False, 'reaver': True, 'wireless-tools': False,
+                               'python-flask': False, 'python-wcwidth': False}
+
+    report = planner.apply()
+    assert system.transactions == [['aircrack-ng', 'wireless_tools']]
+    assert python.transactions == [['flask', 'wcwidth']]
+    assert report == {'installed': ['aircrack-ng', 'wireless-tools', 'python-flask', 'python-wcwidth'],
+                      'failed': [], 'unavailable': [], 'transactions': 2}
+    assert all(planner.probe().values())
+    assert planner.apply()['transactions'] == 0
+
+def test_failed_transaction_fails_its_packages():
+    system = FakeBackend(fail=True)
+    python = FakeBackend(kind=PYTHON)
+    report = InstallPlanner(REQS, system_backend=system, python_backend=python).apply()
+    assert system.transactions == [['aircrack-ng', 'reaver', 'wireless_tools']]
+    assert report['failed'] == ['aircrack-ng', 'reaver', 'wireless-tools']
+    assert report['installed'] == ['python-flask', 'python-wcwidth']
+    assert report['transactions'] == 2
+
+def test_missing_backend_is_unavailable():
+    python = FakeBackend(kind=PYTHON, installed={'flask'})
+    planner = InstallPlanner(REQS, system_backend=None, python_backend=python)
+    status = dict(planner.probe(), **{'aircrack-ng': False, 'reaver': False, 'wireless-tools': True})
+    groups, unavailable = planner.plan(status)
+    assert [(backend.name, [req.key for req in missing]) for backend, missing in groups] == \
+        [('fake', ['python-wcwidth'])]
+    report = planner.apply((groups, unavailable))
+    assert report['unavailable'] == ['aircrack-ng', 'reaver']
+    assert report['installed'] == ['python-wcwidth']
+    assert python.transactions == [['wcwidth']]
+
+def test_status_keys_are_the_runtime_requirements():
+    keys = set(SystemUtils().check_dependencies())
+    assert keys == {'aircrack-ng', 'reaver', 'pixiewps', 'iw', 'wireless-tools', 'python-flask', 'python-wcwidth'}
+    assert {req.key for req in RUNTIME_REQUIREMENTS} == keys
+    assert {req.key for req in REQUIREMENTS} - keys == {'python3-pip'}
@@ -0,0 +1,154 @@
+import errno
+import os
+import struct
+from datetime import datetime
+import pytest
+import fakeradio
+import managed_scan
+import netlink
+
+class FakeSocket:
+    def __init__(self, family):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+@pytest.fixture
+def iw_scans(monkeypatch):
+    scans = []
+    monkeypatch.setattr(netlink, 'available', lambda: True)
+    monkeypatch.setattr(managed_scan, 'scan_iw', lambda interface: scans.append(interface) or [])
+    return scans
+
+@pytest.mark.parametrize('error', [
+    netlink.NetlinkError(errno.ENOENT, 'generic netlink family nl80211 not found'),
+    PermissionError(errno.EPERM, 'Operation not permitted'),
+    OSError(errno.EAFNOSUPPORT, 'Address family not supported by protocol'),
+])
+def test_falls_back_to_iw_when_nl80211_cannot_be_opened(monkeypatch, iw_scans, error):
+    def open_socket(family):
+        raise error
+    monkeypatch.setattr(netlink, 'GenericNetlink', open_socket)
+    assert managed_scan.scan('wlan0') == []
+    assert iw_scans == ['wlan0']
+
+def test_second_socket_failure_closes_the_first(monkeypatch, iw_scans):
+    opened = []
+
+    def open_socket(family):
+        if opened:
+            raise PermissionError(errno.EPERM, 'Operation not permitted')
+        opened.append(FakeSocket(family))
+        return opened[-1]
+    monkeypatch.setattr(netlink, 'GenericNetlink', open_socket)
+    managed_scan.scan('wlan0')
+    assert iw_scans == ['wlan0']
+    assert opened[0].closed
+
+def test_missing_interface_is_not_retried_with_iw(monkeypatch, iw_scans):
+    sockets = []
+    monkeypatch.setattr(netlink, 'GenericNetlink', lambda family: sockets.append(FakeSocket(family)) or sockets[-1])
+    with pytest.raises(OSError):
+        managed_scan.scan('no-such-interface0')
+    assert iw_scans == []
+    assert all(sock.closed for sock in sockets) and len(sockets) == 2
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+NOW = 1700000000
+
+def local_time(offset):
+    return datetime.fromtimestamp(NOW + offset).strftime('%Y-%m-%d %H:%M:%S')
+
+@pytest.fixture
+def iw_records():
+    with open(os.path.join(FIXTURES, 'iw_scan.txt')) as f:
+        return {record.bssid: record for record in managed_scan.parse_iw_scan(f.read(), now=NOW)}
+
+def test_iw_scan_rsn_and_wps(iw_records):
+    cafe = iw_records['00:11:22:33:44:55']
+    assert (cafe.essid, cafe.id_length, cafe.channel, cafe.power) == ('Cafe', 4, 6, -41)
+    assert (cafe.privacy, cafe.cipher, cafe.authentication) == ('WPA3 WPA2', 'CCMP', 'PSK SAE')
+    # The Model line wins over the Device name that follows it
+    assert (cafe.wps, cafe.wps_locked, cafe.manufacturer, cafe.model) == (True, True, 'Acme', 'Router')
+    assert cafe.first_seen == cafe.last_seen == local_time(-0.12)
+
+def test_iw_scan_hidden_ssids(iw_records):
+    zero_filled, empty = iw_records['00:11:22:33:44:66'], iw_records['00:11:22:33:44:77']
+    assert (zero_filled.essid, zero_filled.id_length) == ('', 6)
+    assert (empty.essid, empty.id_length) == ('', 0)
+
+def test_iw_scan_wpa_and_enterprise(iw_records):
+    corp = iw_records['00:11:22:33:44:66']
+    assert (corp.channel, corp.privacy, corp.cipher, corp.authentication) == (1, 'WPA2 WPA', 'CCMP TKIP', 'MGT')
+    assert (corp.wps, corp.wps_locked, corp.manufacturer) == (False, False, None)
+
+def test_iw_scan_wps_without_lock_state(iw_records):
+    lobby = iw_records['00:11:22:33:44:77']
+    # 5 GHz without a DS Parameter set: the channel comes from the frequency
+    assert (lobby.channel, lobby.privacy) == (36, 'OPN')
+    assert (lobby.wps, lobby.wps_locked, lobby.model) == (True, False, 'Lobby AP')
+
+def test_iw_scan_escaped_ssid_bytes(iw_records):
+    guest = iw_records['00:11:22:33:44:88']
+    assert (guest.essid, guest.id_length, guest.channel) == ('Gäste\x01', 7, 149)
+
+def test_iw_scan_ignores_text_before_the_first_bss():
+    assert managed_scan.parse_iw_scan('command failed: Device or resource busy (-16)\n') == []
+
+def information_elements(ap):
+    """Tagged parameters of fakeradio's beacon for ap: after radiotap, the 802.11 header and fixed fields"""
+    frame = fakeradio.beacon_frame(ap)
+    return frame[struct.unpack_from('<H', frame, 2)[0] + 24 + 12:]
+
+def bss_reply(bssid, elements=b'', beacon_elements=None, frequency=2437, signal=-4000, capability=0x0411,
+              seen_ms_ago=250):
+    attrs = [netlink.attr(managed_scan.NL80211_BSS_BSSID, bssid.to_bytes(6, 'big')),
+             netlink.attr_u32(managed_scan.NL80211_BSS_FREQUENCY, frequency),
+             netlink.attr(managed_scan.NL80211_BSS_CAPABILITY, struct.pack('=H', capability)),
+             netlink.attr(managed_scan.NL80211_BSS_SIGNAL_MBM, struct.pack('=i', signal)),
+             netlink.attr_u32(managed_scan.NL80211_BSS_SEEN_MS_AGO, seen_ms_ago)]
+    if elements:
+        attrs.append(netlink.attr(managed_scan.NL80211_BSS_INFORMATION_ELEMENTS, elements))
+    if beacon_elements is not None:
+        attrs.append(netlink.attr(managed_scan.NL80211_BSS_BEACON_IES, beacon_elements))
+    return {managed_scan.NL80211_ATTR_BSS: b''.join(attrs)}
+
+CAFE = {'bssid': 0x001122334455, 'essid': 'Cafe', 'channel': 6, 'power': -40, 'privacy': 'WPA3 WPA2',
+        'cipher': 'CCMP', 'auth': 'PSK SAE', 'wps': ('Acme', 'Router'), 'wps_locked': True}
+CORP = {'bssid': 0x001122334466, 'essid': '\x00' * 6, 'channel': 1, 'power': -67, 'privacy': 'WPA2 WPA',
+        'cipher': 'CCMP TKIP', 'auth': 'MGT', 'wps': None, 'wps_locked': False}
+
+def test_nl80211_rsn_and_wps():
+    record = managed_scan.parse_nl80211_bss(bss_reply(CAFE['bssid'], information_elements(CAFE)), now=NOW)
+    assert (record.bssid, record.essid, record.id_length, record.channel, record.power) == \
+        ('00:11:22:33:44:55', 'Cafe', 4, 6, -40)
+    assert (record.privacy, record.cipher, record.authentication) == ('WPA3 WPA2', 'CCMP', 'PSK SAE')
+    assert (record.wps, record.wps_locked, record.manufacturer, record.model) == (True, True, 'Acme', 'Router')
+    assert record.first_seen == local_time(-0.25)
+
+def test_nl80211_hidden_ssid_falls_back_to_beacon_ies():
+    # No probe response: only the beacon's zero-filled SSID is known
+    reply = bss_reply(CORP['bssid'], beacon_elements=information_elements(CORP), frequency=2412, signal=-6700)
+    record = managed_scan.parse_nl80211_bss(reply, now=NOW)
+    assert (record.essid, record.id_length, record.channel, record.power) == ('', 6, 1, -67)
+    assert (record.privacy, record.cipher, record.authentication) == ('WPA2 WPA', 'CCMP TKIP', 'MGT')
+    assert (record.wps, record.wps_locked) == (False, False)
+
+def test_nl80211_without_bss():
+    assert managed_scan.parse_nl80211_bss({}) is None
+    assert managed_scan.parse_nl80211_bss({managed_scan.NL80211_ATTR_BSS: b''}) is None
+
+def test_parsers_agree(iw_records):
+    reply = bss_reply(CAFE['bssid'], information_elements(CAFE), signal=-4100, seen_ms_ago=120)
+    nl_record = managed_scan.parse_nl80211_bss(reply, now=NOW).to_dict()
+    iw_record = iw_records['00:11:22:33:44:55'].to_dict()
+    # iw doesn't print the vendor OUIs it saw
+    nl_record.pop('vendor_ouis'), iw_record.pop('vendor_ouis')
+    assert nl_record == iw_record
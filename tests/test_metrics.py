@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+
+import pytest
+
+import metrics
+
+def parse(text):
+    """Sample lines as {'name{labels}': value}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+def make_registry():
+    registry = metrics.Registry()
+    latency = registry.register(metrics.Histogram('latency_seconds', 'Latency', buckets=(0.1, 1, 10)))
+    requests = registry.register(metrics.Counter('requests', 'Requests', labelnames=('route',)))
+    running = registry.register(metrics.Gauge('running', 'Running jobs'))
+    return registry, latency, requests, running
+
+def test_histogram_le_buckets_are_inclusive_and_cumulative():
+    registry, latency, _, _ = make_registry()
+    for value in (0.05, 0.1, 0.5, 1, 10, 11):
+        latency.observe(value)
+    samples = parse(registry.render())
+    assert samples['latency_seconds_bucket{le="0.1"}'] == 2
+    assert samples['latency_seconds_bucket{le="1"}'] == 4
+    assert samples['latency_seconds_bucket{le="10"}'] == 5
+    assert samples['latency_seconds_bucket{le="+Inf"}'] == 6
+    assert samples['latency_seconds_count'] == 6
+    assert samples['latency_seconds_sum'] == pytest.approx(22.65)
+
+def test_labelled_histogram_timer():
+    histogram = metrics.Histogram('tool_seconds', 'Tool time', labelnames=('tool',), buckets=(1,))
+    with histogram.time('iw'):
+        pass
+    samples = parse('\n'.join(histogram.render()))
+    assert samples['tool_seconds_bucket{tool="iw",le="1"}'] == 1
+    assert samples['tool_seconds_count{tool="iw"}'] == 1
+
+def test_counter_and_gauge_render():
+    registry, _, requests, running = make_registry()
+    requests.labels('/api/status').inc()
+    requests.labels('/api/status').inc(2)
+    requests.labels('say "hi"\\').inc()
+    running.inc()
+    running.inc()
+    running.dec()
+    samples = parse(registry.render())
+    assert samples['requests_total{route="/api/status"}'] == 3
+    assert samples['requests_total{route="say \\"hi\\"\\\\"}'] == 1
+    assert samples['running'] == 1
+    assert '# TYPE latency_seconds histogram' in registry.render()
+
+def test_render_merged_sums_snapshots():
+    registry, latency, requests, running = make_registry()
+    latency.observe(0.5)
+    requests.labels('/').inc()
+    running.set(2)
+    snapshot = registry.snapshot()
+    samples = parse(registry.render_merged([snapshot, snapshot]))
+    assert samples['latency_seconds_bucket{le="1"}'] == 2
+    assert samples['latency_seconds_sum'] == 1.0
+    assert samples['requests_total{route="/"}'] == 2
+    assert samples['running'] == 4
+    # The live registry is left alone
+    assert parse(registry.render())['running'] == 2
+
+def _child_worker(directory):
+    registry, latency, requests, running = make_registry()
+    latency.observe(5)
+    requests.labels('/').inc(3)
+    running.set(7)
+    metrics.MultiProcessCollector(registry, directory).write()
+
+def test_multiprocess_collector_sums_workers(tmp_path):
+    child = multiprocessing.get_context('fork').Process(target=_child_worker, args=(str(tmp_path),))
+    child.start()
+    child.join()
+    assert child.exitcode == 0
+
+    registry, latency, requests, running = make_registry()
+    latency.observe(0.05)
+    requests.labels('/').inc()
+    running.set(1)
+    collector = metrics.MultiProcessCollector(registry, str(tmp_path))
+    samples = parse(collector.render())
+    assert samples['latency_seconds_bucket{le="0.1"}'] == 1
+    assert samples['latency_seconds_bucket{le="10"}'] == 2
+    assert samples['requests_total{route="/"}'] == 4
+    # The child has exited: its counters still count, its gauge does not
+    assert samples['running'] == 1
+    assert sorted(os.listdir(tmp_path)) == sorted([f'metrics-{child.pid}.json', f'metrics-{os.getpid()}.json'])
@@ -0,0 +1,118 @@
+import subprocess
+
+import pytest
+
+import monitor_vif
+from monitor_vif import add_monitor_vif, delete_monitor_vif, vif_name, NL80211_CMD_NEW_INTERFACE
+
+class FakeRun:
+    """Stands in for timed_run; commands listed in `fail` exit non-zero"""
+
+    def __init__(self, fail=()):
+        self.calls = []
+        self.fail = fail
+
+    def __call__(self, cmd, check=False, **kwargs):
+        self.calls.append(cmd)
+        returncode = 1 if cmd[0] in self.fail else 0
+        if check and returncode:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        return subprocess.CompletedProcess(cmd, returncode, stdout='', stderr='failed' if returncode else '')
+
+class FakeNl80211:
+    def __init__(self, replies=()):
+        self.replies = list(replies)
+        self.commands = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def command(self, cmd, payload):
+        self.commands.append(cmd)
+        return self.replies
+
+class FakePhy:
+    index = 2
+
+@pytest.fixture
+def iw(monkeypatch):
+    monkeypatch.setattr(monitor_vif, '_nl80211', lambda: None)
+    run = FakeRun()
+    monkeypatch.setattr(monitor_vif, 'timed_run', run)
+    return run
+
+def test_vif_name_fits_ifnamsiz():
+    assert vif_name('wlan0') == 'wlan0mon'
+    assert vif_name('wlx00c0ca123456') == 'wlx00c0ca123mon'
+    assert len(vif_name('wlx00c0ca123456')) < monitor_vif.IFNAMSIZ
+
+def test_iw_add_uses_the_phy_index(iw):
+    iface = add_monitor_vif('phy1', 'wlan0mon')
+    assert iw.calls == [['iw', 'phy#1', 'interface', 'add', 'wlan0mon', 'type', 'monitor'],
+                        ['ip', 'link', 'set', 'wlan0mon', 'up']]
+    assert iface == {'ifname': 'wlan0mon', 'ifindex': None, 'phy': 'phy1', 'type': 'monitor'}
+
+def test_iw_add_by_name_for_renamed_phys(iw):
+    add_monitor_vif('usb-radio', 'wlan0mon')
+    assert iw.calls[0][:3] == ['iw', 'phy', 'usb-radio']
+
+def test_iw_add_failure_creates_nothing(iw):
+    iw.fail = ('iw',)
+    with pytest.raises(Exception, match='could not add wlan0mon'):
+        add_monitor_vif('phy1', 'wlan0mon')
+    assert len(iw.calls) == 1
+
+def test_vif_is_removed_when_it_cannot_be_brought_up(iw):
+    iw.fail = ('ip',)
+    with pytest.raises(subprocess.CalledProcessError):
+        add_monitor_vif('phy1', 'wlan0mon')
+    assert iw.calls[-1][:4] == ['iw', 'dev', 'wlan0mon', 'del']
+
+def test_nl80211_vif_is_removed_when_set_link_up_fails(monkeypatch):
+    nl = FakeNl80211()
+    deleted = []
+    monkeypatch.setattr(monitor_vif, '_nl80211', lambda: nl)
+    monkeypatch.setattr(monitor_vif.capabilities, 'phy', lambda phy: FakePhy())
+    monkeypatch.setattr(monitor_vif.socket, 'if_nametoindex', lambda name: 7)
+    monkeypatch.setattr(monitor_vif, 'delete_monitor_vif', deleted.append)
+
+    def set_link_up(ifindex, up=True):
+        raise OSError('Operation not permitted')
+
+    monkeypatch.setattr(monitor_vif, 'set_link_up', set_link_up)
+    with pytest.raises(OSError, match='not permitted'):
+        add_monitor_vif('phy2', 'wlan0mon')
+    assert nl.commands == [NL80211_CMD_NEW_INTERFACE]
+    assert deleted == ['wlan0mon']
+
+def test_cleanup_failure_keeps_the_original_error(iw, monkeypatch, caplog):
+    iw.fail = ('ip',)
+
+    def run(cmd, **kwargs):
+        if cmd[:2] == ['iw', 'dev']:
+            raise subprocess.CalledProcessError(1, cmd)
+        return iw(cmd, **kwargs)
+
+    monkeypatch.setattr(monitor_vif, 'timed_run', run)
+    with pytest.raises(subprocess.CalledProcessError) as error:
+        add_monitor_vif('phy1', 'wlan0mon')
+    assert error.value.cmd[0] == 'ip'
+    assert 'Could not remove wlan0mon' in caplog.text
+
+def test_nl80211_add_reads_the_new_interface(monkeypatch):
+    nl = FakeNl80211(replies=[(None, b'attrs')])
+    brought_up = []
+    monkeypatch.setattr(monitor_vif, '_nl80211', lambda: nl)
+    monkeypatch.setattr(monitor_vif.capabilities, 'phy', lambda phy: FakePhy())
+    monkeypatch.setattr(monitor_vif, 'parse_nl80211_interface',
+                        lambda attrs: {'ifname': 'wlan0mon', 'ifindex': 9, 'phy': 'phy2', 'type': 'monitor'})
+    monkeypatch.setattr(monitor_vif, 'set_link_up', lambda ifindex, up=True: brought_up.append(ifindex))
+    assert add_monitor_vif('phy2', 'wlan0mon')['ifindex'] == 9
+    assert brought_up == [9]
+
+def test_delete_with_iw(iw):
+    delete_monitor_vif('wlan0mon')
+    assert iw.calls == [['iw', 'dev', 'wlan0mon', 'del']]
@@ -0,0 +1,93 @@
+import io
+import pytest
+import oui_db
+from oui_db import LOCALLY_ADMINISTERED, OUIIndex, build_index, is_locally_administered, lookup_vendor, read_registry
+
+MA_L = """Registry,Assignment,Organization Name,Organization Address
+MA-L,001A2B,Ayecom Technology Co.,Taipei TW
+MA-L,70B3D5,IEEE Registration Authority,Piscataway NJ US
+MA-L,F4F5D8,Google Inc.,Mountain View CA US
+MA-L,3C5AB4,Google Inc.,Mountain View CA US
+MA-L,,Missing Assignment,
+MA-L,ZZZZZZ,Not Hex,
+MA-L,000000,,
+"""
+MA_M = """Registry,Assignment,Organization Name,Organization Address
+MA-M,70B3D51,Sensor Works,Oslo NO
+"""
+MA_S = """Registry,Assignment,Organization Name,Organization Address
+MA-S,70B3D51A4,Tiny Radios,Lyon FR
+"""
+
+@pytest.fixture
+def index(tmp_path):
+    entries = [entry for text in (MA_L, MA_M, MA_S) for entry in read_registry(io.StringIO(text))]
+    path = str(tmp_path / 'oui.idx')
+    assert build_index(entries, path) == 6
+    index = OUIIndex(path)
+    yield index
+    index.close()
+
+def test_read_registry_prefix_lengths():
+    entries = list(read_registry(io.StringIO(MA_L + MA_M.split('\n', 1)[1] + MA_S.split('\n', 1)[1])))
+    assert (24, 0x001A2B, 'Ayecom Technology Co.') in entries
+    assert (28, 0x70B3D51, 'Sensor Works') in entries
+    assert (36, 0x70B3D51A4, 'Tiny Radios') in entries
+    # Rows without an assignment, with a non-hex one, or without a name are skipped
+    assert len(entries) == 6
+
+def test_lookup_by_oui(index):
+    assert len(index) == 6
+    assert index.lookup('00:1A:2B:00:00:01') == 'Ayecom Technology Co.'
+    assert index.lookup('f4-f5-d8-12-34-56') == 'Google Inc.'
+    assert index.lookup('3c5a.b412.3456') == 'Google Inc.'
+    assert index.lookup(0x001A2BFFFFFF) == 'Ayecom Technology Co.'
+    assert index.lookup('00:1A:2C:00:00:01') is None
+
+def test_longest_prefix_wins(index):
+    assert index.lookup('70:B3:D5:1A:40:01') == 'Tiny Radios'
+    assert index.lookup('70:B3:D5:1A:50:01') == 'Sensor Works'
+    # The rest of the subdivided block belongs to the registration authority itself
+    assert index.lookup('70:B3:D5:20:00:01') == 'IEEE Registration Authority'
+
+def test_vendor_names_are_stored_once(tmp_path):
+    path = str(tmp_path / 'oui.idx')
+    build_index([(24, 0xF4F5D8, 'Google Inc.'), (24, 0x3C5AB4, 'Google Inc.')], path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    assert data.count(b'Google Inc.') == 1
+
+def test_locally_administered_bit(index):
+    assert is_locally_administered('02:00:00:00:00:01')
+    assert is_locally_administered('DA:A1:19:00:00:01')  # randomized client MAC
+    assert not is_locally_administered('00:1A:2B:00:00:01')
+    assert not is_locally_administered('F4:F5:D8:00:00:01')
+    # 0x021A2B would be Ayecom's OUI with the local bit set; it is not theirs
+    assert index.lookup('02:1A:2B:00:00:01') == LOCALLY_ADMINISTERED
+
+def test_not_an_index(tmp_path):
+    path = tmp_path / 'oui.idx'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        OUIIndex(str(path))
+
+def test_lookup_vendor_uses_the_shared_index(index, monkeypatch):
+    monkeypatch.setattr(oui_db, '_index', index)
+    assert lookup_vendor('00:1A:2B:00:00:01') == 'Ayecom Technology Co.'
+    assert lookup_vendor('06:00:00:00:00:01') == LOCALLY_ADMINISTERED
+    assert lookup_vendor('not a mac') is None
+    assert lookup_vendor('') is None and lookup_vendor(None) is None
+
+def test_lookup_vendor_without_an_index(monkeypatch):
+    attempts = []
+
+    def missing(*args):
+        attempts.append(args)
+        raise FileNotFoundError('oui.idx')
+    monkeypatch.setattr(oui_db, '_index', None)
+    monkeypatch.setattr(oui_db, '_index_missing', False)
+    monkeypatch.setattr(oui_db, 'OUIIndex', missing)
+    assert lookup_vendor('00:1A:2B:00:00:01') is None
+    # Random MACs are still recognised without the registry
+    assert lookup_vendor('06:00:00:00:00:01') == LOCALLY_ADMINISTERED
+    assert len(attempts) == 1
@@ -0,0 +1,62 @@
+import os
+import struct
+from datetime import datetime
+import pytest
+import fakeradio
+from pcap_reader import CaptureFormatError, iter_frames, parse_radiotap, read_capture
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+START = 1700000000  # first frame in the fixtures, see fixtures/make_captures.py
+
+def local_time(offset):
+    return datetime.fromtimestamp(START + offset).strftime('%Y-%m-%d %H:%M:%S')
+
+@pytest.fixture(params=['capture.pcap', 'capture.pcapng'])
+def capture(request):
+    return os.path.join(FIXTURES, request.param)
+
+def test_access_points(capture):
+    aps, _ = read_capture(capture)
+    cafe, open_ap = sorted(aps, key=lambda ap: ap.bssid)
+    assert cafe.to_dict() == {
+        'bssid': '00:11:22:33:44:55', 'essid': 'Cafe', 'channel': 6, 'power': -40, 'speed': None,
+        'privacy': 'WPA2', 'encryption': 'WPA2', 'cipher': 'CCMP', 'authentication': 'PSK',
+        'beacons': 2, 'ivs': 0, 'lan_ip': '0.0.0.0', 'id_length': 4,
+        'first_seen': local_time(0), 'last_seen': local_time(5),
+        'wps': True, 'wps_locked': False, 'manufacturer': 'Acme', 'model': 'Router 1',
+        'vendor_ouis': ('00:50:F2',)}
+    assert (open_ap.essid, open_ap.channel, open_ap.power, open_ap.privacy, open_ap.wps) == \
+        ('Open', 36, -70, 'OPN', False)
+
+def test_stations_skip_truncated_radiotap(capture):
+    _, stations = read_capture(capture)
+    by_mac = {station.mac: station for station in stations}
+    # 00:AA:BB:CC:DD:03 only sent a frame whose radiotap header overruns the capture
+    assert sorted(by_mac) == ['00:AA:BB:CC:DD:01', '00:AA:BB:CC:DD:02']
+    associated, probing = by_mac['00:AA:BB:CC:DD:01'], by_mac['00:AA:BB:CC:DD:02']
+    assert (associated.bssid, associated.power, associated.packets) == ('00:11:22:33:44:55', -50, 2)
+    assert (associated.first_seen, associated.last_seen) == (local_time(1), local_time(4))
+    assert (probing.bssid_int, probing.probed_essids, probing.packets) == (None, ('Home',), 1)
+
+def test_pcapng_skips_overrunning_packet_block():
+    with open(os.path.join(FIXTURES, 'capture.pcapng'), 'rb') as f:
+        buf = f.read()
+    frames = list(iter_frames(buf))
+    assert len(frames) == 8
+    assert all(pos + length <= len(buf) for _, _, pos, length in frames)
+
+def test_parse_radiotap_bounds():
+    frame = fakeradio.data_frame({'mac': 1, 'bssid': 2, 'power': -61}, 11, b'')
+    assert parse_radiotap(frame, 0, len(frame)) == (15, 2462, -61, False)
+    assert parse_radiotap(frame, 0, 14) is None
+    short = bytearray(frame)
+    short[2:4] = struct.pack('<H', 4)
+    assert parse_radiotap(short, 0, len(short)) is None
+
+def test_not_a_capture(tmp_path):
+    path = tmp_path / 'notes.pcap'
+    path.write_bytes(b'not a capture file')
+    with pytest.raises(CaptureFormatError):
+        read_capture(str(path))
+    path.write_bytes(b'')
+    assert read_capture(str(path)) == ([], [])
@@ -0,0 +1,59 @@
+import json
+from results_log import ResultsLog
+
+def seqs(log):
+    return [entry.seq for entry in log]
+
+def test_wraparound_keeps_the_newest():
+    log = ResultsLog(capacity=3)
+    returned = [log.append(f'line {i}', timestamp=i) for i in range(1, 6)]
+    assert seqs(log) == [3, 4, 5] and len(log) == 3
+    assert [entry.text for entry in log] == ['line 3', 'line 4', 'line 5']
+    # Each append past capacity hands back the entry it pushed out
+    assert [evicted.seq if evicted else None for _, evicted in returned] == [None, None, None, 1, 2]
+    assert log.evicted == 2
+
+def test_iteration_is_a_snapshot():
+    log = ResultsLog(capacity=2)
+    log.append('a')
+    entries = iter(log)
+    log.append('b')
+    log.append('c')
+    assert [entry.text for entry in entries] == ['a']
+
+def test_sequence_continues_after_clear():
+    log = ResultsLog(capacity=2)
+    log.append('a')
+    log.append('b')
+    log.clear()
+    assert len(log) == 0
+    entry, evicted = log.append('c')
+    assert (entry.seq, evicted) == (3, None)
+
+def test_evicted_entries_are_spilled(tmp_path):
+    path = str(tmp_path / 'results.jsonl')
+    log = ResultsLog(capacity=2, spill_path=path)
+    for i in range(1, 6):
+        log.append(f'line {i}', timestamp=i)
+    log.close()
+    with open(path) as f:
+        assert [json.loads(line) for line in f] == [{'seq': i, 'timestamp': i, 'text': f'line {i}'} for i in (1, 2, 3)]
+    assert seqs(log) == [4, 5]
+
+def test_spill_file_is_rotated(tmp_path):
+    path = tmp_path / 'results.jsonl'
+    line = len(json.dumps({'seq': 1, 'timestamp': 1, 'text': 'x' * 50})) + 1
+    log = ResultsLog(capacity=1, spill_path=str(path), max_spill_bytes=line * 3)
+    for i in range(1, 6):
+        log.append('x' * 50, timestamp=1)
+    log.close()
+    # Entries 1-3 filled the file and were rotated out; 4 started a new one
+    rotated = [json.loads(entry)['seq'] for entry in (tmp_path / 'results.jsonl.1').read_text().splitlines()]
+    assert rotated == [1, 2, 3]
+    assert [json.loads(entry)['seq'] for entry in path.read_text().splitlines()] == [4]
+
+def test_spill_errors_do_not_lose_the_append(tmp_path):
+    log = ResultsLog(capacity=1, spill_path=str(tmp_path / 'missing' / 'results.jsonl'))
+    log.append('a')
+    entry, evicted = log.append('b')
+    assert (entry.text, evicted.text, log.evicted) == ('b', 'a', 1)
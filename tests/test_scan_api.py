@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+import app as web
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(web, '_schema_checked', False)
+    flask_app = web.create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'wifi.db'}",
+                                'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    return flask_app.test_client()
+
+@pytest.mark.parametrize('backend', ['nl80211', '', ['managed']])
+def test_unknown_scan_backend_is_a_bad_request(client, backend):
+    response = client.post('/api/scan', json={'backend': backend})
+    assert response.status_code == 400
+    body = response.get_json()
+    assert body['success'] is False
+    assert 'auto, airodump, managed' in body['error']
@@ -0,0 +1,67 @@
+import sqlite3
+
+import fakeradio
+from airodump_parser import parse_airodump_csv
+from scan_cache import ScanCache
+from scan_diff import ScanDiff
+
+def ap(**fields):
+    record = {'bssid': '00:11:22:33:44:55', 'essid': 'Office', 'channel': 6, 'privacy': 'WPA2', 'power': -50}
+    record.update(fields)
+    return record
+
+def stored(cache, bssid='00:11:22:33:44:55'):
+    return cache._conn.execute('SELECT ssid, channel, encryption, signal_strength, wps_enabled, manufacturer, '
+                               'last_seen FROM networks WHERE bssid = ?', (bssid,)).fetchone()
+
+def test_rescan_refreshes_ssid_channel_and_encryption(tmp_path):
+    cache = ScanCache(str(tmp_path / 'cache.db'))
+    cache.record_scan([ap(wps=True, manufacturer='Acme')], now=1000)
+    cache.record_scan([ap(essid='Office-5G', channel=36, privacy='WPA3', power=-40)], now=1010)
+    # WPS and manufacturer were not reported the second time, so they keep their stored values
+    assert stored(cache) == ('Office-5G', 36, 'WPA3', -40, 1, 'Acme', 1010)
+    assert cache.history('00:11:22:33:44:55') == [(1010, -40), (1000, -50)]
+    cache.close()
+
+def test_last_survey_returns_the_full_records(tmp_path):
+    cache = ScanCache(str(tmp_path / 'cache.db'))
+    record = ap(cipher='CCMP', authentication='PSK', probes=('a', 'b'))
+    cache.record_scan([record], now=1000)
+    assert cache.last_survey() == [dict(record, probes=['a', 'b'])]
+    cache.close()
+
+def test_cached_survey_diffs_cleanly_against_the_next_scan(tmp_path):
+    path = str(tmp_path / 'survey-01.csv')
+    fakeradio.Survey(aps=50, stations=0, seed=1).write_csv(path)
+    networks, _ = parse_airodump_csv(path)
+    cache = ScanCache(str(tmp_path / 'cache.db'))
+    cache.record_scan(networks, now=1000)
+
+    diff = ScanDiff(rssi_threshold=1)
+    diff.update(cache.last_survey(), now=1001)
+    assert diff.update(networks, now=1002) == []
+    cache.close()
+
+def test_last_survey_window(tmp_path):
+    cache = ScanCache(str(tmp_path / 'cache.db'))
+    cache.record_scan([ap()], now=1000)
+    cache.record_scan([ap(bssid='00:11:22:33:44:66', power=-30)], now=2000)
+    assert [n['bssid'] for n in cache.last_survey()] == ['00:11:22:33:44:66']
+    assert [n['bssid'] for n in cache.last_survey(window=1000)] == ['00:11:22:33:44:66', '00:11:22:33:44:55']
+    cache.close()
+
+def test_cache_without_record_column_is_upgraded(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    with sqlite3.connect(path) as conn:
+        conn.execute('CREATE TABLE networks (id INTEGER PRIMARY KEY, bssid TEXT UNIQUE NOT NULL, ssid TEXT, '
+                     'channel INTEGER, encryption TEXT, signal_strength INTEGER, wps_enabled INTEGER, '
+                     'wps_locked INTEGER, manufacturer TEXT, first_seen REAL NOT NULL, last_seen REAL NOT NULL)')
+        conn.execute("INSERT INTO networks (bssid, ssid, channel, encryption, signal_strength, first_seen, last_seen) "
+                     "VALUES ('00:11:22:33:44:55', 'Office', 6, 'WPA2', -50, 1000, 1000)")
+    conn.close()
+    cache = ScanCache(path)
+    [network] = cache.last_survey()
+    assert (network['essid'], network['privacy'], network['power']) == ('Office', 'WPA2', -50)
+    cache.record_scan([ap(cipher='CCMP')], now=1010)
+    assert cache.last_survey()[0]['cipher'] == 'CCMP'
+    cache.close()
@@ -0,0 +1,84 @@
+import pytest
+from ap_records import APRecord
+from scan_diff import APPEARED, CHANGED, DISAPPEARED, RSSI, ScanDiff
+
+def ap(bssid, essid='Office', channel=6, privacy='WPA2', power=-50):
+    return {'bssid': bssid, 'essid': essid, 'channel': channel, 'privacy': privacy, 'cipher': 'CCMP',
+            'authentication': 'PSK', 'power': power}
+
+def kinds(events):
+    return [(event.kind, event.bssid) for event in events]
+
+@pytest.fixture
+def diff():
+    return ScanDiff(absence_window=60, rssi_threshold=10)
+
+def test_appeared_once(diff):
+    assert kinds(diff.update([ap('00:11:22:33:44:55'), ap('00:11:22:33:44:66')], now=0)) == \
+        [(APPEARED, '00:11:22:33:44:55'), (APPEARED, '00:11:22:33:44:66')]
+    assert diff.update([ap('00:11:22:33:44:55'), ap('00:11:22:33:44:66')], now=10) == []
+    assert len(diff) == 2 and '00:11:22:33:44:55' in diff and 0x001122334455 in diff
+
+def test_changed_reports_the_previous_values(diff):
+    diff.update([ap('00:11:22:33:44:55')], now=0)
+    [event] = diff.update([ap('00:11:22:33:44:55', channel=11, privacy='OPN')], now=10)
+    assert (event.kind, event.previous) == (CHANGED, {'channel': 6, 'privacy': 'WPA2'})
+    assert event.to_dict()['network']['channel'] == 11
+    # The new configuration is the baseline from now on
+    assert diff.update([ap('00:11:22:33:44:55', channel=11, privacy='OPN')], now=20) == []
+
+def test_rssi_threshold_is_from_the_last_reported_signal(diff):
+    diff.update([ap('00:11:22:33:44:55', power=-50)], now=0)
+    assert diff.update([ap('00:11:22:33:44:55', power=-55)], now=1) == []
+    assert diff.update([ap('00:11:22:33:44:55', power=-59)], now=2) == []
+    [event] = diff.update([ap('00:11:22:33:44:55', power=-60)], now=3)
+    assert (event.kind, event.previous) == (RSSI, {'power': -50})
+    assert diff.update([ap('00:11:22:33:44:55', power=-65)], now=4) == []
+
+def test_disappeared_after_the_absence_window(diff):
+    diff.update([ap('00:11:22:33:44:55'), ap('00:11:22:33:44:66')], now=0)
+    diff.update([ap('00:11:22:33:44:66')], now=30)
+    # 00:..:55 was last seen at 0: still inside the window at 60, gone after it
+    assert diff.update([ap('00:11:22:33:44:66')], now=60) == []
+    [event] = diff.update([ap('00:11:22:33:44:66')], now=61)
+    assert (event.kind, event.bssid, event.record) == (DISAPPEARED, '00:11:22:33:44:55', None)
+    assert event.previous == {'last_seen': 0, 'power': -50}
+    assert '00:11:22:33:44:55' not in diff
+    # Coming back is a new appearance
+    assert kinds(diff.update([ap('00:11:22:33:44:55')], now=62)) == [(APPEARED, '00:11:22:33:44:55')]
+
+def test_expire_only_touches_expired_aps():
+    diff = ScanDiff(absence_window=10)
+    diff.update([ap(f'00:11:22:33:44:{i:02X}') for i in range(5)], now=0)
+    diff.update([ap('00:11:22:33:44:01'), ap('00:11:22:33:44:03')], now=5)
+    assert kinds(diff.expire(now=11)) == [(DISAPPEARED, '00:11:22:33:44:00'), (DISAPPEARED, '00:11:22:33:44:02'),
+                                          (DISAPPEARED, '00:11:22:33:44:04')]
+    assert diff.expire(now=15) == []
+    assert len(diff.expire(now=16)) == 2
+
+def test_records_and_dicts_diff_alike(diff):
+    record = APRecord(0x001122334455, 'Office', 6, -50, None, 'WPA2', 'CCMP', 'PSK', 1, 0, '0.0.0.0', 6,
+                      '2024-01-01 00:00:00', '2024-01-01 00:00:00')
+    assert kinds(diff.update([record], now=0)) == [(APPEARED, '00:11:22:33:44:55')]
+    assert diff.update([ap('00:11:22:33:44:55')], now=1) == []
+
+def test_subscribers_get_each_non_empty_batch(diff):
+    batches = []
+    diff.subscribe(lambda events: 1 / 0)
+    diff.subscribe(batches.append)
+    diff.update([ap('00:11:22:33:44:55')], now=0)
+    diff.update([ap('00:11:22:33:44:55')], now=1)
+    events = diff.update([ap('00:11:22:33:44:55', channel=1)], now=2, publish=False)
+    assert [kinds(batch) for batch in batches] == [[(APPEARED, '00:11:22:33:44:55')]]
+    diff.publish(events)
+    assert batches[-1] is events
+
+def test_dump_and_load(diff):
+    diff.update([ap('00:11:22:33:44:55'), ap('00:11:22:33:44:66')], now=0)
+    diff.update([ap('00:11:22:33:44:55')], now=30)
+    other = ScanDiff(absence_window=60)
+    other.load(diff.dump())
+    # Same baseline and the same last-seen order
+    assert kinds(other.expire(now=61)) == [(DISAPPEARED, '00:11:22:33:44:66')]
+    [event] = other.update([ap('00:11:22:33:44:55', channel=1)], now=62)
+    assert (event.kind, event.previous) == (CHANGED, {'channel': 6})
@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+import app as web
+from scan_diff import APPEARED, CHANGED
+
+def ap(bssid, essid='Office', channel=6, privacy='WPA2'):
+    return {'bssid': bssid, 'essid': essid, 'channel': channel, 'privacy': privacy,
+            'cipher': 'CCMP', 'authentication': 'PSK', 'power': -50}
+
+@pytest.fixture
+def flask_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(web, '_schema_checked', False)
+    monkeypatch.setattr(web, '_trusted_version', None)
+    web.get_scan_diff().reset()
+    web.get_twin_index().load({})
+    flask_app = web.create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'wifi.db'}",
+                                'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    with flask_app.app_context():
+        web.ensure_schema()
+        yield flask_app
+        web.db.engine.dispose()
+    web.get_scan_diff().reset()
+    web.get_twin_index().load({})
+
+def test_scan_baseline_is_shared_between_workers(flask_app):
+    first = web.apply_scan([ap('00:11:22:33:44:55'), ap('00:11:22:33:44:66')])
+    assert [event.kind for event in first] == [APPEARED, APPEARED]
+
+    # Another worker starts with an empty diff; the stored baseline must win
+    web.get_scan_diff().reset()
+    assert web.apply_scan([ap('00:11:22:33:44:55'), ap('00:11:22:33:44:66')]) == []
+
+    web.get_scan_diff().reset()
+    changed = web.apply_scan([ap('00:11:22:33:44:55', channel=11), ap('00:11:22:33:44:66')])
+    assert [event.kind for event in changed] == [CHANGED]
+    assert changed[0].previous == {'channel': 6}
+    assert len(web.state.get('scan_baseline')) == 2
+
+def test_scan_events_are_appended_not_replaced(flask_app):
+    web.apply_scan([ap('00:11:22:33:44:55')])
+    web.get_scan_diff().reset()
+    web.get_twin_index().load({})
+    web.apply_scan([ap('00:11:22:33:44:55'), ap('00:11:22:33:44:66')])
+    recent = web.state.get('scan_events')
+    assert [event['bssid'] for event in recent] == ['00:11:22:33:44:55', '00:11:22:33:44:66']
+
+def test_twin_baseline_survives_a_fresh_index(flask_app):
+    web.apply_scan([ap('00:11:22:33:44:55')])
+    web.get_twin_index().load({})
+    web.apply_scan([ap('00:11:22:33:44:66')])
+    assert sorted(web.get_twin_index().bssids_for('Office')) == ['00:11:22:33:44:55', '00:11:22:33:44:66']
+
+def test_modify_starts_from_the_default(flask_app):
+    assert web.state.modify('alerts', lambda alerts: alerts + [{'rule': 'a'}]) == [{'rule': 'a'}]
+    assert web.state.modify('alerts', lambda alerts: alerts + [{'rule': 'b'}]) == [{'rule': 'a'}, {'rule': 'b'}]
+    assert web.state.get('alerts') == [{'rule': 'a'}, {'rule': 'b'}]
+
+def test_scans_wait_for_the_scan_lock(flask_app):
+    def scan():
+        with flask_app.app_context():
+            web.apply_scan([ap('00:11:22:33:44:55')])
+
+    with web._scan_lock:
+        thread = threading.Thread(target=scan)
+        thread.start()
+        thread.join(0.2)
+        assert thread.is_alive()
+        assert len(web.get_scan_diff()) == 0
+    thread.join(5)
+    assert not thread.is_alive()
+    assert len(web.get_scan_diff()) == 1
@@ -0,0 +1,54 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip('flask_sqlalchemy')
+
+import app as web
+from models import db, SCHEMA_VERSION
+
+# The networks table as the first release created it
+BASELINE_NETWORKS = '''
+CREATE TABLE networks (
+    id INTEGER PRIMARY KEY, bssid VARCHAR(17) NOT NULL UNIQUE, ssid VARCHAR(255), channel INTEGER,
+    frequency VARCHAR(10), encryption VARCHAR(50), signal_strength INTEGER, wps_enabled BOOLEAN,
+    wps_locked BOOLEAN, manufacturer VARCHAR(100), first_seen DATETIME, last_seen DATETIME)
+'''
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    path = tmp_path / 'wifi.db'
+    monkeypatch.setattr(web, '_schema_checked', False)
+    return path
+
+def ensure_schema(path):
+    flask_app = web.create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}', 'SQLALCHEMY_ENGINE_OPTIONS': {}})
+    with flask_app.app_context():
+        web.ensure_schema()
+        inspector = db.inspect(db.engine)
+        columns = {c['name'] for c in inspector.get_columns('networks')}
+        indexes = {i['name'] for i in inspector.get_indexes('networks')}
+        version = web.state.get('schema_version')
+        db.engine.dispose()
+    web._schema_checked = False
+    return columns, indexes, version
+
+def test_unversioned_database_is_migrated(database):
+    with sqlite3.connect(database) as conn:
+        conn.execute(BASELINE_NETWORKS)
+        conn.execute("INSERT INTO networks (bssid, ssid) VALUES ('00:11:22:33:44:55', 'Cafe')")
+
+    columns, indexes, version = ensure_schema(database)
+
+    assert 'client_count' in columns
+    assert {'ix_networks_client_count', 'ix_networks_manufacturer', 'ix_networks_wps_state'} <= indexes
+    assert version == SCHEMA_VERSION
+    with sqlite3.connect(database) as conn:
+        assert conn.execute('SELECT client_count FROM networks').fetchall() == [(0,)]
+
+def test_migration_is_idempotent(database):
+    first = ensure_schema(database)
+    # Stamp the database as version 1 so every migration runs again
+    with sqlite3.connect(database) as conn:
+        conn.execute("UPDATE app_state SET value = '1' WHERE key = 'schema_version'")
+    assert ensure_schema(database) == first
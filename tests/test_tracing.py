@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+import pytest
+import tracing
+from tracing import RequestProfiler, StackSampler, Tracer
+
+@pytest.fixture
+def tracer(monkeypatch):
+    tracer = Tracer()
+    monkeypatch.setattr(tracing, 'tracer', tracer)
+    return tracer
+
+def test_disabled_tracer_records_nothing(tracer):
+    with tracer.span('ignored'):
+        pass
+    assert list(tracer.spans) == []
+
+def test_nested_spans(tracer):
+    tracer.start()
+    with tracer.span('request', 'http', path='/api/scan'):
+        with tracer.span('scan', 'wifi'):
+            time.sleep(0.002)
+        with tracer.span('save', 'db'):
+            pass
+    tracer.stop()
+    # Spans are recorded as they close, innermost first
+    spans = {span[0]: span for span in tracer.spans}
+    assert [span[0] for span in tracer.spans] == ['scan', 'save', 'request']
+    _, category, start, duration, tid, args = spans['request']
+    assert (category, tid, args) == ('http', threading.get_ident(), {'path': '/api/scan'})
+    for child in ('scan', 'save'):
+        child_start, child_duration = spans[child][2], spans[child][3]
+        assert start <= child_start and child_start + child_duration <= start + duration
+    assert spans['scan'][3] >= 2000
+    assert spans['scan'][2] + spans['scan'][3] <= spans['save'][2]
+
+def test_failed_span_records_the_error(tracer):
+    tracer.start()
+    with pytest.raises(KeyError):
+        with tracer.span('lookup'):
+            raise KeyError('bssid')
+    assert tracer.spans[0][5] == {'error': 'KeyError'}
+
+def test_timed_session_stops_itself(tracer):
+    tracer.start(seconds=0.01)
+    with tracer.span('early'):
+        pass
+    time.sleep(0.02)
+    with tracer.span('late'):
+        pass
+    assert [span[0] for span in tracer.spans] == ['early']
+    assert not tracer.enabled
+
+def test_buffer_is_bounded():
+    tracer = Tracer(max_spans=3)
+    tracer.start()
+    for i in range(5):
+        with tracer.span(f'span {i}'):
+            pass
+    assert [span[0] for span in tracer.spans] == ['span 2', 'span 3', 'span 4']
+    # Starting again clears the previous session
+    tracer.start()
+    assert len(tracer.spans) == 0
+
+def test_traced_decorator(tracer):
+    @tracing.traced(category='wifi')
+    def scan(duration):
+        return duration * 2
+
+    @tracing.traced(name='custom')
+    def other():
+        pass
+
+    assert scan(2) == 4 and list(tracer.spans) == []
+    assert scan.__name__ == 'scan'
+    tracer.start()
+    scan(1)
+    other()
+    assert [(span[0], span[1]) for span in tracer.spans] == \
+        [('test_traced_decorator.<locals>.scan', 'wifi'), ('custom', 'app')]
+
+def test_chrome_trace_export(tracer, tmp_path):
+    tracer.start()
+    with tracer.span('outer', 'http'):
+        with tracer.span('inner', 'db', rows=3):
+            pass
+    path = tracer.write_chrome_trace(str(tmp_path / 'trace.json'))
+    with open(path) as f:
+        trace = json.load(f)
+    assert trace['displayTimeUnit'] == 'ms'
+    inner, outer = trace['traceEvents']
+    assert {key: inner[key] for key in ('name', 'cat', 'ph', 'args')} == \
+        {'name': 'inner', 'cat': 'db', 'ph': 'X', 'args': {'rows': 3}}
+    assert 'args' not in outer
+    assert outer['ts'] <= inner['ts'] and inner['ts'] + inner['dur'] <= outer['ts'] + outer['dur']
+    assert inner['pid'] == outer['pid'] and inner['tid'] == outer['tid']
+
+def busy(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+def test_sampler_start_and_stop():
+    sampler = StackSampler()
+    stop = threading.Event()
+    worker = threading.Thread(target=busy, args=(stop,))
+    worker.start()
+    try:
+        assert sampler.start(seconds=10, interval=0.001)
+        assert sampler.running
+        # One session at a time
+        assert not sampler.start()
+        deadline = time.monotonic() + 5
+        while sampler.samples < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        sampler.stop()
+        sampler._thread.join(5)
+        assert not sampler.running
+    finally:
+        stop.set()
+        worker.join()
+    samples = sampler.samples
+    assert samples >= 5
+    time.sleep(0.01)
+    assert sampler.samples == samples
+    busy_stacks = [stack for stack in sampler.counts if stack.split(';')[-1].startswith('busy (test_tracing.py:')]
+    assert busy_stacks and busy_stacks[0].startswith('_bootstrap (threading.py:')
+    # Collapsed format: "frame;frame;frame count" per line
+    line = next(line for line in sampler.collapsed().splitlines() if line.startswith(busy_stacks[0] + ' '))
+    assert int(line.rsplit(' ', 1)[1]) == sampler.counts[busy_stacks[0]]
+
+def test_sampler_stops_at_its_deadline():
+    sampler = StackSampler()
+    sampler.start(seconds=0.05, interval=0.001)
+    sampler._thread.join(5)
+    assert not sampler.running and sampler.samples > 0
+    # A new session starts from empty counts
+    sampler.start(seconds=0)
+    sampler._thread.join(5)
+    assert (sampler.samples, sampler.counts) == (0, {})
+
+def test_request_profiler():
+    profiler = RequestProfiler()
+    assert profiler.begin() is None and profiler.report() == ''
+    profiler.arm(requests=2)
+    for _ in range(3):
+        profile = profiler.begin()
+        if profile is not None:
+            sum(range(1000))
+            profiler.end(profile)
+    assert (profiler.profiled, profiler.armed) == (2, False)
+    assert 'function calls' in profiler.report(limit=5)
+
+def test_request_profiler_one_request_at_a_time(tmp_path):
+    profiler = RequestProfiler()
+    profiler.arm(seconds=60)
+    first = profiler.begin()
+    assert first is not None and profiler.begin() is None
+    profiler.end(first)
+    assert profiler.armed
+    path = profiler.dump(str(tmp_path / 'requests.prof'))
+    assert path and (tmp_path / 'requests.prof').stat().st_size > 0
@@ -0,0 +1,117 @@
+import pytest
+import twin_detector
+from scan_diff import ScanDiff
+from twin_detector import (SECURITY_MISMATCH, TRUSTED_AP_CHANGED, UNEXPECTED_CHANNEL, UNKNOWN_BSSID,
+                           UNKNOWN_VENDOR, TwinIndex)
+
+VENDORS = {0x001122: 'Acme', 0x00AABB: 'Other Corp'}
+
+def ap(bssid, essid='Office', channel=6, privacy='WPA2', manufacturer=None, power=-50):
+    return {'bssid': bssid, 'essid': essid, 'channel': channel, 'privacy': privacy,
+            'manufacturer': manufacturer, 'power': power}
+
+@pytest.fixture
+def index(monkeypatch):
+    def lookup_vendor(mac):
+        value = mac if isinstance(mac, int) else int(mac.replace(':', ''), 16)
+        if (value >> 40) & 0x02:
+            return twin_detector.LOCALLY_ADMINISTERED
+        return VENDORS.get(value >> 24)
+    monkeypatch.setattr(twin_detector, 'lookup_vendor', lookup_vendor)
+    index = TwinIndex()
+    index.load_trusted([{'bssid': '00:11:22:00:00:01', 'ssid': 'Office', 'encryption': 'WPA2', 'channel': 6},
+                        {'bssid': '00:11:22:00:00:02', 'ssid': 'Office', 'encryption': 'WPA2', 'channel': 11}])
+    return index
+
+def test_trusted_aps_and_other_ssids_are_not_flagged(index):
+    assert index.observe(ap('00:11:22:00:00:01')) is None
+    assert index.observe(ap('00:11:22:00:00:02', channel=11)) is None
+    assert index.observe(ap('00:AA:BB:00:00:01', essid='Cafe', privacy='OPN')) is None
+    assert index.findings == {}
+    assert index.bssids_for('Office') == ['00:11:22:00:00:01', '00:11:22:00:00:02']
+
+def test_same_vendor_clone_is_medium(index):
+    # An unknown BSSID that otherwise matches our APs: a new AP of ours, or a careful clone
+    finding = index.observe(ap('00:11:22:00:00:09'), now=100)
+    assert (finding['reasons'], finding['severity']) == ([UNKNOWN_BSSID], 'medium')
+    assert (finding['bssid'], finding['first_flagged']) == ('00:11:22:00:00:09', 100)
+
+def test_unexpected_channel_is_medium(index):
+    finding = index.observe(ap('00:11:22:00:00:09', channel=1))
+    assert (finding['reasons'], finding['severity']) == ([UNKNOWN_BSSID, UNEXPECTED_CHANNEL], 'medium')
+
+@pytest.mark.parametrize('bssid, privacy, reasons', [
+    ('00:11:22:00:00:09', 'OPN', [UNKNOWN_BSSID, SECURITY_MISMATCH]),
+    ('00:AA:BB:00:00:09', 'WPA2', [UNKNOWN_BSSID, UNKNOWN_VENDOR]),
+    ('00:CC:DD:00:00:09', 'WPA2', [UNKNOWN_BSSID, UNKNOWN_VENDOR]),
+    ('02:11:22:00:00:09', 'WPA2', [UNKNOWN_BSSID, UNKNOWN_VENDOR]),
+    ('02:11:22:00:00:09', 'OPN', [UNKNOWN_BSSID, SECURITY_MISMATCH, UNKNOWN_VENDOR]),
+])
+def test_high_severity_reasons(index, bssid, privacy, reasons):
+    finding = index.observe(ap(bssid, privacy=privacy))
+    assert (finding['reasons'], finding['severity']) == (reasons, 'high')
+
+def test_trusted_ap_changed(index):
+    finding = index.observe(ap('00:11:22:00:00:01', privacy='OPN'))
+    assert (finding['reasons'], finding['severity']) == ([TRUSTED_AP_CHANGED], 'medium')
+    # Back to its allow-listed configuration: the finding is withdrawn
+    assert index.observe(ap('00:11:22:00:00:01')) is None
+    assert index.findings == {}
+
+def test_first_flagged_is_kept(index):
+    index.observe(ap('00:11:22:00:00:09'), now=100)
+    finding = index.observe(ap('00:11:22:00:00:09', channel=1), now=200)
+    assert finding['reasons'] == [UNKNOWN_BSSID, UNEXPECTED_CHANNEL]
+    assert finding['first_flagged'] == 100
+
+def test_renamed_ap_moves_between_ssids(index):
+    index.observe(ap('00:AA:BB:00:00:09'))
+    assert index.observe(ap('00:AA:BB:00:00:09', essid='Cafe')) is None
+    assert index.bssids_for('Office') == [] and index.bssids_for('Cafe') == ['00:AA:BB:00:00:09']
+    assert index.findings == {}
+
+def test_load_trusted_re_evaluates(index):
+    index.observe(ap('00:11:22:00:00:09'))
+    index.observe(ap('00:AA:BB:00:00:01', essid='Lab'))
+    assert [f['ssid'] for f in index.suspicious()] == ['Office']
+
+    # The new AP is ours after all, and Lab becomes one of our SSIDs
+    index.load_trusted([{'bssid': '00:11:22:00:00:01', 'ssid': 'Office', 'encryption': 'WPA2', 'channel': 6},
+                        {'bssid': '00:11:22:00:00:09', 'ssid': 'Office', 'encryption': 'WPA2', 'channel': 6},
+                        {'bssid': '00:11:22:00:00:03', 'ssid': 'Lab', 'encryption': 'WPA2'}])
+    assert [(f['bssid'], f['reasons'], f['severity']) for f in index.suspicious()] == \
+        [('00:AA:BB:00:00:01', [UNKNOWN_BSSID, UNKNOWN_VENDOR], 'high')]
+
+def test_suspicious_lists_high_severity_first(index):
+    index.observe(ap('00:11:22:00:00:09'))
+    index.observe(ap('00:AA:BB:00:00:09'))
+    assert [f['severity'] for f in index.suspicious()] == ['high', 'medium']
+
+def test_scan_events_raise_new_findings_and_forget_disappeared(index):
+    diff = ScanDiff(absence_window=30)
+    raised = []
+    diff.subscribe(lambda events: raised.extend(index.on_scan_events(events)))
+
+    diff.update([ap('00:11:22:00:00:01'), ap('00:AA:BB:00:00:09')], now=0)
+    assert [f['bssid'] for f in raised] == ['00:AA:BB:00:00:09']
+    # Seen again unchanged: nothing new is raised
+    diff.update([ap('00:11:22:00:00:01'), ap('00:AA:BB:00:00:09', power=-80)], now=10)
+    assert len(raised) == 1
+    # Its reasons change: raised again
+    diff.update([ap('00:11:22:00:00:01'), ap('00:AA:BB:00:00:09', privacy='OPN')], now=20)
+    assert raised[-1]['reasons'] == [UNKNOWN_BSSID, SECURITY_MISMATCH, UNKNOWN_VENDOR]
+
+    # Gone for longer than the absence window: DISAPPEARED drops it and its finding
+    diff.update([ap('00:11:22:00:00:01')], now=60)
+    assert index.findings == {}
+    assert index.bssids_for('Office') == ['00:11:22:00:00:01']
+
+def test_dump_and_load_keep_the_allow_list(index):
+    index.observe(ap('00:11:22:00:00:09'), now=100)
+    other = TwinIndex()
+    other.load_trusted([{'bssid': '00:11:22:00:00:01', 'ssid': 'Office', 'encryption': 'WPA2', 'channel': 6}])
+    other.load(index.dump())
+    assert other.bssids_for('Office') == ['00:11:22:00:00:09']
+    assert other.suspicious() == index.suspicious()
+    # The loaded AP is checked against other's allow-list on its next sighting
+    assert other.observe(ap('00:11:22:00:00:01')) is None
@@ -0,0 +1,101 @@
+import threading
+from ui_state import ObservableState
+
+class FakeClock:
+    """Stands in for Clock.schedule_once: callbacks run when the test advances time"""
+
+    def __init__(self):
+        self.now = 0
+        self.pending = []
+
+    def schedule(self, callback, delay):
+        self.pending.append((self.now + delay, callback))
+
+    def advance(self, seconds=0):
+        self.now += seconds
+        due = [entry for entry in self.pending if entry[0] <= self.now]
+        self.pending = [entry for entry in self.pending if entry[0] > self.now]
+        for _, callback in sorted(due, key=lambda entry: entry[0]):
+            callback(seconds)
+
+def make_state(**initial):
+    clock = FakeClock()
+    state = ObservableState(clock.schedule, **initial)
+    calls = []
+    state.bind(calls.append, 'status', 'progress')
+    return clock, state, calls
+
+def test_changes_are_delivered_once_per_frame():
+    clock, state, calls = make_state(status='Idle', progress=0)
+    state.set(status='Scanning')
+    state.set(progress=10)
+    state.set(progress=20)
+    # Readers see the latest value at once; callbacks wait for the frame
+    assert state['progress'] == 20 and calls == []
+    assert len(clock.pending) == 1
+    clock.advance()
+    assert calls == [{'status': 'Scanning', 'progress': 20}]
+
+def test_unchanged_values_are_not_delivered():
+    clock, state, calls = make_state(status='Idle', progress=0)
+    state.set(status='Idle')
+    clock.advance()
+    state.set(status='Scanning')
+    state.set(status='Idle')
+    clock.advance()
+    assert calls == []
+
+def test_bindings_only_see_their_keys():
+    clock, state, calls = make_state(status='Idle')
+    networks = []
+    state.bind(networks.append, 'networks')
+    state.set(networks=[1, 2])
+    clock.advance()
+    assert (calls, networks) == ([], [{'networks': [1, 2]}])
+    state.set(status='Done', networks=[1, 2, 3])
+    clock.advance()
+    assert calls == [{'status': 'Done', 'networks': [1, 2, 3]}]
+    assert state.get('missing', 'default') == 'default'
+
+def test_failing_callback_does_not_block_others():
+    clock, state, calls = make_state()
+
+    def broken(changes):
+        raise RuntimeError('widget gone')
+    state.bind(broken, 'status')
+    state.bind(calls.append, 'status')
+    state.set(status='Scanning')
+    clock.advance()
+    assert calls == [{'status': 'Scanning'}, {'status': 'Scanning'}]
+
+def test_flash_resets_after_the_delay():
+    clock, state, calls = make_state(status='Idle')
+    state.flash(2, reset='', status='Saved')
+    clock.advance()
+    clock.advance(1)
+    assert state['status'] == 'Saved'
+    clock.advance(1)
+    clock.advance()
+    assert state['status'] == ''
+    assert calls == [{'status': 'Saved'}, {'status': ''}]
+
+def test_flash_is_not_reset_after_a_newer_change():
+    clock, state, calls = make_state(status='Idle')
+    state.flash(2, reset='', status='Saved')
+    clock.advance(1)
+    state.set(status='Scanning')
+    clock.advance(1)
+    clock.advance()
+    assert state['status'] == 'Scanning'
+    assert calls == [{'status': 'Saved'}, {'status': 'Scanning'}]
+
+def test_sets_from_worker_threads_coalesce():
+    clock, state, calls = make_state(progress=0)
+    workers = [threading.Thread(target=lambda: [state.set(progress=i) for i in range(1, 101)]) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(clock.pending) == 1
+    clock.advance()
+    assert calls == [{'progress': 100}]
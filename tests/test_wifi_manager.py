@@ -0,0 +1,28 @@
+import os
+import fakeradio
+from wifi_manager import WiFiManager
+
+SIM_DIR = os.path.dirname(os.path.abspath(fakeradio.__file__))
+
+def test_airodump_scan_uses_its_own_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv('PATH', SIM_DIR + os.pathsep + os.environ.get('PATH', ''))
+    monkeypatch.setenv('SIM_APS', '20')
+    monkeypatch.setenv('SIM_SEED', '1')
+    monkeypatch.setenv('SIM_STATE_FILE', str(tmp_path / 'state.json'))
+    monkeypatch.setattr(fakeradio, 'STATE_FILE', str(tmp_path / 'state.json'))
+    monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+    fakeradio.save_state(fakeradio.default_state())
+    # Files in the working directory are neither read nor removed by a scan
+    workdir = tmp_path / 'cwd'
+    workdir.mkdir()
+    (workdir / 'notes.csv').write_text('keep me')
+    (workdir / 'old-01.cap').write_bytes(b'')
+    monkeypatch.chdir(workdir)
+
+    manager = WiFiManager()
+    manager.monitor_interface = 'wlan0'
+    networks = manager.scan_networks(duration=1.5, backend='airodump')
+
+    assert len(networks) == 20
+    assert sorted(os.listdir(workdir)) == ['notes.csv', 'old-01.cap']
+    assert not [name for name in os.listdir(tmp_path) if name.startswith('airodump-')]
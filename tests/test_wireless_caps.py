@@ -0,0 +1,43 @@
+import wifi_manager
+import wireless_caps
+from wireless_caps import CapabilityCache, PhyCapabilities, phy_index
+
+def make_phy(index, name, modes=('managed', 'monitor')):
+    phy = PhyCapabilities(index, name)
+    phy.modes = list(modes)
+    return phy
+
+def test_phy_index():
+    assert phy_index('phy0') == 0
+    assert phy_index('phy12') == 12
+    assert phy_index('wlan-radio') is None
+    assert phy_index(None) is None
+
+def test_renamed_phys_match_by_index(monkeypatch):
+    monkeypatch.setattr(wireless_caps, 'phy_fingerprint', lambda: None)
+    # `iw phy phy1 set name internal`: interfaces still report phy1
+    cache = CapabilityCache(lambda: [make_phy(0, 'usb-radio', modes=('managed',)), make_phy(1, 'internal')])
+    assert cache.phy('phy1').name == 'internal'
+    assert cache.phy(0).name == 'usb-radio'
+    assert cache.phy('internal') is None
+
+    monkeypatch.setattr(wireless_caps, 'capabilities', cache)
+    interfaces = [{'ifname': 'wlan0', 'ifindex': 3, 'phy': 'phy0', 'type': 'managed'},
+                  {'ifname': 'wlan1', 'ifindex': 4, 'phy': 'phy1', 'type': 'managed'}]
+    assert wifi_manager.WiFiManager().pick_monitor_interface(interfaces)['ifname'] == 'wlan1'
+
+def test_failed_load_is_not_cached(monkeypatch):
+    monkeypatch.setattr(wireless_caps, 'phy_fingerprint', lambda: ('phy0',))
+    calls = []
+
+    def loader():
+        calls.append(1)
+        if len(calls) == 1:
+            raise OSError('netlink busy')
+        return [make_phy(0, 'phy0')]
+
+    cache = CapabilityCache(loader)
+    assert cache.get() == []
+    assert [phy.name for phy in cache.get()] == ['phy0']
+    cache.get()
+    assert len(calls) == 2
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Tracing and Profiling
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Lightweight spans exported as Chrome trace JSON (chrome://tracing, Perfetto),
+plus on-demand cProfile and stack-sampling sessions that can be switched on
+at runtime without restarting the server.
+"""
+
+import collections
+import functools
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+MAX_SPANS = 100000
+
+class Tracer:
+    """Records spans into a bounded buffer while enabled"""
+
+    def __init__(self, max_spans=MAX_SPANS):
+        self.enabled = False
+        self.spans = collections.deque(maxlen=max_spans)
+        self.deadline = None
+
+    def start(self, seconds=None):
+        """Start recording spans, optionally for a limited time"""
+        self.spans.clear()
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.enabled = True
+
+    def stop(self):
+        self.enabled = False
+        self.deadline = None
+
+    def span(self, name, category='app', **args):
+        """Context manager recording one span"""
+        if not self.enabled:
+            return _NULL_SPAN
+        if self.deadline and time.monotonic() > self.deadline:
+            self.stop()
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def to_chrome_trace(self):
+        """Export recorded spans in Chrome trace event format"""
+        pid = os.getpid()
+        events = []
+        for name, category, start, duration, tid, args in list(self.spans):
+            event = {
+                'name': name,
+                'cat': category,
+                'ph': 'X',
+                'ts': start,
+                'dur': duration,
+                'pid': pid,
+                'tid': tid
+            }
+            if args:
+                event['args'] = args
+            events.append(event)
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.to_chrome_trace(), f)
+        return path
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer.spans.append((self.name, self.category, self.start // 1000,
+                                  (end - self.start) // 1000, threading.get_ident(), self.args))
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+tracer = Tracer()
+
+def traced(name=None, category='app'):
+    """Decorator wrapping a function call in a span while tracing is on"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            with tracer.span(span_name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class RequestProfiler:
+    """cProfile the next N requests, or all requests for a number of seconds"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active = threading.Lock()
+        self.remaining = 0
+        self.deadline = None
+        self.stats = None
+        self.profiled = 0
+
+    @property
+    def armed(self):
+        return self.remaining > 0 or (self.deadline is not None and time.monotonic() < self.deadline)
+
+    def arm(self, requests=None, seconds=None):
+        with self._lock:
+            self.remaining = requests or 0
+            self.deadline = time.monotonic() + seconds if seconds else None
+            self.stats = None
+            self.profiled = 0
+
+    def begin(self):
+        """Start profiling the current request if a session is armed"""
+        if not self.armed:
+            return None
+        # cProfile can only profile one request at a time
+        if not self._active.acquire(blocking=False):
+            return None
+        with self._lock:
+            if self.remaining > 0:
+                self.remaining -= 1
+        # Imported here so the server doesn't pay for them until a session is armed
+        import cProfile
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def end(self, profile):
+        profile.disable()
+        self._active.release()
+        import pstats
+        with self._lock:
+            if self.stats is None:
+                self.stats = pstats.Stats(profile)
+            else:
+                self.stats.add(profile)
+            self.profiled += 1
+
+    def report(self, sort='cumulative', limit=50):
+        """Text pstats report of everything profiled so far"""
+        with self._lock:
+            if self.stats is None:
+                return ''
+            out = io.StringIO()
+            self.stats.stream = out
+            self.stats.sort_stats(sort).print_stats(limit)
+            return out.getvalue()
+
+    def dump(self, path):
+        """Write raw pstats data (for snakeviz, flameprof, gprof2dot)"""
+        with self._lock:
+            if self.stats is None:
+                return None
+            self.stats.dump_stats(path)
+            return path
+
+class StackSampler:
+    """Samples all thread stacks at an interval into collapsed-stack counts"""
+
+    def __init__(self):
+        self.counts = collections.Counter()
+        self.samples = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds=10, interval=0.005):
+        if self.running:
+            return False
+        self.counts = collections.Counter()
+        self.samples = 0
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(seconds, interval))
+        self._thread.daemon = True
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self, seconds, interval):
+        own = threading.get_ident()
+        deadline = time.monotonic() + seconds
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                    frame = frame.f_back
+                self.counts[';'.join(reversed(stack))] += 1
+            self.samples += 1
+            time.sleep(interval)
+
+    def collapsed(self):
+        """Brendan Gregg collapsed-stack format, ready for flamegraph.pl/speedscope"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.counts.most_common()) + '\n'
+
+profiler = RequestProfiler()
+sampler = StackSampler()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Evil Twin Detection
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Indexes every observed SSID to the BSSIDs broadcasting it and checks APs
+that use one of our SSIDs against the allow-list of our own BSSIDs
+(TrustedNetwork). The allowed security types, vendors and channels per SSID
+are precomputed when the allow-list is loaded, so each AP update costs a
+few dict and set lookups. The index is fed with scan_diff events.
+"""
+
+import logging
+import time
+from ap_records import mac_to_int, int_to_mac
+from oui_db import lookup_vendor, LOCALLY_ADMINISTERED
+from scan_diff import APPEARED, CHANGED, DISAPPEARED
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_BSSID = 'unknown_bssid'
+SECURITY_MISMATCH = 'security_mismatch'
+UNKNOWN_VENDOR = 'unknown_vendor'
+UNEXPECTED_CHANNEL = 'unexpected_channel'
+TRUSTED_AP_CHANGED = 'trusted_ap_changed'
+
+# Reasons that on their own make a finding high severity
+HIGH_SEVERITY = frozenset((SECURITY_MISMATCH, UNKNOWN_VENDOR))
+
+class SiteProfile:
+    """What our own APs broadcasting one SSID look like"""
+    __slots__ = ('bssids', 'security', 'vendors', 'channels')
+
+    def __init__(self):
+        self.bssids = set()
+        self.security = set()
+        self.vendors = set()
+        self.channels = set()
+
+class TwinIndex:
+    """SSID -> BSSID index with allow-list checks for our SSIDs"""
+
+    def __init__(self):
+        self.by_ssid = {}
+        self.findings = {}
+        self._ssid_of = {}
+        self._profiles = {}
+        self._trusted = {}
+
+    def load_trusted(self, entries):
+        """Rebuild the per-SSID profiles from TrustedNetwork rows (or dicts)"""
+        profiles = {}
+        trusted = {}
+        for entry in entries:
+            data = entry.to_dict() if hasattr(entry, 'to_dict') else entry
+            bssid = mac_to_int(data['bssid'])
+            profile = profiles.setdefault(data['ssid'], SiteProfile())
+            profile.bssids.add(bssid)
+            if data.get('encryption'):
+                profile.security.add(data['encryption'])
+            vendor = data.get('manufacturer') or lookup_vendor(bssid)
+            if vendor:
+                profile.vendors.add(vendor)
+            if data.get('channel'):
+                profile.channels.add(data['channel'])
+            trusted[bssid] = data
+        self._profiles = profiles
+        self._trusted = trusted
+        # Re-check everything already indexed against the new allow-list
+        self.findings = {}
+        for ssid, aps in self.by_ssid.items():
+            for bssid, profile in aps.items():
+                self._evaluate(bssid, ssid, *profile)
+
+    def observe(self, record, now=None):
+        """Index one AP sighting; returns its finding if it looks suspicious"""
+        bssid = getattr(record, 'bssid_int', None)
+        if bssid is None:
+            bssid = mac_to_int(record['bssid'])
+        ssid = record.get('essid') or ''
+        profile = (record.get('privacy') or record.get('encryption'), record.get('channel'),
+                   record.get('manufacturer') or lookup_vendor(bssid), record.get('power'))
+        old_ssid = self._ssid_of.get(bssid)
+        if old_ssid is not None and old_ssid != ssid:
+            self._unindex(bssid, old_ssid)
+        self._ssid_of[bssid] = ssid
+        self.by_ssid.setdefault(ssid, {})[bssid] = profile
+        return self._evaluate(bssid, ssid, *profile, now=now)
+
+    def forget(self, bssid):
+        """Drop an AP that is no longer on the air"""
+        bssid = bssid if isinstance(bssid, int) else mac_to_int(bssid)
+        ssid = self._ssid_of.pop(bssid, None)
+        if ssid is not None:
+            self._unindex(bssid, ssid)
+        self.findings.pop(bssid, None)
+
+    def _unindex(self, bssid, ssid):
+        aps = self.by_ssid.get(ssid)
+        if aps is not None:
+            aps.pop(bssid, None)
+            if not aps:
+                del self.by_ssid[ssid]
+
+    def _evaluate(self, bssid, ssid, security, channel, vendor, power, now=None):
+        site = self._profiles.get(ssid)
+        if site is None:
+            self.findings.pop(bssid, None)
+            return None
+
+        reasons = []
+        trusted = self._trusted.get(bssid)
+        if trusted is None:
+            reasons.append(UNKNOWN_BSSID)
+            if site.security and security not in site.security:
+                reasons.append(SECURITY_MISMATCH)
+            if site.vendors and (vendor is None or vendor == LOCALLY_ADMINISTERED or vendor not in site.vendors):
+                reasons.append(UNKNOWN_VENDOR)
+            if site.channels and channel not in site.channels:
+                reasons.append(UNEXPECTED_CHANNEL)
+        elif ((trusted.get('encryption') and security != trusted['encryption'])
+              or (trusted.get('channel') and channel != trusted['channel'])):
+            reasons.append(TRUSTED_AP_CHANGED)
+
+        if not reasons:
+            self.findings.pop(bssid, None)
+            return None
+
+        previous = self.findings.get(bssid)
+        finding = {
+            'bssid': int_to_mac(bssid),
+            'ssid': ssid,
+            'reasons': reasons,
+            'severity': 'high' if HIGH_SEVERITY.intersection(reasons) else 'medium',
+            'encryption': security,
+            'channel': channel,
+            'vendor': vendor,
+            'power': power,
+            'first_flagged': previous['first_flagged'] if previous else (now or time.time())
+        }
+        self.findings[bssid] = finding
+        return finding
+
+    def on_scan_events(self, events):
+        """scan_diff subscriber; returns findings that are new or whose reasons changed"""
+        raised = []
+        for event in events:
+            if event.kind == DISAPPEARED:
+                self.forget(event.bssid_int)
+                continue
+            if event.kind not in (APPEARED, CHANGED):
+                continue
+            before = self.findings.get(event.bssid_int)
+            finding = self.observe(event.record, event.timestamp)
+            if finding is not None and (before is None or before['reasons'] != finding['reasons']):
+                raised.append(finding)
+        return raised
+
+    def dump(self):
+        """The SSID index and open findings as JSON-friendly data"""
+        return {
+            'aps': [[bssid, ssid, *profile] for ssid, aps in self.by_ssid.items() for bssid, profile in aps.items()],
+            'findings': list(self.findings.values())
+        }
+
+    def load(self, data):
+        """Replace the index and findings with dump() output; the allow-list is kept"""
+        by_ssid = {}
+        ssid_of = {}
+        for bssid, ssid, security, channel, vendor, power in data.get('aps', ()):
+            by_ssid.setdefault(ssid, {})[bssid] = (security, channel, vendor, power)
+            ssid_of[bssid] = ssid
+        self.by_ssid = by_ssid
+        self._ssid_of = ssid_of
+        self.findings = {mac_to_int(finding['bssid']): finding for finding in data.get('findings', ())}
+
+    def bssids_for(self, ssid):
+        return [int_to_mac(bssid) for bssid in self.by_ssid.get(ssid, ())]
+
+    def suspicious(self):
+        return sorted(self.findings.values(), key=lambda f: (f['severity'] != 'high', f['ssid'], f['bssid']))
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Observable UI State
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Thread-safe key/value store for the mobile app's shared state. Worker
+threads call set() freely; changes are collected and delivered to bound
+callbacks on the UI thread in one batch per frame, so several updates in a
+row cost one redraw and nothing runs while the app is idle. Timed messages
+(flash) are cleared by a scheduled callback instead of a sleeping thread.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_UNSET = object()
+
+class ObservableState:
+    """
+    Shared state with coalesced change notification.
+    schedule: schedule(callback, delay) running callback(dt) on the UI thread,
+    e.g. kivy.clock.Clock.schedule_once.
+    """
+
+    def __init__(self, schedule, **initial):
+        self._schedule = schedule
+        self._values = dict(initial)
+        self._notified = dict(initial)
+        self._dirty = set()
+        self._generation = {}
+        self._bindings = []
+        self._scheduled = False
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def get(self, key, default=None):
+        """Latest value, including changes not yet delivered to the UI"""
+        return self._values.get(key, default)
+
+    def set(self, **changes):
+        """Update values from any thread; callbacks run on the next frame"""
+        with self._lock:
+            self._values.update(changes)
+            self._dirty.update(changes)
+            for key in changes:
+                self._generation[key] = self._generation.get(key, 0) + 1
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._schedule(self.flush, 0)
+
+    def flash(self, seconds, reset=None, **changes):
+        """Set values, then put them back to reset after a delay unless changed again"""
+        self.set(**changes)
+        with self._lock:
+            generations = {key: self._generation[key] for key in changes}
+        self._schedule(lambda dt: self._expire(generations, reset), seconds)
+
+    def _expire(self, generations, reset):
+        with self._lock:
+            stale = [key for key, generation in generations.items() if self._generation.get(key) == generation]
+        if stale:
+            self.set(**{key: reset for key in stale})
+
+    def bind(self, callback, *keys):
+        """Call callback(changes) once per frame in which any of keys changed"""
+        self._bindings.append((frozenset(keys), callback))
+        return callback
+
+    def flush(self, dt=None):
+        """Deliver the changes collected since the last flush"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+            self._scheduled = False
+            changes = {}
+            for key in dirty:
+                value = self._values[key]
+                if self._notified.get(key, _UNSET) != value:
+                    self._notified[key] = value
+                    changes[key] = value
+        if not changes:
+            return
+        for keys, callback in self._bindings:
+            if keys.isdisjoint(changes):
+                continue
+            try:
+                callback(changes)
+            except Exception as e:
+                logger.error(f"UI state callback failed: {e}")
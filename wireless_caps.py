@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - Wireless Capabilities
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Per-phy capability model: supported interface modes, bands with their
+channels, frequencies and TX power limits, and the allowed concurrent
+interface combinations. Read from nl80211 (GET_WIPHY split dump), with a
+parser for `iw list` output as the fallback, and cached until the set of
+phys changes (a hotplug event) or the cache is invalidated.
+
+    python3 wireless_caps.py
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import netlink
+from metrics import timed_run
+from pcap_reader import frequency_to_channel
+
+logger = logging.getLogger(__name__)
+
+SYSFS_PHY_DIR = '/sys/class/ieee80211'
+
+NL80211_CMD_GET_WIPHY = 1
+NL80211_CMD_GET_INTERFACE = 5
+
+NL80211_ATTR_WIPHY = 1
+NL80211_ATTR_WIPHY_NAME = 2
+NL80211_ATTR_IFINDEX = 3
+NL80211_ATTR_IFNAME = 4
+NL80211_ATTR_IFTYPE = 5
+NL80211_ATTR_MAC = 6
+NL80211_ATTR_WIPHY_BANDS = 22
+NL80211_ATTR_SUPPORTED_IFTYPES = 32
+NL80211_ATTR_WIPHY_FREQ = 38
+NL80211_ATTR_INTERFACE_COMBINATIONS = 120
+NL80211_ATTR_SOFTWARE_IFTYPES = 121
+NL80211_ATTR_SPLIT_WIPHY_DUMP = 174
+
+NL80211_BAND_ATTR_FREQS = 1
+NL80211_FREQUENCY_ATTR_FREQ = 1
+NL80211_FREQUENCY_ATTR_DISABLED = 2
+NL80211_FREQUENCY_ATTR_NO_IR = 3
+NL80211_FREQUENCY_ATTR_RADAR = 5
+NL80211_FREQUENCY_ATTR_MAX_TX_POWER = 6
+
+NL80211_IFACE_COMB_LIMITS = 1
+NL80211_IFACE_COMB_MAXNUM = 2
+NL80211_IFACE_COMB_NUM_CHANNELS = 4
+NL80211_IFACE_LIMIT_MAX = 1
+NL80211_IFACE_LIMIT_TYPES = 2
+
+# nl80211 interface types, and the names iw prints for them
+IFTYPES = {
+    1: 'ibss', 2: 'managed', 3: 'ap', 4: 'ap_vlan', 5: 'wds', 6: 'monitor',
+    7: 'mesh_point', 8: 'p2p_client', 9: 'p2p_go', 10: 'p2p_device', 11: 'ocb', 12: 'nan'
+}
+IFTYPE_IDS = {name: number for number, name in IFTYPES.items()}
+IW_MODE_NAMES = {
+    'IBSS': 'ibss', 'managed': 'managed', 'AP': 'ap', 'AP/VLAN': 'ap_vlan', 'WDS': 'wds',
+    'monitor': 'monitor', 'mesh point': 'mesh_point', 'P2P-client': 'p2p_client', 'P2P-GO': 'p2p_go',
+    'P2P-device': 'p2p_device', 'outside context of a BSS': 'ocb', 'NAN': 'nan'
+}
+BANDS = {0: '2.4GHz', 1: '5GHz', 2: '60GHz', 3: '6GHz', 4: '900MHz'}
+
+class Channel:
+    """One frequency a phy can tune to"""
+    __slots__ = ('freq', 'channel', 'max_power', 'disabled', 'no_ir', 'radar')
+
+    def __init__(self, freq, channel=None, max_power=None, disabled=False, no_ir=False, radar=False):
+        self.freq = freq
+        self.channel = channel if channel is not None else frequency_to_channel(freq)
+        self.max_power = max_power  # dBm
+        self.disabled = disabled
+        self.no_ir = no_ir
+        self.radar = radar
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+class PhyCapabilities:
+    """What one wireless phy supports"""
+    __slots__ = ('index', 'name', 'modes', 'software_modes', 'bands', 'combinations')
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = name
+        self.modes = []
+        self.software_modes = []  # can always be added, outside the combinations
+        self.bands = {}  # band name -> [Channel]
+        self.combinations = []  # {'limits': [(max, modes)], 'total': n, 'channels': n}
+
+    def supports(self, mode):
+        return mode in self.modes
+
+    def channels(self, band=None, include_disabled=False):
+        """Usable channel numbers, optionally for one band"""
+        bands = [self.bands.get(band, ())] if band else self.bands.values()
+        return [c.channel for chans in bands for c in chans if include_disabled or not c.disabled]
+
+    @property
+    def max_tx_power(self):
+        powers = [c.max_power for chans in self.bands.values() for c in chans
+                  if not c.disabled and c.max_power is not None]
+        return max(powers) if powers else None
+
+    def allows(self, *modes):
+        """Whether interfaces of these modes can exist at the same time on this phy"""
+        if not all(self.supports(mode) for mode in modes):
+            return False
+        modes = [mode for mode in modes if mode not in self.software_modes]
+        if len(modes) <= 1:
+            return True
+        return any(self._fits(combination, modes) for combination in self.combinations)
+
+    @staticmethod
+    def _fits(combination, modes):
+        if len(modes) > combination['total']:
+            return False
+        remaining = [limit for limit, _ in combination['limits']]
+
+        def place(i):
+            if i == len(modes):
+                return True
+            for slot, (_, allowed) in enumerate(combination['limits']):
+                if modes[i] in allowed and remaining[slot]:
+                    remaining[slot] -= 1
+                    if place(i + 1):
+                        return True
+                    remaining[slot] += 1
+            return False
+
+        return place(0)
+
+    def to_dict(self):
+        return {
+            'index': self.index,
+            'name': self.name,
+            'modes': self.modes,
+            'software_modes': self.software_modes,
+            'bands': {band: [c.to_dict() for c in chans] for band, chans in self.bands.items()},
+            'max_tx_power': self.max_tx_power,
+            'combinations': [{'limits': [{'max': limit, 'modes': modes} for limit, modes in c['limits']],
+                              'total': c['total'], 'channels': c['channels']} for c in self.combinations]
+        }
+
+    def summary(self):
+        """Compact form for status responses"""
+        return {
+            'name': self.name,
+            'modes': self.modes,
+            'bands': {band: self.channels(band) for band in self.bands},
+            'max_tx_power': self.max_tx_power,
+            'monitor': self.supports('monitor'),
+            'monitor_with_managed': self.allows('managed', 'monitor')
+        }
+
+    def __repr__(self):
+        return f'<PhyCapabilities {self.name} {",".join(self.modes)}>'
+
+def _parse_nl80211_wiphy(phys, attrs):
+    index = netlink.get_u32(attrs, NL80211_ATTR_WIPHY)
+    phy = phys.get(index)
+    if phy is None:
+        phy = phys[index] = PhyCapabilities(index, netlink.get_str(attrs, NL80211_ATTR_WIPHY_NAME, f'phy{index}'))
+    # Split dumps spread one wiphy over several messages; merge as they come
+    if NL80211_ATTR_SUPPORTED_IFTYPES in attrs:
+        phy.modes = [IFTYPES[t] for t, _ in netlink.iter_attrs(attrs[NL80211_ATTR_SUPPORTED_IFTYPES]) if t in IFTYPES]
+    if NL80211_ATTR_SOFTWARE_IFTYPES in attrs:
+        phy.software_modes = [IFTYPES[t] for t, _ in netlink.iter_attrs(attrs[NL80211_ATTR_SOFTWARE_IFTYPES])
+                              if t in IFTYPES]
+    for band, band_data in netlink.iter_attrs(attrs.get(NL80211_ATTR_WIPHY_BANDS, b'')):
+        channels = phy.bands.setdefault(BANDS.get(band, str(band)), [])
+        band_attrs = netlink.parse_attrs(band_data)
+        for _, freq_data in netlink.iter_attrs(band_attrs.get(NL80211_BAND_ATTR_FREQS, b'')):
+            freq_attrs = netlink.parse_attrs(freq_data)
+            power = netlink.get_u32(freq_attrs, NL80211_FREQUENCY_ATTR_MAX_TX_POWER)
+            channels.append(Channel(
+                netlink.get_u32(freq_attrs, NL80211_FREQUENCY_ATTR_FREQ),
+                max_power=power / 100 if power is not None else None,
+                disabled=NL80211_FREQUENCY_ATTR_DISABLED in freq_attrs,
+                no_ir=NL80211_FREQUENCY_ATTR_NO_IR in freq_attrs,
+                radar=NL80211_FREQUENCY_ATTR_RADAR in freq_attrs
+            ))
+    for _, comb_data in netlink.iter_attrs(attrs.get(NL80211_ATTR_INTERFACE_COMBINATIONS, b'')):
+        comb_attrs = netlink.parse_attrs(comb_data)
+        limits = []
+        for _, limit_data in netlink.iter_attrs(comb_attrs.get(NL80211_IFACE_COMB_LIMITS, b'')):
+            limit_attrs = netlink.parse_attrs(limit_data)
+            types = [IFTYPES[t] for t, _ in netlink.iter_attrs(limit_attrs.get(NL80211_IFACE_LIMIT_TYPES, b''))
+                     if t in IFTYPES]
+            limits.append((netlink.get_u32(limit_attrs, NL80211_IFACE_LIMIT_MAX, 0), types))
+        phy.combinations.append({
+            'limits': limits,
+            'total': netlink.get_u32(comb_attrs, NL80211_IFACE_COMB_MAXNUM, 0),
+            'channels': netlink.get_u32(comb_attrs, NL80211_IFACE_COMB_NUM_CHANNELS, 0)
+        })
+
+def read_phys_nl80211():
+    """All phys from an nl80211 GET_WIPHY dump; raises OSError when nl80211 is unavailable"""
+    with netlink.GenericNetlink('nl80211') as nl:
+        replies = nl.command(NL80211_CMD_GET_WIPHY, netlink.attr_flag(NL80211_ATTR_SPLIT_WIPHY_DUMP), dump=True)
+    phys = {}
+    for _cmd, attrs in replies:
+        _parse_nl80211_wiphy(phys, attrs)
+    return sorted(phys.values(), key=lambda phy: phy.index)
+
+_FREQ_LINE = re.compile(r'\*\s+([\d.]+) MHz(?: \[(\d+)\])?(.*)')
+_POWER = re.compile(r'\(([\d.]+) dBm\)')
+_LIMIT = re.compile(r'#\{\s*([^}]*?)\s*\}\s*<=\s*(\d+)')
+_TOTAL = re.compile(r'total <= (\d+)')
+_NUM_CHANNELS = re.compile(r'#channels <= (\d+)')
+
+def _parse_combination(text):
+    limits = [(int(limit), [IW_MODE_NAMES.get(m.strip(), m.strip().lower()) for m in modes.split(',')])
+              for modes, limit in _LIMIT.findall(text)]
+    total = _TOTAL.search(text)
+    channels = _NUM_CHANNELS.search(text)
+    return {'limits': limits, 'total': int(total.group(1)) if total else sum(l for l, _ in limits),
+            'channels': int(channels.group(1)) if channels else 1}
+
+def parse_iw_list(text):
+    """Phys from `iw list` output"""
+    phys = []
+    phy = section = band = None
+    combination = []
+
+    def finish_combination():
+        if phy is not None and combination:
+            phy.combinations.append(_parse_combination(' '.join(combination)))
+        combination.clear()
+
+    for line in text.splitlines():
+        if line.startswith('Wiphy '):
+            finish_combination()
+            name = line.split()[1]
+            digits = re.sub(r'\D', '', name)
+            phy = PhyCapabilities(int(digits) if digits else len(phys), name)
+            phys.append(phy)
+            section = band = None
+            continue
+        if phy is None or not line.strip():
+            continue
+        depth = len(line) - len(line.lstrip('\t'))
+        stripped = line.strip()
+        if depth == 1:
+            finish_combination()
+            section = stripped.rstrip(':')
+            match = re.match(r'Band (\d+)', stripped)
+            band = BANDS.get(int(match.group(1)) - 1, match.group(1)) if match else None
+            if band:
+                phy.bands.setdefault(band, [])
+            elif stripped.startswith('wiphy index:'):
+                phy.index = int(stripped.split(':')[1])
+            continue
+        if section in ('Supported interface modes', 'software interface modes (can always be added)') \
+                and stripped.startswith('*'):
+            mode = stripped.lstrip('* ').strip()
+            modes = phy.modes if section.startswith('Supported') else phy.software_modes
+            modes.append(IW_MODE_NAMES.get(mode, mode.lower()))
+        elif band and depth >= 3:
+            match = _FREQ_LINE.match(stripped)
+            if match:
+                rest = match.group(3)
+                power = _POWER.search(rest)
+                phy.bands[band].append(Channel(
+                    int(float(match.group(1))),
+                    channel=int(match.group(2)) if match.group(2) else None,
+                    max_power=float(power.group(1)) if power else None,
+                    disabled='disabled' in rest,
+                    no_ir='no IR' in rest or 'passive scan' in rest,
+                    radar='radar detection' in rest
+                ))
+        elif section == 'valid interface combinations':
+            if stripped.startswith('*'):
+                finish_combination()
+                stripped = stripped[1:]
+            combination.append(stripped)
+    finish_combination()
+    return phys
+
+def read_phys():
+    """All phys, from nl80211 or else `iw list`"""
+    if netlink.available():
+        try:
+            return read_phys_nl80211()
+        except OSError as e:
+            logger.debug(f"nl80211 unavailable ({e}); falling back to iw list")
+    result = timed_run(['iw', 'list'], capture_output=True, text=True)
+    return parse_iw_list(result.stdout)
+
+def parse_nl80211_interface(attrs):
+    index = netlink.get_u32(attrs, NL80211_ATTR_WIPHY)
+    return {
+        'ifname': netlink.get_str(attrs, NL80211_ATTR_IFNAME),
+        'ifindex': netlink.get_u32(attrs, NL80211_ATTR_IFINDEX),
+        'phy': f'phy{index}' if index is not None else None,
+        'type': IFTYPES.get(netlink.get_u32(attrs, NL80211_ATTR_IFTYPE), 'unknown')
+    }
+
+def read_interfaces_nl80211():
+    with netlink.GenericNetlink('nl80211') as nl:
+        replies = nl.command(NL80211_CMD_GET_INTERFACE, dump=True)
+    return [parse_nl80211_interface(attrs) for _cmd, attrs in replies]
+
+def parse_iw_dev(text):
+    """Interfaces from `iw dev` output, with the phy each belongs to"""
+    interfaces = []
+    phy = None
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('phy#'):
+            phy = 'phy' + stripped[4:]
+        elif stripped.startswith('Interface '):
+            interfaces.append({'ifname': stripped.split()[1], 'ifindex': None, 'phy': phy, 'type': None})
+        elif interfaces and stripped.startswith('ifindex '):
+            interfaces[-1]['ifindex'] = int(stripped.split()[1])
+        elif interfaces and stripped.startswith('type '):
+            mode = stripped[5:]
+            interfaces[-1]['type'] = IW_MODE_NAMES.get(mode, mode.lower())
+    return interfaces
+
+def read_interfaces():
+    """Wireless interfaces as {ifname, ifindex, phy, type}, from nl80211 or else `iw dev`"""
+    if netlink.available():
+        try:
+            return read_interfaces_nl80211()
+        except OSError as e:
+            logger.debug(f"nl80211 unavailable ({e}); falling back to iw dev")
+    result = timed_run(['iw', 'dev'], capture_output=True, text=True)
+    return parse_iw_dev(result.stdout)
+
+def phy_index(phy):
+    """
+    Wiphy index from an interface's phy reference ('phy<index>', as built
+    from nl80211 and `iw dev`), or None. Phys are matched by index because
+    their names can be changed (`iw phy <name> set name`).
+    """
+    if phy and phy.startswith('phy') and phy[3:].isdigit():
+        return int(phy[3:])
+    return None
+
+def phy_fingerprint():
+    """Names of the phys present, from sysfs; None where sysfs is not available"""
+    try:
+        return tuple(sorted(os.listdir(SYSFS_PHY_DIR)))
+    except OSError:
+        return None
+
+class CapabilityCache:
+    """Phy capabilities, re-read only when the set of phys changes or on invalidate()"""
+
+    def __init__(self, loader=read_phys):
+        self._loader = loader
+        self._phys = None
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        fingerprint = phy_fingerprint()
+        with self._lock:
+            if self._phys is None or fingerprint != self._fingerprint:
+                try:
+                    self._phys = self._loader()
+                except Exception as e:
+                    # Not cached, so a transient failure is retried on the next call
+                    logger.error(f"Failed to read wireless capabilities: {e}")
+                    return []
+                self._fingerprint = fingerprint
+            return self._phys
+
+    def invalidate(self):
+        with self._lock:
+            self._phys = None
+
+    def phy(self, phy):
+        """Capabilities for a wiphy index or an interface's 'phy<index>' reference"""
+        index = phy if isinstance(phy, int) else phy_index(phy)
+        return next((caps for caps in self.get() if caps.index == index), None)
+
+    def supporting(self, *modes):
+        """Phys on which interfaces of all these modes can run together"""
+        return [phy for phy in self.get() if phy.allows(*modes)]
+
+capabilities = CapabilityCache()
+
+def main():
+    print(json.dumps([phy.to_dict() for phy in read_phys()], indent=2))
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
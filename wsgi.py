@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WiFi Security Testing Tool - WSGI Entry Point
+Developer: SHAKIR HOSSAIN
+Website: https://shakir.com.bd
+
+Production entry point for multi-process servers, e.g.:
+    gunicorn -w 4 -b 0.0.0.0:5000 wsgi:app
+"""
+
+from app import create_app
+
+app = create_app()